@@ -0,0 +1,950 @@
+#!/usr/bin/env python
+"""A stand-in saltant API server serving synthetic data.
+
+This serves a saltant-like REST API (paginated list endpoints with
+Django-style filters, detail endpoints, and task instance create,
+clone, and terminate endpoints) with synthetic task instances, task
+types, task queues, task whitelists, and users, at a configurable scale
+and latency. It also serves task instance logs and results from
+/files/, honouring HTTP range requests (unless told not to). Downloads
+can also be cut off partway through, to see how clients cope.
+
+Synthetic task instances are generated from their index rather than
+stored, so even a million of them costs next to no memory. Task
+instances created through the API are stored, and move from created,
+to running, to successful over a configurable duration.
+
+Request counts are available at /_stats/ and can be reset by POSTing
+to /_reset/.
+
+Run this like so:
+
+    python benchmarks/mock_server.py --port 8765 --task-instances 100000
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import argparse
+import datetime
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid as uuid_lib
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlencode, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlsplit
+
+# When synthetic task instances were created
+EPOCH = datetime.datetime(2019, 1, 1)
+
+# States synthetic task instances cycle through
+SYNTHETIC_STATES = (
+    "successful",
+    "successful",
+    "successful",
+    "failed",
+    "successful",
+    "terminated",
+    "successful",
+    "running",
+)
+FINISHED_STATES = ("successful", "failed", "terminated")
+
+# The number of task instances in the first page of a list response
+# when the client doesn't ask for a page size
+DEFAULT_PAGE_SIZE = 100
+
+# URL patterns
+LIST_URL_RE = re.compile(r"^/api/(?P<resource>[a-z]+)/$")
+DETAIL_URL_RE = re.compile(r"^/api/(?P<resource>[a-z]+)/(?P<id>[^/]+)/$")
+ACTION_URL_RE = re.compile(
+    r"^/api/(?P<resource>[a-z]+taskinstances)/(?P<id>[^/]+)"
+    r"/(?P<action>clone|terminate)/$"
+)
+FILE_URL_RE = re.compile(r"^/files/(?P<kind>logs|results)/(?P<uuid>[^/.]+)")
+
+
+def isoformat(dt):
+    """Format a datetime the way the saltant API does."""
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class Dataset(object):
+    """Synthetic and created saltant objects.
+
+    Attributes:
+        task_instances: An integer containing the number of synthetic
+            task instances of each kind.
+        task_duration: A float containing how many seconds task
+            instances created through the API take to finish.
+        lock: A threading.Lock protecting the created task instances.
+        created: A dictionary mapping task instance kinds to
+            dictionaries mapping UUIDs to created task instances.
+        offsets: A dictionary mapping task instance kinds to integers
+            used to keep the UUIDs of different kinds distinct.
+    """
+
+    def __init__(
+        self,
+        task_instances=1000,
+        task_types=20,
+        task_queues=5,
+        users=5,
+        task_duration=3.0,
+    ):
+        """Initialize the dataset.
+
+        Args:
+            task_instances: An integer containing the number of
+                synthetic task instances of each kind.
+            task_types: An integer containing the number of task types
+                of each kind.
+            task_queues: An integer containing the number of task
+                queues.
+            users: An integer containing the number of users.
+            task_duration: A float containing how many seconds task
+                instances created through the API take to finish.
+        """
+        self.task_instances = task_instances
+        self.task_types = task_types
+        self.task_queues = task_queues
+        self.users = users
+        self.task_duration = task_duration
+        self.lock = threading.Lock()
+        self.created = {
+            "containertaskinstances": {},
+            "executabletaskinstances": {},
+        }
+        self.offsets = {
+            "containertaskinstances": 0,
+            "executabletaskinstances": 1 << 64,
+        }
+
+    # Task instances
+    def synthetic_task_instance(self, resource, index):
+        """Build the synthetic task instance with a given index."""
+        state = SYNTHETIC_STATES[index % len(SYNTHETIC_STATES)]
+        created = EPOCH + datetime.timedelta(seconds=index * 7)
+        finished = None
+
+        if state in FINISHED_STATES:
+            finished = isoformat(
+                created + datetime.timedelta(seconds=30 + index % 600)
+            )
+
+        return {
+            "uuid": str(uuid_lib.UUID(int=self.offsets[resource] + index + 1)),
+            "name": "instance-%d" % index,
+            "state": state,
+            "user": "user%d" % (index % self.users),
+            "task_queue": 1 + index % self.task_queues,
+            "task_type": 1 + index % self.task_types,
+            "datetime_created": isoformat(created),
+            "datetime_finished": finished,
+            "arguments": {"index": index, "payload": "x" * 64},
+        }
+
+    def synthetic_index(self, resource, uuid):
+        """Get the index of a synthetic task instance from its UUID."""
+        try:
+            index = uuid_lib.UUID(uuid).int - self.offsets[resource] - 1
+        except ValueError:
+            return None
+
+        if 0 <= index < self.task_instances:
+            return index
+
+        return None
+
+    def created_task_instance(self, instance):
+        """Bring a created task instance's state up to date."""
+        if instance["state"] in FINISHED_STATES:
+            return instance
+
+        age = time.time() - instance["_created_at"]
+
+        if age >= self.task_duration:
+            instance["state"] = "successful"
+            instance["datetime_finished"] = isoformat(
+                datetime.datetime.utcnow()
+            )
+        elif age >= self.task_duration / 3:
+            instance["state"] = "running"
+
+        return instance
+
+    def get_task_instance(self, resource, uuid):
+        """Get a task instance by UUID, or None."""
+        with self.lock:
+            if uuid in self.created[resource]:
+                return self.created_task_instance(self.created[resource][uuid])
+
+        index = self.synthetic_index(resource, uuid)
+
+        if index is None:
+            return None
+
+        return self.synthetic_task_instance(resource, index)
+
+    def iter_task_instances(self, resource):
+        """Iterate over every task instance of a kind."""
+        for index in range(self.task_instances):
+            yield self.synthetic_task_instance(resource, index)
+
+        with self.lock:
+            created = [
+                self.created_task_instance(instance)
+                for instance in self.created[resource].values()
+            ]
+
+        for instance in created:
+            yield instance
+
+    def create_task_instance(
+        self, resource, name, task_type, task_queue, args
+    ):
+        """Create a task instance."""
+        now = datetime.datetime.utcnow()
+        instance = {
+            "uuid": str(uuid_lib.uuid4()),
+            "name": name,
+            "state": "created",
+            "user": "user0",
+            "task_queue": int(task_queue),
+            "task_type": int(task_type),
+            "datetime_created": isoformat(now),
+            "datetime_finished": None,
+            "arguments": args,
+            "_created_at": time.time(),
+        }
+
+        with self.lock:
+            self.created[resource][instance["uuid"]] = instance
+
+        return instance
+
+    def terminate_task_instance(self, resource, uuid):
+        """Terminate a task instance, returning it or None."""
+        with self.lock:
+            instance = self.created[resource].get(uuid)
+
+            if instance is not None:
+                self.created_task_instance(instance)
+
+                if instance["state"] not in FINISHED_STATES:
+                    instance["state"] = "terminated"
+                    instance["datetime_finished"] = isoformat(
+                        datetime.datetime.utcnow()
+                    )
+
+                return instance
+
+        # Synthetic task instances are immutable
+        return self.get_task_instance(resource, uuid)
+
+    # Everything else
+    def task_type(self, resource, id):
+        """Build the task type with a given ID."""
+        task_type = {
+            "id": id,
+            "name": "task-type-%d" % id,
+            "description": "Synthetic task type %d." % id,
+            "user": "user%d" % (id % self.users),
+            "datetime_created": isoformat(EPOCH),
+            "command_to_run": "echo {{ message }}",
+            "environment_variables": [],
+            "required_arguments": ["message"],
+            "required_arguments_default_values": {"message": "hello"},
+        }
+
+        if resource == "containertasktypes":
+            task_type.update(
+                {
+                    "logs_path": "/logs/",
+                    "results_path": "/results/",
+                    "container_image": "ubuntu:18.04",
+                    "container_type": "docker",
+                }
+            )
+        else:
+            task_type["json_file_option"] = None
+
+        return task_type
+
+    def task_queue(self, id):
+        """Build the task queue with a given ID."""
+        return {
+            "id": id,
+            "user": "user%d" % (id % self.users),
+            "name": "task-queue-%d" % id,
+            "description": "Synthetic task queue %d." % id,
+            "private": False,
+            "runs_executable_tasks": True,
+            "runs_docker_container_tasks": True,
+            "runs_singularity_container_tasks": True,
+            "active": True,
+            "whitelists": [1],
+        }
+
+    def task_whitelist(self, id):
+        """Build the task whitelist with a given ID."""
+        return {
+            "id": id,
+            "user": "user0",
+            "name": "task-whitelist-%d" % id,
+            "description": "Synthetic task whitelist %d." % id,
+            "whitelisted_container_task_types": list(
+                range(1, self.task_types + 1)
+            ),
+            "whitelisted_executable_task_types": list(
+                range(1, self.task_types + 1)
+            ),
+        }
+
+    def user(self, index):
+        """Build the user with a given index."""
+        return {
+            "username": "user%d" % index,
+            "email": "user%d@example.com" % index,
+        }
+
+    def iter_objects(self, resource):
+        """Iterate over every object of a resource."""
+        if resource.endswith("taskinstances"):
+            return self.iter_task_instances(resource)
+        elif resource.endswith("tasktypes"):
+            return (
+                self.task_type(resource, id)
+                for id in range(1, self.task_types + 1)
+            )
+        elif resource == "taskqueues":
+            return (
+                self.task_queue(id) for id in range(1, self.task_queues + 1)
+            )
+        elif resource == "taskwhitelists":
+            return (self.task_whitelist(id) for id in (1,))
+        elif resource == "users":
+            return (self.user(index) for index in range(self.users))
+
+        return None
+
+    def get_object(self, resource, id):
+        """Get an object of a resource by its identifier, or None."""
+        if resource.endswith("taskinstances"):
+            return self.get_task_instance(resource, id)
+
+        if resource == "users":
+            match = re.match(r"^user(\d+)$", id)
+
+            if match and int(match.group(1)) < self.users:
+                return self.user(int(match.group(1)))
+
+            return None
+
+        try:
+            id = int(id)
+        except ValueError:
+            return None
+
+        if resource.endswith("tasktypes") and 1 <= id <= self.task_types:
+            return self.task_type(resource, id)
+        elif resource == "taskqueues" and 1 <= id <= self.task_queues:
+            return self.task_queue(id)
+        elif resource == "taskwhitelists" and id == 1:
+            return self.task_whitelist(id)
+
+        return None
+
+    def log_text(self, uuid, kind):
+        """Get the log or results text of a task instance, or None.
+
+        Logs of running task instances grow as time goes on.
+        """
+        instance = None
+        resource = None
+
+        for resource in self.created:
+            instance = self.get_task_instance(resource, uuid)
+
+            if instance is not None:
+                break
+
+        if instance is None:
+            return None
+
+        if "_created_at" in instance and instance["state"] not in (
+            FINISHED_STATES
+        ):
+            lines = 1 + int((time.time() - instance["_created_at"]) * 10)
+        else:
+            lines = 200
+
+        return "".join(
+            "%s line %d of task instance %s\n" % (kind, line, uuid)
+            for line in range(lines)
+        )
+
+
+def matches(value, lookup, wanted):
+    """Check whether a value matches a Django-style filter lookup."""
+    if lookup == "in":
+        return str(value) in wanted.split(",")
+    elif lookup == "isnull":
+        return (value is None) == (wanted.lower() in ("true", "1"))
+    elif value is None:
+        return False
+    elif lookup == "contains":
+        return wanted in str(value)
+    elif lookup == "icontains":
+        return wanted.lower() in str(value).lower()
+    elif lookup == "startswith":
+        return str(value).startswith(wanted)
+
+    # Everything else compares values, numerically where possible
+    if isinstance(value, bool):
+        wanted = wanted.lower() in ("true", "1")
+    elif isinstance(value, int):
+        wanted = int(wanted)
+
+    if lookup == "exact":
+        return value == wanted
+    elif lookup == "gt":
+        return value > wanted
+    elif lookup == "gte":
+        return value >= wanted
+    elif lookup == "lt":
+        return value < wanted
+    elif lookup == "lte":
+        return value <= wanted
+
+    raise ValueError("unsupported lookup %s" % lookup)
+
+
+class MockSaltantServer(ThreadingMixIn, HTTPServer):
+    """A threaded HTTP server holding the mock API's state.
+
+    Attributes:
+        dataset: A Dataset object containing the objects served.
+        latency: A float containing how many seconds to delay each
+            response by.
+        supports_fields: A boolean specifying whether list endpoints
+            honour the "fields" query parameter.
+        supports_ranges: A boolean specifying whether logs and results
+            are served in ranges when asked to.
+        cut_off_downloads: An integer containing how many of the next
+            logs and results responses to cut off halfway through.
+        request_counts: A dictionary mapping "METHOD resource" strings
+            to the number of such requests received.
+        bytes_sent: An integer containing the number of response body
+            bytes sent.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address,
+        dataset,
+        latency=0.0,
+        supports_fields=True,
+        supports_ranges=True,
+        cut_off_downloads=0,
+    ):
+        """Initialize the server.
+
+        Args:
+            address: A (host, port) tuple to listen on. Port 0 picks a
+                free port.
+            dataset: A Dataset object containing the objects to serve.
+            latency: A float containing how many seconds to delay each
+                response by.
+            supports_fields: A boolean specifying whether list
+                endpoints honour the "fields" query parameter.
+            supports_ranges: A boolean specifying whether logs and
+                results are served in ranges when asked to.
+            cut_off_downloads: An integer containing how many of the
+                next logs and results responses to cut off halfway
+                through.
+        """
+        HTTPServer.__init__(self, address, MockSaltantRequestHandler)
+        self.dataset = dataset
+        self.latency = latency
+        self.supports_fields = supports_fields
+        self.supports_ranges = supports_ranges
+        self.cut_off_downloads = cut_off_downloads
+        self.stats_lock = threading.Lock()
+        self.request_counts = {}
+        self.bytes_sent = 0
+
+    def record_request(self, method, resource, num_bytes):
+        """Record a request for the stats endpoint."""
+        key = "%s %s" % (method, resource)
+
+        with self.stats_lock:
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+            self.bytes_sent += num_bytes
+
+    def stats(self):
+        """Get request stats."""
+        with self.stats_lock:
+            return {
+                "requests": sum(self.request_counts.values()),
+                "request_counts": dict(self.request_counts),
+                "bytes_sent": self.bytes_sent,
+            }
+
+    def reset_stats(self):
+        """Reset request stats."""
+        with self.stats_lock:
+            self.request_counts = {}
+            self.bytes_sent = 0
+
+    def should_cut_off_download(self):
+        """Check whether to cut off the download being sent."""
+        with self.stats_lock:
+            if not self.cut_off_downloads:
+                return False
+
+            self.cut_off_downloads -= 1
+
+            return True
+
+
+class MockSaltantRequestHandler(BaseHTTPRequestHandler):
+    """Handles requests to the mock saltant API."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Keep quiet."""
+        pass
+
+    # Helpers
+    def send_body(
+        self, status, body, headers=None, resource="-", cut_off=False
+    ):
+        """Send a response with a body, or the first half of it."""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if not isinstance(body, bytes):
+            body = body.encode("utf-8")
+
+        self.send_response(status)
+
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if cut_off:
+            # Send half, and hang up
+            body = body[: len(body) // 2]
+            self.wfile.write(body)
+            self.wfile.flush()
+            self.close_connection = True
+        elif self.command != "HEAD":
+            self.wfile.write(body)
+
+        self.server.record_request(self.command, resource, len(body))
+
+    def send_json(self, status, data, resource="-", etag=False):
+        """Send a JSON response, handling ETags if asked to."""
+        body = json.dumps(data, separators=(",", ":"))
+        headers = {"Content-Type": "application/json"}
+
+        if etag:
+            headers["ETag"] = (
+                '"%s"' % hashlib.sha1(body.encode("utf-8")).hexdigest()
+            )
+
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                self.send_body(304, b"", headers, resource)
+                return
+
+        self.send_body(status, body, headers, resource)
+
+    def read_form(self):
+        """Read a url-encoded or JSON request body."""
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            return json.loads(body or "{}")
+
+        return dict(parse_qsl(body))
+
+    def strip_private(self, object, fields=None):
+        """Strip private keys and apply a field projection."""
+        object = dict(
+            (key, value)
+            for key, value in object.items()
+            if not key.startswith("_")
+        )
+
+        if fields:
+            object = dict(
+                (key, value) for key, value in object.items() if key in fields
+            )
+
+        return object
+
+    # Verbs
+    def do_GET(self):
+        """Handle a GET request."""
+        url = urlsplit(self.path)
+        path = url.path
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        dataset = self.server.dataset
+
+        if path == "/_stats/":
+            self.send_json(200, self.server.stats())
+            return
+
+        match = FILE_URL_RE.match(path)
+
+        if match:
+            self.send_file(match.group("kind"), match.group("uuid"))
+            return
+
+        match = LIST_URL_RE.match(path)
+
+        if match:
+            resource = match.group("resource")
+            objects = dataset.iter_objects(resource)
+
+            if objects is None:
+                self.send_json(404, {"detail": "Not found."}, resource)
+                return
+
+            self.send_list(resource, objects, query)
+            return
+
+        match = DETAIL_URL_RE.match(path)
+
+        if match:
+            resource = match.group("resource")
+            object = dataset.get_object(resource, match.group("id"))
+
+            if object is None:
+                self.send_json(404, {"detail": "Not found."}, resource)
+                return
+
+            self.send_json(
+                200,
+                self.strip_private(object),
+                resource,
+                etag=not resource.endswith("taskinstances"),
+            )
+            return
+
+        self.send_json(404, {"detail": "Not found."})
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        """Handle a POST request."""
+        path = urlsplit(self.path).path
+        dataset = self.server.dataset
+
+        if path == "/_reset/":
+            self.server.reset_stats()
+            self.send_json(200, {})
+            return
+
+        match = ACTION_URL_RE.match(path)
+
+        if match:
+            resource = match.group("resource")
+            self.read_form()
+
+            if match.group("action") == "clone":
+                original = dataset.get_task_instance(
+                    resource, match.group("id")
+                )
+
+                if original is None:
+                    self.send_json(404, {"detail": "Not found."}, resource)
+                    return
+
+                instance = dataset.create_task_instance(
+                    resource,
+                    original["name"],
+                    original["task_type"],
+                    original["task_queue"],
+                    original["arguments"],
+                )
+                self.send_json(201, self.strip_private(instance), resource)
+            else:
+                instance = dataset.terminate_task_instance(
+                    resource, match.group("id")
+                )
+
+                if instance is None:
+                    self.send_json(404, {"detail": "Not found."}, resource)
+                    return
+
+                self.send_json(202, self.strip_private(instance), resource)
+            return
+
+        match = LIST_URL_RE.match(path)
+
+        if match and match.group("resource").endswith("taskinstances"):
+            resource = match.group("resource")
+            form = self.read_form()
+
+            try:
+                arguments = form.get("arguments") or "{}"
+
+                if not isinstance(arguments, dict):
+                    arguments = json.loads(arguments)
+
+                instance = dataset.create_task_instance(
+                    resource,
+                    form.get("name", ""),
+                    int(form["task_type"]),
+                    int(form["task_queue"]),
+                    arguments,
+                )
+            except (KeyError, ValueError) as e:
+                self.send_json(400, {"detail": str(e)}, resource)
+                return
+
+            self.send_json(201, self.strip_private(instance), resource)
+            return
+
+        self.send_json(404, {"detail": "Not found."})
+
+    # Responses
+    def send_list(self, resource, objects, query):
+        """Send a page of a filtered, ordered list."""
+        page = int(query.pop("page", 1))
+        page_size = min(
+            int(query.pop("page_size", DEFAULT_PAGE_SIZE)), 1 << 31
+        )
+        ordering = query.pop("ordering", None)
+        fields = query.pop("fields", None)
+
+        if fields and self.server.supports_fields:
+            fields = set(fields.split(","))
+        else:
+            fields = None
+
+        filters = []
+
+        for key, wanted in query.items():
+            field, _, lookup = key.partition("__")
+            filters.append((field, lookup or "exact", wanted))
+
+        # Fast path: unfiltered, unordered synthetic task instances can
+        # be sliced directly
+        dataset = self.server.dataset
+        start = (page - 1) * page_size
+
+        if (
+            resource.endswith("taskinstances")
+            and not filters
+            and not ordering
+            and not dataset.created[resource]
+        ):
+            count = dataset.task_instances
+            results = [
+                dataset.synthetic_task_instance(resource, index)
+                for index in range(start, min(start + page_size, count))
+            ]
+        else:
+            try:
+                matching = [
+                    object
+                    for object in objects
+                    if all(
+                        matches(object.get(field), lookup, wanted)
+                        for field, lookup, wanted in filters
+                    )
+                ]
+            except ValueError as e:
+                self.send_json(400, {"detail": str(e)}, resource)
+                return
+
+            if ordering:
+                for key in reversed(ordering.split(",")):
+                    reverse = key.startswith("-")
+                    key = key.lstrip("-")
+                    matching.sort(
+                        key=lambda object: (
+                            object.get(key) is None,
+                            object.get(key),
+                        ),
+                        reverse=reverse,
+                    )
+
+            count = len(matching)
+            results = matching[start : start + page_size]
+
+        # Build the next and previous links like Django REST framework
+        # does
+        def page_url(page_number):
+            params = dict(parse_qsl(urlsplit(self.path).query))
+            params["page"] = page_number
+            return "http://%s%s?%s" % (
+                self.headers.get("Host"),
+                urlsplit(self.path).path,
+                urlencode(sorted(params.items())),
+            )
+
+        self.send_json(
+            200,
+            {
+                "count": count,
+                "next": (
+                    page_url(page + 1) if start + page_size < count else None
+                ),
+                "previous": page_url(page - 1) if page > 1 else None,
+                "results": [
+                    self.strip_private(object, fields) for object in results
+                ],
+            },
+            resource,
+        )
+
+    def send_file(self, kind, uuid):
+        """Send a task instance's logs or results, honouring ranges.
+
+        Ranges are ignored if the server doesn't support them, and the
+        response is cut off if the server has been told to.
+        """
+        text = self.server.dataset.log_text(uuid, kind)
+
+        if text is None:
+            self.send_body(404, b"", resource=kind)
+            return
+
+        body = text.encode("utf-8")
+        headers = {
+            "Content-Type": "text/plain",
+            "Accept-Ranges": "bytes",
+            "ETag": '"%s"' % hashlib.sha1(body).hexdigest(),
+        }
+        match = re.match(r"^bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+
+        if match and self.server.supports_ranges:
+            start = int(match.group(1))
+            end = int(match.group(2) or len(body) - 1)
+
+            if start >= len(body):
+                headers["Content-Range"] = "bytes */%d" % len(body)
+                self.send_body(416, b"", headers, kind)
+                return
+
+            end = min(end, len(body) - 1)
+            headers["Content-Range"] = "bytes %d-%d/%d" % (
+                start,
+                end,
+                len(body),
+            )
+            self.send_body(
+                206,
+                body[start : end + 1],
+                headers,
+                kind,
+                self.server.should_cut_off_download(),
+            )
+            return
+
+        self.send_body(
+            200, body, headers, kind, self.server.should_cut_off_download()
+        )
+
+
+def main():
+    """Run the mock server."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", default=8765, type=int)
+    parser.add_argument(
+        "--task-instances",
+        help="Number of synthetic task instances of each kind.",
+        default=1000,
+        type=int,
+    )
+    parser.add_argument(
+        "--task-types",
+        help="Number of task types of each kind.",
+        default=20,
+        type=int,
+    )
+    parser.add_argument(
+        "--task-queues",
+        help="Number of task queues.",
+        default=5,
+        type=int,
+    )
+    parser.add_argument(
+        "--latency",
+        help="Seconds to delay each response by.",
+        default=0.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--task-duration",
+        help="Seconds created task instances take to finish.",
+        default=3.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--no-fields-support",
+        help="Ignore the fields query parameter.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-range-support",
+        help="Ignore the Range header of logs and results requests.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--cut-off-downloads",
+        help="Number of logs and results responses to cut off halfway.",
+        default=0,
+        type=int,
+    )
+    args = parser.parse_args()
+
+    server = MockSaltantServer(
+        (args.host, args.port),
+        Dataset(
+            task_instances=args.task_instances,
+            task_types=args.task_types,
+            task_queues=args.task_queues,
+            task_duration=args.task_duration,
+        ),
+        latency=args.latency,
+        supports_fields=not args.no_fields_support,
+        supports_ranges=not args.no_range_support,
+        cut_off_downloads=args.cut_off_downloads,
+    )
+
+    print(
+        "Serving mock saltant API at http://%s:%d/api/"
+        % server.server_address[:2]
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
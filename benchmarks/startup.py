@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""Benchmarks the startup time of saltant-cli.
+
+This times, in fresh interpreters, running
+
+- saltant-cli --help
+- saltant-cli task-queues get 1
+
+where the get command runs against a stubbed saltant client: the
+client's requests session is given a transport adapter which answers
+every request with a canned task queue, so no saltant server (or
+network) is needed.
+
+Run this from the base of the repository like so:
+
+    python benchmarks/startup.py --repeat 20
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Base of the repository
+PROJECT_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code run in the child interpreter for the get benchmark. This stubs
+# out the transport of every requests session and then runs the CLI.
+STUBBED_CLIENT_BOOTSTRAP = """
+import json
+import sys
+import requests
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+TASK_QUEUE = {
+    "id": 1,
+    "user": "benchmark",
+    "name": "benchmark-queue",
+    "description": "A stubbed task queue.",
+    "private": False,
+    "runs_executable_tasks": True,
+    "runs_docker_container_tasks": True,
+    "runs_singularity_container_tasks": True,
+    "active": True,
+    "whitelists": [],
+}
+
+
+class StubAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response._content = json.dumps(TASK_QUEUE).encode("utf-8")
+        return response
+
+    def close(self):
+        pass
+
+
+original_init = requests.Session.__init__
+
+
+def stubbed_init(self, *args, **kwargs):
+    original_init(self, *args, **kwargs)
+    self.mount("http://", StubAdapter())
+    self.mount("https://", StubAdapter())
+
+
+requests.Session.__init__ = stubbed_init
+
+from saltant_cli.main import main
+
+main(args=sys.argv[1:], prog_name="saltant-cli")
+"""
+
+# The config file used for the get benchmark
+STUB_CONFIG = (
+    'saltant-api-url: "http://saltant.invalid/api/"\n'
+    'saltant-auth-token: "benchmark"\n'
+)
+
+
+def time_command(argv, repeat):
+    """Time running a command in fresh processes.
+
+    Args:
+        argv: A list of strings containing the command to run.
+        repeat: An integer specifying how many times to run the
+            command.
+
+    Returns:
+        A list of floats containing the wall time of each run in
+        seconds.
+    """
+    timings = []
+
+    with open(os.devnull, "w") as devnull:
+        for _ in range(repeat):
+            start = time.time()
+            subprocess.check_call(argv, cwd=PROJECT_BASE_DIR, stdout=devnull)
+            timings.append(time.time() - start)
+
+    return timings
+
+
+def summarize(name, timings):
+    """Print a summary line for some timings.
+
+    Args:
+        name: A string containing the name of the benchmark.
+        timings: A list of floats containing timings in seconds.
+    """
+    timings = sorted(timings)
+
+    print(
+        "%-24s min %7.1f ms   median %7.1f ms   max %7.1f ms"
+        % (
+            name,
+            timings[0] * 1000,
+            timings[len(timings) // 2] * 1000,
+            timings[-1] * 1000,
+        )
+    )
+
+
+def main():
+    """Run the startup benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--repeat",
+        help="Number of runs per benchmark.",
+        default=10,
+        type=int,
+    )
+    args = parser.parse_args()
+
+    # Write out a config file pointing at a server that doesn't exist
+    config_file = tempfile.NamedTemporaryFile(
+        mode="w", suffix=".yaml", delete=False
+    )
+
+    try:
+        with config_file:
+            config_file.write(STUB_CONFIG)
+
+        summarize(
+            "--help",
+            time_command(
+                [sys.executable, "run_saltant_cli.py", "--help"],
+                args.repeat,
+            ),
+        )
+        summarize(
+            "task-queues get",
+            time_command(
+                [
+                    sys.executable,
+                    "-c",
+                    STUBBED_CLIENT_BOOTSTRAP,
+                    "--config-path",
+                    config_file.name,
+                    "task-queues",
+                    "get",
+                    "1",
+                ],
+                args.repeat,
+            ),
+        )
+    finally:
+        os.remove(config_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,577 @@
+#!/usr/bin/env python
+"""Benchmarks saltant-cli's commands against a stand-in saltant API.
+
+This starts the mock saltant API (see mock_server.py) in this process,
+serving synthetic task instances, task types, and task queues at a
+given scale and latency, and then runs saltant-cli commands against it
+in fresh interpreters. For each command it measures
+
+- the wall time of the whole process (startup included),
+- the peak resident set size of the process, and
+- the number of requests (and response bytes) the server saw.
+
+Commands benchmarked include list (as a table, streamed, and as JSON
+Lines), get, create, wait, stats, and the batch commands (create-batch,
+wait-all, and terminate-many). Results are written as JSON, so that
+runs can be compared across releases with --compare.
+
+Run this from the base of the repository like so:
+
+    python benchmarks/suite.py --task-instances 100000 --output bench.json
+    python benchmarks/suite.py --compare bench.json
+
+This needs a POSIX system, since peak memory is measured per process
+with wait4.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from mock_server import Dataset, MockSaltantServer
+
+# Base of the repository
+PROJECT_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Let the benchmarks import saltant_cli from the repository
+sys.path.insert(0, PROJECT_BASE_DIR)
+
+from saltant_cli.version import VERSION  # noqa: E402
+
+# The task instance resource the benchmarks use, as named by the API
+# and on the command line
+RESOURCE = "containertaskinstances"
+COMMAND_GROUP = "container-task-instances"
+
+# A benchmark: its name, a function making the command line to run
+# (after the global options) given a Context, and an optional function
+# run before each run given a Context
+Benchmark = collections.namedtuple("Benchmark", ["name", "make_args", "setup"])
+
+# What a benchmark needs to set itself up
+Context = collections.namedtuple(
+    "Context", ["dataset", "work_dir", "batch_size"]
+)
+
+
+def synthetic_uuid(dataset, index):
+    """Get the UUID of a synthetic task instance.
+
+    Args:
+        dataset: A mock_server.Dataset object.
+        index: An integer containing the index of the task instance.
+
+    Returns:
+        A string containing the task instance's UUID.
+    """
+    return dataset.synthetic_task_instance(RESOURCE, index)["uuid"]
+
+
+def create_task_instances(context, number):
+    """Create task instances on the mock server.
+
+    The UUIDs are written to a file in the work directory.
+
+    Args:
+        context: A Context object.
+        number: An integer containing how many task instances to
+            create.
+
+    Returns:
+        A string containing the path to the file of UUIDs.
+    """
+    path = os.path.join(context.work_dir, "uuids.txt")
+
+    with open(path, "w") as uuids_file:
+        for index in range(number):
+            instance = context.dataset.create_task_instance(
+                RESOURCE, "benchmark-%d" % index, 1, 1, {"message": "hi"}
+            )
+            uuids_file.write(instance["uuid"] + "\n")
+
+    return path
+
+
+def write_manifest(context):
+    """Write a create-batch manifest to the work directory.
+
+    Args:
+        context: A Context object.
+
+    Returns:
+        A string containing the path to the manifest.
+    """
+    path = os.path.join(context.work_dir, "manifest.jsonl")
+
+    with open(path, "w") as manifest_file:
+        for index in range(context.batch_size):
+            manifest_file.write(
+                json.dumps(
+                    {
+                        "name": "benchmark-%d" % index,
+                        "task_type": 1,
+                        "task_queue": 1,
+                        "arguments": {"message": "hi"},
+                    }
+                )
+                + "\n"
+            )
+
+    return path
+
+
+def setup_one_task_instance(context):
+    """Create a single task instance to wait on.
+
+    Args:
+        context: A Context object.
+    """
+    create_task_instances(context, 1)
+
+
+def setup_batch_of_task_instances(context):
+    """Create a batch of task instances to act on.
+
+    Args:
+        context: A Context object.
+    """
+    create_task_instances(context, context.batch_size)
+
+
+def read_first_uuid(context):
+    """Read the first UUID created by a setup function.
+
+    Args:
+        context: A Context object.
+
+    Returns:
+        A string containing the UUID.
+    """
+    with open(os.path.join(context.work_dir, "uuids.txt")) as uuids_file:
+        return uuids_file.readline().strip()
+
+
+# Every benchmark, in the order they're run
+BENCHMARKS = [
+    Benchmark("startup", lambda context: ["--help"], None),
+    Benchmark(
+        "task-queues get", lambda context: ["task-queues", "get", "1"], None
+    ),
+    Benchmark(
+        "get",
+        lambda context: [
+            COMMAND_GROUP,
+            "get",
+            synthetic_uuid(context.dataset, 0),
+        ],
+        None,
+    ),
+    Benchmark("list", lambda context: [COMMAND_GROUP, "list"], None),
+    Benchmark(
+        "list --stream",
+        lambda context: [COMMAND_GROUP, "list", "--stream"],
+        None,
+    ),
+    Benchmark(
+        "list -o jsonl",
+        lambda context: ["-o", "jsonl", COMMAND_GROUP, "list"],
+        None,
+    ),
+    Benchmark(
+        "list --filters",
+        lambda context: [
+            COMMAND_GROUP,
+            "list",
+            "--filters",
+            '{"state": "failed", "task_queue": 1}',
+        ],
+        None,
+    ),
+    Benchmark("stats", lambda context: [COMMAND_GROUP, "stats"], None),
+    Benchmark(
+        "create",
+        lambda context: [
+            COMMAND_GROUP,
+            "create",
+            "--task-type",
+            "1",
+            "--task-queue",
+            "1",
+            "--json-arguments",
+            '{"message": "hi"}',
+        ],
+        None,
+    ),
+    Benchmark(
+        "create-batch",
+        lambda context: [
+            COMMAND_GROUP,
+            "create-batch",
+            write_manifest(context),
+        ],
+        None,
+    ),
+    Benchmark(
+        "wait",
+        lambda context: [
+            COMMAND_GROUP,
+            "wait",
+            read_first_uuid(context),
+        ],
+        setup_one_task_instance,
+    ),
+    Benchmark(
+        "wait-all",
+        lambda context: [
+            COMMAND_GROUP,
+            "wait-all",
+            "--uuids-file",
+            os.path.join(context.work_dir, "uuids.txt"),
+        ],
+        setup_batch_of_task_instances,
+    ),
+    Benchmark(
+        "terminate-many",
+        lambda context: [
+            COMMAND_GROUP,
+            "terminate-many",
+            "--uuids-file",
+            os.path.join(context.work_dir, "uuids.txt"),
+        ],
+        setup_batch_of_task_instances,
+    ),
+]
+
+
+def run_process(argv, env):
+    """Run a process, measuring its wall time and peak memory.
+
+    Args:
+        argv: A list of strings containing the command to run.
+        env: A dictionary containing the environment to run it in.
+
+    Returns:
+        A two-tuple containing the wall time in seconds and the peak
+        resident set size in megabytes.
+
+    Raises:
+        subprocess.CalledProcessError: The process failed.
+    """
+    # Keep the command's progress messages out of the summary, unless
+    # it fails
+    with open(os.devnull, "w") as devnull, tempfile.TemporaryFile(
+        mode="w+"
+    ) as errors:
+        start = time.time()
+        process = subprocess.Popen(
+            argv, cwd=PROJECT_BASE_DIR, env=env, stdout=devnull, stderr=errors
+        )
+
+        # Popen.wait doesn't give resource usage, so reap the process
+        # ourselves
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.time() - start
+        process.returncode = os.WEXITSTATUS(status)
+
+        if process.returncode:
+            errors.seek(0)
+            sys.stderr.write(errors.read())
+            raise subprocess.CalledProcessError(process.returncode, argv)
+
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    if sys.platform == "darwin":
+        peak_rss = usage.ru_maxrss / (1024 * 1024)
+    else:
+        peak_rss = usage.ru_maxrss / 1024
+
+    return elapsed, peak_rss
+
+
+def summarize_runs(runs):
+    """Summarize the runs of a benchmark.
+
+    Args:
+        runs: A list of dictionaries describing each run.
+
+    Returns:
+        A dictionary containing the minimum, median, and maximum of
+        each measurement.
+    """
+    summary = {}
+
+    for key in runs[0]:
+        values = sorted(run[key] for run in runs)
+        summary[key] = {
+            "min": values[0],
+            "median": values[len(values) // 2],
+            "max": values[-1],
+        }
+
+    return summary
+
+
+def run_benchmark(benchmark, server, context, base_argv, env, repeat):
+    """Run a benchmark a number of times.
+
+    Args:
+        benchmark: A Benchmark object.
+        server: The mock_server.MockSaltantServer being run against.
+        context: A Context object.
+        base_argv: A list of strings containing the command line up to
+            and including the global options.
+        env: A dictionary containing the environment to run in.
+        repeat: An integer specifying how many times to run it.
+
+    Returns:
+        A dictionary containing the benchmark's results.
+    """
+    runs = []
+
+    for _ in range(repeat):
+        if benchmark.setup is not None:
+            benchmark.setup(context)
+
+        argv = base_argv + benchmark.make_args(context)
+        server.reset_stats()
+        elapsed, peak_rss = run_process(argv, env)
+        stats = server.stats()
+
+        runs.append(
+            {
+                "wall_seconds": round(elapsed, 4),
+                "peak_rss_mb": round(peak_rss, 1),
+                "requests": stats["requests"],
+                "response_bytes": stats["bytes_sent"],
+            }
+        )
+
+    return {
+        "name": benchmark.name,
+        "command": argv[len(base_argv) :],
+        "runs": runs,
+        "summary": summarize_runs(runs),
+    }
+
+
+def print_result(result, baseline=None, threshold=None, stream=sys.stderr):
+    """Print a summary line for a benchmark's result.
+
+    Args:
+        result: A dictionary containing the benchmark's results.
+        baseline: An optional dictionary containing the same
+            benchmark's results from an earlier run, to compare with.
+        threshold: A float containing the ratio of median wall times
+            above which a benchmark counts as having regressed.
+        stream: A file object to print to.
+
+    Returns:
+        A boolean specifying whether the benchmark regressed.
+    """
+    summary = result["summary"]
+    line = "%-16s %9.1f ms %8.1f MB %7d requests %12d bytes" % (
+        result["name"],
+        summary["wall_seconds"]["median"] * 1000,
+        summary["peak_rss_mb"]["median"],
+        summary["requests"]["median"],
+        summary["response_bytes"]["median"],
+    )
+    regressed = False
+
+    if baseline is not None:
+        ratio = (
+            summary["wall_seconds"]["median"]
+            / baseline["summary"]["wall_seconds"]["median"]
+        )
+        regressed = ratio > threshold
+        line += "   %5.2fx%s" % (ratio, "  REGRESSED" if regressed else "")
+
+    print(line, file=stream)
+
+    return regressed
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--task-instances",
+        help="Number of synthetic task instances of each kind.",
+        default=10000,
+        type=int,
+    )
+    parser.add_argument(
+        "--task-types",
+        help="Number of task types of each kind.",
+        default=20,
+        type=int,
+    )
+    parser.add_argument(
+        "--task-queues",
+        help="Number of task queues.",
+        default=5,
+        type=int,
+    )
+    parser.add_argument(
+        "--latency",
+        help="Seconds the server delays each response by.",
+        default=0.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--task-duration",
+        help="Seconds created task instances take to finish.",
+        default=1.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--batch-size",
+        help="Number of task instances batch commands act on.",
+        default=100,
+        type=int,
+    )
+    parser.add_argument(
+        "--repeat",
+        help="Number of runs per benchmark.",
+        default=3,
+        type=int,
+    )
+    parser.add_argument(
+        "--benchmark",
+        help="Run only this benchmark (can be given more than once).",
+        action="append",
+        choices=[benchmark.name for benchmark in BENCHMARKS],
+        dest="benchmarks",
+    )
+    parser.add_argument(
+        "--output", help="File to write results to as JSON.", default=None
+    )
+    parser.add_argument(
+        "--compare",
+        help=(
+            "File containing earlier results (from --output) to compare "
+            "with."
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--threshold",
+        help=(
+            "Ratio of median wall times above which a benchmark counts as "
+            "having regressed when comparing."
+        ),
+        default=1.2,
+        type=float,
+    )
+    args = parser.parse_args()
+
+    baselines = {}
+
+    if args.compare:
+        with open(args.compare) as compare_file:
+            for result in json.load(compare_file)["results"]:
+                baselines[result["name"]] = result
+
+    # Serve the mock API from a background thread on any free port
+    dataset = Dataset(
+        task_instances=args.task_instances,
+        task_types=args.task_types,
+        task_queues=args.task_queues,
+        task_duration=args.task_duration,
+    )
+    server = MockSaltantServer(("127.0.0.1", 0), dataset, latency=args.latency)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+
+    # Keep saltant-cli's config, caches, and daemon socket out of the
+    # user's, and don't hand commands off to a daemon
+    work_dir = tempfile.mkdtemp(prefix="saltant-cli-benchmarks-")
+    env = dict(
+        os.environ,
+        XDG_CONFIG_HOME=os.path.join(work_dir, "config"),
+        XDG_CACHE_HOME=os.path.join(work_dir, "cache"),
+        XDG_RUNTIME_DIR=os.path.join(work_dir, "runtime"),
+        SALTANT_CLI_NO_DAEMON="1",
+    )
+    config_path = os.path.join(work_dir, "config.yaml")
+
+    with open(config_path, "w") as config_file:
+        config_file.write(
+            'saltant-api-url: "http://127.0.0.1:%d/api/"\n'
+            'saltant-auth-token: "benchmark"\n' % server.server_address[1]
+        )
+
+    base_argv = [
+        sys.executable,
+        "run_saltant_cli.py",
+        "--config-path",
+        config_path,
+        "--no-cache",
+    ]
+    context = Context(dataset, work_dir, args.batch_size)
+    results = []
+    regressions = []
+
+    try:
+        for benchmark in BENCHMARKS:
+            if args.benchmarks and benchmark.name not in args.benchmarks:
+                continue
+
+            result = run_benchmark(
+                benchmark, server, context, base_argv, env, args.repeat
+            )
+            results.append(result)
+
+            if print_result(
+                result, baselines.get(benchmark.name), args.threshold
+            ):
+                regressions.append(benchmark.name)
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "saltant_cli_version": VERSION,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "datetime": datetime.datetime.utcnow().isoformat() + "Z",
+        "parameters": {
+            "task_instances": args.task_instances,
+            "task_types": args.task_types,
+            "task_queues": args.task_queues,
+            "latency": args.latency,
+            "task_duration": args.task_duration,
+            "batch_size": args.batch_size,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if regressions:
+        sys.exit(
+            "Regressed (more than %gx slower): %s"
+            % (args.threshold, ", ".join(regressions))
+        )
+
+
+if __name__ == "__main__":
+    main()
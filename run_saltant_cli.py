@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 """Runs the saltant CLI."""
 
-from saltant_cli.main import main
+from saltant_cli.main import run
 
 
 # Run it
-main()
+run()
@@ -0,0 +1,274 @@
+"""Contains downloading of task instances' logs and results.
+
+Logs and results ("artifacts") aren't served by the saltant API itself,
+but from wherever the config file's URL templates point. They can be
+large, so they're streamed a chunk at a time rather than read into
+memory, and downloads which are cut off pick up where they left off
+with HTTP range requests.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import hashlib
+import os
+import re
+import time
+import requests
+from saltant.constants import HTTP_200_OK
+from .exceptions import ArtifactNotFound, DownloadFailed
+
+# How many bytes to read at a time
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# How many times to try a download which keeps getting cut off, and how
+# many seconds to wait before the first retry (doubling each time)
+DOWNLOAD_ATTEMPTS = 5
+DOWNLOAD_RETRY_DELAY = 0.5
+
+# What unfinished downloads' file names end with
+PARTIAL_SUFFIX = ".part"
+
+# Status codes, besides 200, which downloads can come back with
+HTTP_206_PARTIAL_CONTENT = 206
+HTTP_404_NOT_FOUND = 404
+HTTP_416_RANGE_NOT_SATISFIABLE = 416
+
+# Pulls the total size out of a Content-Range header
+CONTENT_RANGE_TOTAL_RE = re.compile(r"/(\d+)\s*$")
+
+
+def get_total_size(response):
+    """Get the total size of what a range request was for.
+
+    Args:
+        response: A requests.Response object for a range request.
+
+    Returns:
+        An integer containing the size in bytes, or None if the
+        response doesn't say.
+    """
+    match = CONTENT_RANGE_TOTAL_RE.search(
+        response.headers.get("Content-Range", "")
+    )
+
+    if match is None:
+        return None
+
+    return int(match.group(1))
+
+
+def stream_download(
+    session,
+    url,
+    write,
+    offset=0,
+    headers=None,
+    attempts=DOWNLOAD_ATTEMPTS,
+):
+    """Stream the content at a URL past an offset.
+
+    Only what's past the offset is requested, with a Range header.
+    Servers which ignore it send everything, and what's before the
+    offset is skipped. If the connection drops partway through, the
+    rest is requested in the same way.
+
+    Args:
+        session: A requests.Session object to make requests with.
+        url: A string containing the URL to download.
+        write: A function to call with each chunk (a bytes object) of
+            the content past the offset.
+        offset: An integer containing how many bytes of the content to
+            skip, e.g., because they were downloaded already.
+        headers: An optional dictionary containing headers to send.
+        attempts: An integer containing how many times to try.
+
+    Returns:
+        An integer containing the size of the content in bytes, i.e.,
+        the offset its end is at.
+
+    Raises:
+        saltant_cli.exceptions.ArtifactNotFound: There's nothing at the
+            URL.
+        saltant_cli.exceptions.DownloadFailed: The content couldn't be
+            downloaded.
+    """
+    failures = 0
+
+    # Ranges of compressed responses are of the compressed bytes
+    request_headers = {"Accept-Encoding": "identity"}
+    request_headers.update(headers or {})
+
+    while True:
+        if offset:
+            request_headers["Range"] = "bytes=%d-" % offset
+
+        try:
+            response = session.get(url, headers=request_headers, stream=True)
+
+            try:
+                if response.status_code == HTTP_416_RANGE_NOT_SATISFIABLE:
+                    # Nothing past the offset
+                    if get_total_size(response) == offset:
+                        return offset
+
+                    raise DownloadFailed(
+                        "%s is shorter than what was already downloaded" % url
+                    )
+
+                if response.status_code == HTTP_404_NOT_FOUND:
+                    raise ArtifactNotFound("%s not found" % url)
+
+                if response.status_code not in (
+                    HTTP_200_OK,
+                    HTTP_206_PARTIAL_CONTENT,
+                ):
+                    raise DownloadFailed(
+                        "%s failed with status %d"
+                        % (url, response.status_code)
+                    )
+
+                if response.status_code == HTTP_200_OK:
+                    skip = offset
+                else:
+                    skip = 0
+
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    if skip:
+                        if len(chunk) <= skip:
+                            skip -= len(chunk)
+                            continue
+
+                        chunk = chunk[skip:]
+                        skip = 0
+
+                    write(chunk)
+                    offset += len(chunk)
+            finally:
+                response.close()
+
+            return offset
+        except (
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ) as e:
+            failures += 1
+
+            if failures >= attempts:
+                raise DownloadFailed(
+                    "%s couldn't be downloaded: %s" % (url, e)
+                )
+
+            time.sleep(DOWNLOAD_RETRY_DELAY * 2 ** (failures - 1))
+
+
+def download_to_file(session, url, path, headers=None):
+    """Download the content at a URL to a file.
+
+    The content is written to the path with PARTIAL_SUFFIX appended
+    until it's complete, and then moved into place. If a partial
+    download is already there (e.g., from a run which was
+    interrupted), only the rest of the content is downloaded.
+
+    Args:
+        session: A requests.Session object to make requests with.
+        url: A string containing the URL to download.
+        path: A string containing the path to download to.
+        headers: An optional dictionary containing headers to send.
+
+    Returns:
+        A two-tuple containing the SHA-256 hex digest of the content
+        and its size in bytes.
+
+    Raises:
+        saltant_cli.exceptions.DownloadFailed: The content couldn't be
+            downloaded.
+    """
+    partial_path = path + PARTIAL_SUFFIX
+    digest = hashlib.sha256()
+    offset = 0
+
+    # Pick up the digest where the partial download left off
+    if os.path.exists(partial_path):
+        with open(partial_path, "rb") as partial_file:
+            for chunk in iter(
+                lambda: partial_file.read(DOWNLOAD_CHUNK_SIZE), b""
+            ):
+                digest.update(chunk)
+                offset += len(chunk)
+
+    with open(partial_path, "ab") as partial_file:
+
+        def write(chunk):
+            partial_file.write(chunk)
+            digest.update(chunk)
+
+        size = stream_download(session, url, write, offset, headers)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    os.rename(partial_path, path)
+
+    return digest.hexdigest(), size
+
+
+def download_to_stream(session, url, stream, copy_path=None, headers=None):
+    """Download the content at a URL to a stream.
+
+    Args:
+        session: A requests.Session object to make requests with.
+        url: A string containing the URL to download.
+        stream: A binary file object to write the content to.
+        copy_path: An optional string containing the path to a file to
+            also write the content to.
+        headers: An optional dictionary containing headers to send.
+
+    Returns:
+        A two-tuple containing the SHA-256 hex digest of the content
+        and its size in bytes.
+
+    Raises:
+        saltant_cli.exceptions.DownloadFailed: The content couldn't be
+            downloaded.
+    """
+    digest = hashlib.sha256()
+    copy_file = None if copy_path is None else open(copy_path, "wb")
+
+    def write(chunk):
+        stream.write(chunk)
+        digest.update(chunk)
+
+        if copy_file is not None:
+            copy_file.write(chunk)
+
+    try:
+        size = stream_download(session, url, write, headers=headers)
+    finally:
+        stream.flush()
+
+        if copy_file is not None:
+            copy_file.close()
+
+    return digest.hexdigest(), size
+
+
+def copy_file_to_stream(path, stream):
+    """Copy a file to a stream a chunk at a time.
+
+    Args:
+        path: A string containing the path to the file.
+        stream: A binary file object to write to.
+
+    Returns:
+        An integer containing the number of bytes copied.
+    """
+    size = 0
+
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(DOWNLOAD_CHUNK_SIZE), b""):
+            stream.write(chunk)
+            size += len(chunk)
+
+    return size
@@ -0,0 +1,855 @@
+"""Contains local on-disk caches of API responses.
+
+Once a task instance has finished, it never changes again, so there's
+no need to ask the server for it more than once. Finished task
+instances are stored in an SQLite database keyed by server, task
+instance type, and UUID, and the least recently used ones are evicted
+once the cache grows past its size limit.
+
+Task types, task queues, and task whitelists change rarely, so
+responses for them are kept in a separate database and trusted for a
+configurable time to live. Once that's up, they're revalidated with a
+conditional request, which the server can answer with a cheap "304 Not
+Modified" if nothing changed.
+
+Finished task instances' logs and results don't change either. Their
+contents are stored as files named after their SHA-256 digests, so
+identical artifacts are only stored once, with an SQLite index mapping
+the URLs they were downloaded from to their digests.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import datetime
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import requests
+from saltant.constants import HTTP_200_OK, TASK_INSTANCE_FINISH_STATUSES
+
+# How many writes to make before committing them
+COMMIT_INTERVAL = 500
+
+# The status code a server responds with to a conditional request when
+# the cached response is still good
+HTTP_304_NOT_MODIFIED = 304
+
+COUNTERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+TASK_INSTANCES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_instances (
+    server TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    uuid TEXT NOT NULL,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_accessed REAL NOT NULL,
+    PRIMARY KEY (server, kind, uuid)
+);
+CREATE INDEX IF NOT EXISTS task_instances_last_accessed
+    ON task_instances (last_accessed);
+"""
+
+RESPONSES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    resource TEXT NOT NULL,
+    data TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_resource ON responses (resource);
+"""
+
+ARTIFACTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts (digest);
+CREATE INDEX IF NOT EXISTS artifacts_last_accessed
+    ON artifacts (last_accessed);
+"""
+
+
+def is_finished(task_instance):
+    """Check whether a task instance has finished for good.
+
+    Args:
+        task_instance: A task instance model instance.
+
+    Returns:
+        A boolean specifying whether the task instance has finished.
+    """
+    return (
+        task_instance.state in TASK_INSTANCE_FINISH_STATUSES
+        and task_instance.datetime_finished is not None
+    )
+
+
+def model_to_response_data(object):
+    """Convert a model instance back into API response data.
+
+    Args:
+        object: A saltant.models.resource.Model instance.
+
+    Returns:
+        A dictionary like the one the API responded with for the model
+        instance, which can be turned back into a model instance with
+        its manager's response_data_to_model_instance method.
+    """
+    response_data = {}
+
+    for attr, value in vars(object).items():
+        if attr == "manager":
+            continue
+
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+
+        response_data[attr] = value
+
+    return response_data
+
+
+def make_directories(path):
+    """Make a directory and its parents, if they don't exist yet.
+
+    Args:
+        path: A string containing the path of the directory.
+    """
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno == errno.EEXIST and os.path.isdir(path):
+            pass
+        else:
+            raise
+
+
+class SQLiteCache(object):
+    """Base class for caches stored in an SQLite database.
+
+    Subclasses set the schema and the tables holding cached entries.
+    Besides the entries, each database keeps running counts of cache
+    hits, misses, etc. for reporting on how well the cache is doing.
+
+    Attributes:
+        schema: A string containing the SQL to create the cache's
+            tables with.
+        tables: A tuple of strings containing the names of the tables
+            holding cached entries.
+        path: A string containing the path to the SQLite database.
+        connection: An sqlite3.Connection object for the database.
+        writes: An integer containing the number of writes made since
+            the last commit.
+        counts: A dictionary mapping counter names to the amount to add
+            to them at the next commit.
+    """
+
+    schema = ""
+    tables = ()
+
+    def __init__(self, path):
+        """Open (creating if necessary) the cache.
+
+        Args:
+            path: A string containing the path to the SQLite database.
+        """
+        make_directories(os.path.dirname(path))
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(COUNTERS_SCHEMA + self.schema)
+        self.writes = 0
+        self.counts = {}
+
+    def count(self, name, amount=1):
+        """Add to one of the cache's counters.
+
+        Args:
+            name: A string containing the name of the counter (e.g.,
+                "hits").
+            amount: An integer containing how much to add.
+        """
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def record_writes(self, count):
+        """Record writes, committing them every so often.
+
+        Args:
+            count: An integer containing the number of writes made.
+        """
+        self.writes += count
+
+        if self.writes >= COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        """Commit any writes and counts."""
+        if not self.writes and not self.counts:
+            return
+
+        for name, amount in self.counts.items():
+            self.connection.execute(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                (name,),
+            )
+            self.connection.execute(
+                "UPDATE counters SET value = value + ? WHERE name = ?",
+                (amount, name),
+            )
+
+        self.connection.commit()
+        self.writes = 0
+        self.counts = {}
+
+    def stats(self):
+        """Get statistics about the cache.
+
+        Returns:
+            A dictionary containing the number of cached entries
+            ("entries"), their total size in bytes ("bytes"), and the
+            value of each of the cache's counters.
+        """
+        self.commit()
+
+        stats = {"entries": 0, "bytes": 0}
+
+        for table in self.tables:
+            entries, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM %s"
+                % table
+            ).fetchone()
+            stats["entries"] += entries
+            stats["bytes"] += size
+
+        stats.update(
+            self.connection.execute("SELECT name, value FROM counters")
+        )
+
+        return stats
+
+    def clear(self):
+        """Remove every cached entry and reset the counters."""
+        for table in self.tables + ("counters",):
+            self.connection.execute("DELETE FROM %s" % table)
+
+        self.connection.commit()
+        self.writes = 0
+        self.counts = {}
+
+    def close(self):
+        """Commit any writes and close the cache."""
+        self.commit()
+        self.connection.close()
+
+
+class TaskInstanceCache(SQLiteCache):
+    """An on-disk cache of finished task instances.
+
+    Attributes:
+        max_bytes: An integer containing the maximum total size of the
+            cached task instances' data.
+    """
+
+    schema = TASK_INSTANCES_SCHEMA
+    tables = ("task_instances",)
+
+    def __init__(self, path, max_bytes):
+        """Open (creating if necessary) the cache.
+
+        Args:
+            path: A string containing the path to the SQLite database.
+            max_bytes: An integer containing the maximum total size of
+                the cached task instances' data.
+        """
+        super(TaskInstanceCache, self).__init__(path)
+
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(manager):
+        """Get the server and kind of task instances a manager manages.
+
+        Args:
+            manager: A task instance manager.
+
+        Returns:
+            A two-tuple containing the manager's server's API URL and
+            the URL its task instances are listed at.
+        """
+        return manager._client.base_api_url, manager.list_url
+
+    def get_many(self, manager, uuids):
+        """Get cached task instances.
+
+        Args:
+            manager: A task instance manager.
+            uuids: An iterable of strings containing task instance
+                UUIDs.
+
+        Returns:
+            A dictionary mapping the UUIDs of the task instances which
+            were cached to task instance model instances.
+        """
+        server, kind = self.key(manager)
+        uuids = list(uuids)
+        found = {}
+
+        # Stay under SQLite's limit on query parameters
+        for idx in range(0, len(uuids), 500):
+            chunk = uuids[idx : idx + 500]
+            rows = self.connection.execute(
+                "SELECT uuid, data FROM task_instances "
+                "WHERE server = ? AND kind = ? AND uuid IN (%s)"
+                % ", ".join("?" * len(chunk)),
+                [server, kind] + chunk,
+            )
+
+            for uuid, data in rows:
+                found[uuid] = manager.response_data_to_model_instance(
+                    json.loads(data)
+                )
+
+        self.count("hits", len(found))
+        self.count("misses", len(uuids) - len(found))
+
+        # Keep track of what's being used for eviction
+        if found:
+            self.connection.executemany(
+                "UPDATE task_instances SET last_accessed = ? "
+                "WHERE server = ? AND kind = ? AND uuid = ?",
+                [(time.time(), server, kind, uuid) for uuid in found],
+            )
+            self.record_writes(len(found))
+
+        return found
+
+    def get(self, manager, uuid):
+        """Get a cached task instance.
+
+        Args:
+            manager: A task instance manager.
+            uuid: A string containing the task instance's UUID.
+
+        Returns:
+            A task instance model instance, or None if the task
+            instance isn't cached.
+        """
+        return self.get_many(manager, [uuid]).get(uuid)
+
+    def put(self, task_instance):
+        """Cache a task instance if it has finished.
+
+        Args:
+            task_instance: A task instance model instance.
+
+        Returns:
+            A boolean specifying whether the task instance was cached.
+        """
+        if not is_finished(task_instance):
+            return False
+
+        server, kind = self.key(task_instance.manager)
+        data = json.dumps(model_to_response_data(task_instance))
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO task_instances "
+            "(server, kind, uuid, data, size, last_accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (server, kind, task_instance.uuid, data, len(data), time.time()),
+        )
+        self.record_writes(1)
+
+        return True
+
+    def cache_through(self, task_instances):
+        """Cache finished task instances as they're iterated over.
+
+        Args:
+            task_instances: An iterable of task instance model
+                instances.
+
+        Yields:
+            The task instances, unchanged.
+        """
+        for task_instance in task_instances:
+            self.put(task_instance)
+
+            yield task_instance
+
+    def commit(self):
+        """Commit any writes, evicting entries if the cache is too big."""
+        if self.writes:
+            self.evict()
+
+        super(TaskInstanceCache, self).commit()
+
+    def evict(self):
+        """Evict least recently used entries until under the size limit."""
+        total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM task_instances"
+        ).fetchone()[0]
+
+        if total_bytes <= self.max_bytes:
+            return
+
+        # Find the last accessed time at which enough has been freed
+        excess_bytes = total_bytes - self.max_bytes
+        cutoff = None
+
+        for last_accessed, size in self.connection.execute(
+            "SELECT last_accessed, size FROM task_instances "
+            "ORDER BY last_accessed"
+        ):
+            excess_bytes -= size
+            cutoff = last_accessed
+
+            if excess_bytes <= 0:
+                break
+
+        self.connection.execute(
+            "DELETE FROM task_instances WHERE last_accessed <= ?", (cutoff,)
+        )
+        self.count("evictions")
+
+
+class CachedResponse(object):
+    """A stand-in for a requests.Response served from the cache.
+
+    Only the parts of requests.Response that the CLI uses are
+    provided.
+
+    Attributes:
+        url: A string containing the URL of the request.
+        text: A string containing the body of the response.
+        status_code: An integer containing the response's status code,
+            which is always 200.
+    """
+
+    def __init__(self, url, text):
+        """Initialize the response.
+
+        Args:
+            url: A string containing the URL of the request.
+            text: A string containing the body of the response.
+        """
+        self.url = url
+        self.text = text
+        self.status_code = HTTP_200_OK
+
+    def json(self):
+        """Decode the body of the response.
+
+        Returns:
+            The JSON-decoded body of the response.
+        """
+        return json.loads(self.text)
+
+
+def get_response_key(session, request_url):
+    """Get the key to cache a response under.
+
+    The key includes a digest of the session's Authorization header
+    rather than the header itself, so no tokens are stored.
+
+    Args:
+        session: A requests.Session object the request is made with.
+        request_url: A string containing the full request URL.
+
+    Returns:
+        A string containing the key.
+    """
+    authorization = session.headers.get("Authorization") or ""
+    digest = hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+    return "%s %s" % (digest, request_url)
+
+
+class MetadataCache(SQLiteCache):
+    """An on-disk cache of responses to GET requests for metadata.
+
+    Responses are keyed by their full request URL (query string and
+    all) and the credentials they were requested with, since what a
+    server responds with can depend on who's asking. They're grouped by
+    the resource they belong to (e.g., the task queues of a particular
+    server) so that everything cached for a resource can be invalidated
+    at once when it's modified.
+    """
+
+    schema = RESPONSES_SCHEMA
+    tables = ("responses",)
+
+    def get(self, session, url, params=None, resource=None, ttl=0):
+        """Make a GET request, going through the cache.
+
+        Fresh responses are served straight from the cache. Stale
+        responses are revalidated with a conditional request, using
+        whichever of their ETag and Last-Modified headers the server
+        sent. Only successful responses are cached.
+
+        Args:
+            session: A requests.Session object to make requests with.
+            url: A string containing the URL to request.
+            params: An optional dictionary containing query parameters.
+            resource: A string identifying the resource the URL belongs
+                to. This defaults to the request URL.
+            ttl: A number containing how many seconds cached responses
+                are trusted for before being revalidated.
+
+        Returns:
+            A requests.Response object, or a CachedResponse object if
+            the response came from the cache.
+        """
+        request_url = requests.Request("GET", url, params=params).prepare().url
+        key = get_response_key(session, request_url)
+        row = self.connection.execute(
+            "SELECT data, etag, last_modified, fetched FROM responses "
+            "WHERE url = ?",
+            (key,),
+        ).fetchone()
+
+        if row is not None and time.time() - row[3] < ttl:
+            self.count("hits")
+
+            return CachedResponse(request_url, row[0])
+
+        # Ask the server, giving it the chance to say nothing changed
+        headers = {}
+
+        if row is not None and row[1]:
+            headers["If-None-Match"] = row[1]
+
+        if row is not None and row[2]:
+            headers["If-Modified-Since"] = row[2]
+
+        response = session.get(request_url, headers=headers)
+
+        if row is not None and response.status_code == HTTP_304_NOT_MODIFIED:
+            self.count("revalidations")
+            self.connection.execute(
+                "UPDATE responses SET fetched = ? WHERE url = ?",
+                (time.time(), key),
+            )
+            self.record_writes(1)
+
+            return CachedResponse(request_url, row[0])
+
+        self.count("misses")
+
+        if response.status_code == HTTP_200_OK:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, resource, data, etag, last_modified, fetched) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    resource or request_url,
+                    response.text,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    time.time(),
+                ),
+            )
+            self.record_writes(1)
+
+        return response
+
+    def invalidate(self, resource):
+        """Remove every cached response for a resource.
+
+        Args:
+            resource: A string identifying the resource.
+        """
+        self.connection.execute(
+            "DELETE FROM responses WHERE resource = ?", (resource,)
+        )
+        self.record_writes(1)
+
+
+class CachedSession(object):
+    """Makes GET requests for a resource through the metadata cache.
+
+    This provides just enough of requests.Session's interface to be
+    used in its place for fetching (and paginating through) objects.
+
+    Attributes:
+        cache: A MetadataCache object.
+        session: The requests.Session object to make requests with.
+        resource: A string identifying the resource being requested.
+        ttl: A number containing how many seconds cached responses are
+            trusted for.
+    """
+
+    def __init__(self, cache, session, resource, ttl):
+        """Initialize the session.
+
+        Args:
+            cache: A MetadataCache object.
+            session: The requests.Session object to make requests with.
+            resource: A string identifying the resource being
+                requested.
+            ttl: A number containing how many seconds cached responses
+                are trusted for.
+        """
+        self.cache = cache
+        self.session = session
+        self.resource = resource
+        self.ttl = ttl
+
+    def get(self, url, params=None):
+        """Make a GET request, going through the cache.
+
+        Args:
+            url: A string containing the URL to request.
+            params: An optional dictionary containing query parameters.
+
+        Returns:
+            A requests.Response or CachedResponse object.
+        """
+        return self.cache.get(
+            self.session, url, params, resource=self.resource, ttl=self.ttl
+        )
+
+    def invalidate(self):
+        """Remove every cached response for the resource."""
+        self.cache.invalidate(self.resource)
+
+
+class ArtifactCache(SQLiteCache):
+    """An on-disk, content-addressed cache of finished artifacts.
+
+    Artifacts (logs and results) are keyed by the URL they were
+    downloaded from, and stored in a directory as files named after
+    their SHA-256 digests.
+
+    Attributes:
+        directory: A string containing the path to the directory the
+            artifacts are stored in.
+        max_bytes: An integer containing the maximum total size of the
+            stored artifacts.
+    """
+
+    schema = ARTIFACTS_SCHEMA
+    tables = ("artifacts",)
+
+    def __init__(self, path, directory, max_bytes):
+        """Open (creating if necessary) the cache.
+
+        Args:
+            path: A string containing the path to the SQLite database
+                indexing the artifacts.
+            directory: A string containing the path to the directory to
+                store the artifacts in.
+            max_bytes: An integer containing the maximum total size of
+                the stored artifacts.
+        """
+        super(ArtifactCache, self).__init__(path)
+
+        make_directories(directory)
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def get_path(self, digest):
+        """Get where an artifact with a given digest is stored.
+
+        Args:
+            digest: A string containing the SHA-256 hex digest of the
+                artifact.
+
+        Returns:
+            A string containing the path to the artifact's file.
+        """
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def make_temporary_path(self):
+        """Make a file to put an artifact in before it's stored.
+
+        The file is in the cache's directory, so that it can be moved
+        into place. This doesn't touch the database, so it can be used
+        from any thread.
+
+        Returns:
+            A string containing the path to the new, empty file.
+        """
+        fd, path = tempfile.mkstemp(prefix=".partial-", dir=self.directory)
+        os.close(fd)
+
+        return path
+
+    def get(self, url):
+        """Get the file a cached artifact is stored in.
+
+        Args:
+            url: A string containing the URL of the artifact.
+
+        Returns:
+            A string containing the path to the artifact's file, or
+            None if the artifact isn't cached.
+        """
+        row = self.connection.execute(
+            "SELECT digest FROM artifacts WHERE url = ?", (url,)
+        ).fetchone()
+
+        if row is not None and not os.path.exists(self.get_path(row[0])):
+            # Its file was removed from under us
+            self.connection.execute(
+                "DELETE FROM artifacts WHERE url = ?", (url,)
+            )
+            self.record_writes(1)
+            row = None
+
+        if row is None:
+            self.count("misses")
+
+            return None
+
+        self.count("hits")
+        self.connection.execute(
+            "UPDATE artifacts SET last_accessed = ? WHERE url = ?",
+            (time.time(), url),
+        )
+        self.record_writes(1)
+
+        return self.get_path(row[0])
+
+    def put(self, url, temporary_path, digest, size):
+        """Store an artifact.
+
+        Args:
+            url: A string containing the URL of the artifact.
+            temporary_path: A string containing the path to a file made
+                by make_temporary_path containing the artifact. The
+                file is moved into the cache.
+            digest: A string containing the SHA-256 hex digest of the
+                artifact.
+            size: An integer containing the size of the artifact in
+                bytes.
+        """
+        path = self.get_path(digest)
+
+        if os.path.exists(path):
+            # Already stored for another URL
+            os.remove(temporary_path)
+        else:
+            make_directories(os.path.dirname(path))
+            os.rename(temporary_path, path)
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO artifacts "
+            "(url, digest, size, last_accessed) VALUES (?, ?, ?, ?)",
+            (url, digest, size, time.time()),
+        )
+        self.record_writes(1)
+
+    def get_stored_bytes(self):
+        """Get the total size of the stored artifacts.
+
+        Returns:
+            An integer containing the size in bytes, counting artifacts
+            stored for many URLs once.
+        """
+        return self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT DISTINCT digest, size FROM artifacts)"
+        ).fetchone()[0]
+
+    def stats(self):
+        """Get statistics about the cache.
+
+        Returns:
+            A dictionary containing the number of cached artifacts
+            ("entries"), their total size in bytes ("bytes"), and the
+            value of each of the cache's counters.
+        """
+        self.commit()
+
+        stats = {
+            "entries": self.connection.execute(
+                "SELECT COUNT(*) FROM artifacts"
+            ).fetchone()[0],
+            "bytes": self.get_stored_bytes(),
+        }
+        stats.update(
+            self.connection.execute("SELECT name, value FROM counters")
+        )
+
+        return stats
+
+    def clear(self):
+        """Remove every cached artifact and reset the counters."""
+        super(ArtifactCache, self).clear()
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+        make_directories(self.directory)
+
+    def commit(self):
+        """Commit any writes, evicting entries if the cache is too big."""
+        if self.writes:
+            self.evict()
+
+        super(ArtifactCache, self).commit()
+
+    def evict(self):
+        """Evict least recently used entries until under the size limit.
+
+        Files no longer referred to by any entry are removed.
+        """
+        excess_bytes = self.get_stored_bytes() - self.max_bytes
+
+        if excess_bytes <= 0:
+            return
+
+        # Find the last accessed time at which enough has been freed
+        cutoff = None
+
+        for last_accessed, size in self.connection.execute(
+            "SELECT last_accessed, size FROM artifacts "
+            "ORDER BY last_accessed"
+        ):
+            excess_bytes -= size
+            cutoff = last_accessed
+
+            if excess_bytes <= 0:
+                break
+
+        digests = [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT DISTINCT digest FROM artifacts "
+                "WHERE last_accessed <= ?",
+                (cutoff,),
+            )
+        ]
+        self.connection.execute(
+            "DELETE FROM artifacts WHERE last_accessed <= ?", (cutoff,)
+        )
+
+        for digest in digests:
+            still_used = self.connection.execute(
+                "SELECT 1 FROM artifacts WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+
+            if still_used is None:
+                try:
+                    os.remove(self.get_path(digest))
+                except OSError:
+                    pass
+
+        self.count("evictions")
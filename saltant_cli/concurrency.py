@@ -0,0 +1,219 @@
+"""Contains helpers for making many API requests concurrently."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from .constants import DEFAULT_CONCURRENCY, DEFAULT_POOL_MAXSIZE
+
+
+def ensure_connection_pool_size(client, size):
+    """Make sure a client can keep enough connections alive.
+
+    requests only keeps up to ten connections per host alive by
+    default (see the transport section of the config file), so any
+    more threads than that sharing a session end up opening (and
+    throwing away) a new connection for most requests. The session's
+    retry policy is kept.
+
+    Args:
+        client: A saltant.client.Client object.
+        size: An integer containing how many connections need to be
+            kept alive at once.
+    """
+    for prefix in ("http://", "https://"):
+        adapter = client.session.get_adapter(prefix)
+
+        # Leave adapters which aren't for HTTP (e.g., offline ones)
+        # alone
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+
+        if size <= getattr(adapter, "_pool_maxsize", DEFAULT_POOL_MAXSIZE):
+            continue
+
+        client.session.mount(
+            prefix,
+            HTTPAdapter(pool_maxsize=size, max_retries=adapter.max_retries),
+        )
+
+
+class RateLimiter(object):
+    """Spaces out calls so that they happen at most at a given rate.
+
+    Calls are spread out evenly rather than being let through in
+    bursts. This is safe to share between threads.
+
+    Attributes:
+        interval: A float containing the minimum number of seconds in
+            between calls, or 0 for no limit.
+        next_time: A float containing the earliest time the next call
+            can happen at.
+        lock: A threading.Lock object guarding next_time.
+    """
+
+    def __init__(self, rate=None):
+        """Initialize the rate limiter.
+
+        Args:
+            rate: An optional float containing the maximum number of
+                calls per second. If it's None or 0, calls aren't
+                limited.
+        """
+        self.interval = 1 / rate if rate else 0
+        self.next_time = time.time()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait until it's time for the next call."""
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = time.time()
+            call_time = max(self.next_time, now)
+            self.next_time = call_time + self.interval
+
+        time.sleep(call_time - now)
+
+
+def iterate_outcomes(executor, func, items, window):
+    """Call a function on many items using an executor.
+
+    Items are pulled from the iterable lazily: there are never more
+    than a window's worth of items in flight, so huge (or unbounded)
+    iterables are fine.
+
+    Args:
+        executor: A concurrent.futures.Executor object to make the
+            calls with.
+        func: A function taking a single item as its argument.
+        items: An iterable of items to call the function with.
+        window: An integer specifying the most items to have in flight
+            at once.
+
+    Yields:
+        Three-tuples containing an item, the function's return value
+        for that item (or None if it raised an exception), and the
+        exception raised (or None if it didn't raise one), in the order
+        the calls finish.
+    """
+    pending = {}
+
+    def collect(futures):
+        for future in futures:
+            item = pending.pop(future)
+            exception = future.exception()
+
+            if exception is None:
+                yield item, future.result(), None
+            else:
+                yield item, None, exception
+
+    try:
+        for item in items:
+            pending[executor.submit(func, item)] = item
+
+            if len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for outcome in collect(done):
+                    yield outcome
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for outcome in collect(done):
+                yield outcome
+    finally:
+        # Don't start anything else if we're stopped early
+        for future in pending:
+            future.cancel()
+
+
+class Engine(object):
+    """Makes many requests through a client at once.
+
+    saltant-py's managers make blocking requests, so the engine runs
+    them on a bounded pool of threads which all share the client's
+    session, and with it one pool of keep-alive connections sized to
+    match. Whatever the managers return (e.g., model instances) comes
+    back unchanged.
+
+    Attributes:
+        concurrency: An integer containing the most requests to make at
+            once.
+        executor: A concurrent.futures.ThreadPoolExecutor object which
+            makes the requests.
+    """
+
+    def __init__(self, client, concurrency=DEFAULT_CONCURRENCY):
+        """Initialize the engine.
+
+        Args:
+            client: A saltant.client.Client object which requests are
+                made through.
+            concurrency: An integer containing the most requests to
+                make at once.
+        """
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+
+        # Every thread shares the client, so give it enough connections
+        ensure_connection_pool_size(client, concurrency)
+
+    def map_unordered(self, func, items):
+        """Call a function on many items, in the order calls finish.
+
+        Args:
+            func: A function taking a single item as its argument.
+            items: An iterable of items to call the function with.
+
+        Yields:
+            Three-tuples containing an item, the function's return
+            value for that item (or None if it raised an exception), and
+            the exception raised (or None if it didn't raise one).
+        """
+        return iterate_outcomes(
+            self.executor, func, items, 2 * self.concurrency
+        )
+
+    def map(self, func, items):
+        """Call a function on many items, in the order of the items.
+
+        Like map, but calls are made concurrently, with at most twice
+        as many items in flight as requests being made.
+
+        Args:
+            func: A function taking a single item as its argument.
+            items: An iterable of items to call the function with.
+
+        Yields:
+            The function's return value for each item.
+
+        Raises:
+            Exception: Whatever the first call to fail (in the order of
+                the items) raised.
+        """
+        pending = collections.deque()
+
+        try:
+            for item in items:
+                pending.append(self.executor.submit(func, item))
+
+                if len(pending) >= 2 * self.concurrency:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the engine's threads once they've finished."""
+        self.executor.shutdown(wait=True)
@@ -1,7 +1,6 @@
 """Contains a function for loading in saltant configuration."""
 
 import os
-import yaml
 from .constants import CONFIG_FILE_NAME, PROJECT_BASE_DIR, PROJECT_CONFIG_HOME
 from .exceptions import ConfigFileNotFound
 
@@ -55,7 +54,11 @@ def parse_config_file(config_path=None):
         # Find the config file
         config_path = find_config_file()
 
-    # Now parse and return it
+    # Now parse and return it. PyYAML is imported here rather than at
+    # the top of the module since it's slow to import and not every
+    # invocation (e.g., --help) needs it.
+    import yaml
+
     try:
         with open(config_path, "r") as config_file:
             return yaml.safe_load(config_file)
@@ -18,3 +18,113 @@ except KeyError:
     PROJECT_CONFIG_HOME = os.path.join(
         os.environ["HOME"], ".config/", "saltant-cli"
     )
+
+# Base of XDG cache files
+try:
+    PROJECT_CACHE_HOME = os.path.join(
+        os.environ["XDG_CACHE_HOME"], "saltant-cli"
+    )
+except KeyError:
+    PROJECT_CACHE_HOME = os.path.join(
+        os.environ["HOME"], ".cache/", "saltant-cli"
+    )
+
+# Base of XDG runtime files (falling back to the cache directory if
+# there's no runtime directory)
+try:
+    PROJECT_RUNTIME_HOME = os.path.join(
+        os.environ["XDG_RUNTIME_DIR"], "saltant-cli"
+    )
+except KeyError:
+    PROJECT_RUNTIME_HOME = PROJECT_CACHE_HOME
+
+# Name of the local cache database file
+CACHE_FILE_NAME = "cache.sqlite3"
+
+# Name of the local metadata (task types, queues, etc.) cache database
+# file
+METADATA_CACHE_FILE_NAME = "metadata.sqlite3"
+
+# Name of the database file indexing locally cached logs and results,
+# and of the directory they're stored in
+ARTIFACT_CACHE_FILE_NAME = "artifacts.sqlite3"
+ARTIFACT_CACHE_DIR_NAME = "artifacts"
+
+# Name of the local mirror database file
+MIRROR_FILE_NAME = "mirror.sqlite3"
+
+# How many objects to request per page when syncing the local mirror
+DEFAULT_SYNC_PAGE_SIZE = 1000
+
+# Default maximum size of the finished task instance cache in megabytes
+DEFAULT_TASK_INSTANCE_CACHE_MAX_MEGABYTES = 100
+
+# Default maximum size of the logs and results cache in megabytes
+DEFAULT_ARTIFACT_CACHE_MAX_MEGABYTES = 1000
+
+# Default number of seconds to trust cached metadata for before
+# revalidating it with the server
+DEFAULT_METADATA_CACHE_TTL = 300
+
+# Name of the interactive shell's history file (kept in the cache
+# directory) and how many lines of history to keep
+SHELL_HISTORY_FILE_NAME = "shell_history"
+SHELL_HISTORY_LENGTH = 1000
+
+# Names of the background daemon's socket and log files
+DAEMON_SOCKET_FILE_NAME = "daemon.sock"
+DAEMON_LOG_FILE_NAME = "daemon.log"
+
+# How many seconds to give the daemon to pick up a command before
+# running it in-process instead (e.g., because the daemon is busy)
+DAEMON_ACCEPT_TIMEOUT = 0.5
+
+# Environment variable which, when set, stops commands from being
+# forwarded to the daemon
+NO_DAEMON_ENV_VAR = "SALTANT_CLI_NO_DAEMON"
+
+# Default transport settings: how many connections to keep alive per
+# host (requests' default), how many seconds to wait to connect and for
+# responses, and how many times to retry failed requests, backing off
+# exponentially from the given number of seconds
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 90
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF_FACTOR = 0.5
+
+# How many requests commands which make many at once make at once by
+# default
+DEFAULT_CONCURRENCY = 8
+
+# Response statuses worth retrying a request after: the server is
+# overloaded, rate limiting, or briefly unavailable
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# How many objects to request per page when streaming list queries
+DEFAULT_PAGE_SIZE = 100
+
+# How many objects to look at when sizing the columns of a streamed
+# table
+TABLE_SAMPLE_SIZE = 100
+
+# Tables with at most this many rows are laid out by tabulate; bigger
+# ones by saltant-cli's own, faster renderer
+TABULATE_MAX_ROWS = 1000
+
+# How many characters of a value to show in a table before truncating
+# it, unless configured otherwise
+DEFAULT_MAX_COLUMN_WIDTH = 50
+
+# Formats commands can display objects in. Everything other than
+# "table" is a machine-readable format.
+OUTPUT_FORMATS = ("table", "json", "jsonl", "csv", "tsv")
+
+# Where commands can get objects from: the server, or the local mirror
+REMOTE = "remote"
+LOCAL = "local"
+SOURCES = (REMOTE, LOCAL)
+
+# How many identifiers to put in a single "__in" filter. This keeps
+# request URLs comfortably short.
+IN_FILTER_CHUNK_SIZE = 100
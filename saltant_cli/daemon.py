@@ -0,0 +1,568 @@
+"""Contains the background daemon and the thin client which uses it.
+
+The daemon is a long-running saltant-cli process which holds a warm
+client (with its pool of keep-alive connections) and the local caches.
+When it's running, saltant-cli forwards its command line to the
+daemon over a Unix domain socket and streams back whatever the command
+outputs, skipping reading the config file, importing most of the
+program, and connecting to the server.
+
+Both ends speak newline-delimited JSON. The thin client sends a single
+request, e.g.,
+
+    {"command": "run", "args": ["task-queues", "get", "1"], "cwd": "/",
+     "terminal": {"stdout": true, "stderr": true, "size": [80, 24]}}
+
+and the daemon responds with {"accepted": true} once it picks the
+request up. If the thin client is still waiting at that point, it
+confirms with {"confirmed": true} (otherwise it runs the command
+itself, and the daemon drops it), and the daemon responds with frames
+of output ({"stdout": "..."} and {"stderr": "..."}) and finally
+{"exit": 0}.
+
+This module is imported by every saltant-cli invocation, so it only
+imports what's needed to talk to the daemon.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import errno
+import io
+import json
+import os
+import socket
+import sys
+import time
+from .constants import (
+    DAEMON_ACCEPT_TIMEOUT,
+    DAEMON_SOCKET_FILE_NAME,
+    NO_DAEMON_ENV_VAR,
+    PROJECT_RUNTIME_HOME,
+)
+
+# Commands which need to run in the invoking process
+LOCAL_COMMANDS = frozenset(["completion", "daemon", "shell"])
+
+# Subcommands which need to run in the invoking process (downloading
+# logs and results, which may well be binary and are best not shipped
+# through the daemon, and watching, which redraws the terminal and would
+# tie up the daemon for as long as it runs)
+LOCAL_SUBCOMMANDS = frozenset(["logs", "results", "watch"])
+
+# Subcommands which show their output in a pager when run in a terminal,
+# which the daemon can't start in the invoking process's terminal
+PAGED_SUBCOMMANDS = frozenset(["get", "list"])
+
+# Global options which need to run in the invoking process
+LOCAL_OPTIONS = frozenset(["-c", "--config-path", "--setup"])
+
+# Global options which take a value
+VALUED_OPTIONS = frozenset(
+    [
+        "-c",
+        "--config-path",
+        "-o",
+        "--output",
+        "--source",
+        "--max-connections",
+        "--concurrency",
+        "--trace",
+    ]
+)
+
+# Environment variables giving the terminal's columns and lines
+TERMINAL_SIZE_ENV_VARS = ("COLUMNS", "LINES")
+
+# How many seconds the daemon waits for a thin client's request
+DAEMON_REQUEST_TIMEOUT = 5.0
+
+
+def get_socket_path():
+    """Get the path to the daemon's socket.
+
+    Returns:
+        A string containing the path to the socket.
+    """
+    return os.path.join(PROJECT_RUNTIME_HOME, DAEMON_SOCKET_FILE_NAME)
+
+
+def is_supported():
+    """Check whether the daemon is supported on this platform.
+
+    Returns:
+        A boolean specifying whether Unix domain sockets are available.
+    """
+    return hasattr(socket, "AF_UNIX")
+
+
+def should_forward(args, interactive=False):
+    """Check whether a command line can be run by the daemon.
+
+    Commands which need the invoking process's terminal or stdin, or a
+    config other than the daemon's, are run in-process.
+
+    Args:
+        args: A list of strings containing the command line arguments.
+        interactive: A boolean specifying whether the invoking process
+            is reading from and writing to a terminal, in which case
+            commands which would use a pager are run in-process.
+
+    Returns:
+        A boolean specifying whether to forward the command line.
+    """
+    if "-" in args:
+        # Reads from stdin
+        return False
+
+    skip_value = False
+    command = None
+
+    for arg in args:
+        if skip_value:
+            skip_value = False
+        elif command is not None:
+            # The subcommand decides
+            if interactive and arg in PAGED_SUBCOMMANDS:
+                return False
+
+            return arg not in LOCAL_SUBCOMMANDS
+        elif arg in LOCAL_OPTIONS or arg.startswith("--config-path="):
+            return False
+        elif arg in VALUED_OPTIONS:
+            skip_value = True
+        elif not arg.startswith("-"):
+            if arg in LOCAL_COMMANDS:
+                return False
+
+            command = arg
+
+    return True
+
+
+def send_frame(stream, frame):
+    """Send a frame over a socket.
+
+    Args:
+        stream: A file-like object for the socket.
+        frame: A JSON-encodable dictionary.
+    """
+    stream.write((json.dumps(frame) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+def read_frame(stream):
+    """Read a frame from a socket.
+
+    Args:
+        stream: A file-like object for the socket.
+
+    Returns:
+        A dictionary containing the frame, or None if the other end
+        closed the connection.
+    """
+    line = stream.readline()
+
+    if not line:
+        return None
+
+    return json.loads(line.decode("utf-8"))
+
+
+def connect(timeout=DAEMON_ACCEPT_TIMEOUT):
+    """Connect to the daemon.
+
+    Args:
+        timeout: A float containing how many seconds to wait on the
+            socket before giving up.
+
+    Returns:
+        A socket.socket object, or None if no daemon is listening.
+    """
+    socket_path = get_socket_path()
+
+    if not is_supported() or not os.path.exists(socket_path):
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+
+    try:
+        connection.connect(socket_path)
+    except socket.error:
+        connection.close()
+        return None
+
+    return connection
+
+
+def request(frame, timeout=DAEMON_ACCEPT_TIMEOUT):
+    """Make a request of the daemon which has a single response.
+
+    Args:
+        frame: A dictionary containing the request.
+        timeout: A float containing how many seconds to wait for each
+            response from the daemon.
+
+    Returns:
+        A dictionary containing the daemon's response, or None if no
+        daemon responded.
+    """
+    connection = connect(timeout)
+
+    if connection is None:
+        return None
+
+    try:
+        stream = connection.makefile("rwb")
+        send_frame(stream, frame)
+
+        if read_frame(stream) is None:
+            return None
+
+        return read_frame(stream)
+    except (socket.error, ValueError):
+        return None
+    finally:
+        connection.close()
+
+
+def get_terminal():
+    """Describe the terminal the invoking process is running in.
+
+    Returns:
+        A dictionary containing whether stdout ("stdout") and stderr
+        ("stderr") are terminals, and the terminal's size ("size") as a
+        list of columns and lines, or None if it can't be found out.
+    """
+    try:
+        from shutil import get_terminal_size
+    except ImportError:
+        # Python 2
+        size = None
+    else:
+        size = list(get_terminal_size())
+
+    return {
+        "stdout": sys.stdout.isatty(),
+        "stderr": sys.stderr.isatty(),
+        "size": size,
+    }
+
+
+def forward_command_line(args):
+    """Run a command line in the daemon, if one is running.
+
+    Args:
+        args: A list of strings containing the command line arguments.
+
+    Returns:
+        An integer containing the command's exit code, or None if the
+        command line wasn't run by the daemon (and so should be run
+        in-process).
+    """
+    interactive = sys.stdin.isatty() and sys.stdout.isatty()
+
+    if os.environ.get(NO_DAEMON_ENV_VAR) or not should_forward(
+        args, interactive
+    ):
+        return None
+
+    connection = connect()
+
+    if connection is None:
+        return None
+
+    try:
+        stream = connection.makefile("rwb")
+
+        # Give up if the daemon doesn't pick the command up quickly
+        try:
+            send_frame(
+                stream,
+                {
+                    "command": "run",
+                    "args": args,
+                    "cwd": os.getcwd(),
+                    "terminal": get_terminal(),
+                },
+            )
+
+            if read_frame(stream) is None:
+                return None
+
+            send_frame(stream, {"confirmed": True})
+        except (socket.error, ValueError):
+            return None
+
+        # The command can take as long as it needs from here on
+        connection.settimeout(None)
+
+        try:
+            while True:
+                frame = read_frame(stream)
+
+                if frame is None:
+                    sys.stderr.write("Lost connection to the daemon\n")
+                    return 1
+                elif "stdout" in frame:
+                    sys.stdout.write(frame["stdout"])
+                    sys.stdout.flush()
+                elif "stderr" in frame:
+                    sys.stderr.write(frame["stderr"])
+                    sys.stderr.flush()
+                elif "exit" in frame:
+                    return frame["exit"]
+        except IOError as e:
+            if e.errno != errno.EPIPE:
+                raise
+
+            # Whatever was reading our output (e.g., head) has stopped,
+            # so stop too, without complaining when stdout is flushed
+            # on the way out
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    finally:
+        connection.close()
+
+
+class FrameWriter(object):
+    """A text stream which sends what's written to it as frames.
+
+    The daemon swaps this in for stdout and stderr while it runs a
+    command, so the command's output ends up at the thin client.
+
+    Attributes:
+        stream: A file-like object for the socket.
+        name: A string containing the name of the stream being stood
+            in for ("stdout" or "stderr").
+        is_terminal: A boolean specifying whether the thin client's
+            stream is a terminal.
+        encoding: A string containing the stream's encoding.
+        errors: A string containing the stream's encoding error
+            handling.
+    """
+
+    encoding = "utf-8"
+    errors = "strict"
+
+    def __init__(self, stream, name, is_terminal=False):
+        """Initialize the writer.
+
+        Args:
+            stream: A file-like object for the socket.
+            name: A string containing the name of the stream being
+                stood in for ("stdout" or "stderr").
+            is_terminal: A boolean specifying whether the thin client's
+                stream is a terminal.
+        """
+        self.stream = stream
+        self.name = name
+        self.is_terminal = is_terminal
+
+    def write(self, text):
+        """Send text to the thin client.
+
+        Like a real text stream, this raises a TypeError if given bytes
+        on Python 3 (which is what Click checks for).
+
+        Args:
+            text: A string to write.
+        """
+        if isinstance(text, bytes) and not isinstance(text, str):
+            raise TypeError("write() argument must be str, not bytes")
+
+        if text:
+            send_frame(self.stream, {self.name: text})
+
+    def flush(self):
+        """Do nothing, since nothing is buffered."""
+        pass
+
+    def isatty(self):
+        """Report whether the thin client's stream is a terminal.
+
+        Returns:
+            A boolean specifying whether it's a terminal.
+        """
+        return self.is_terminal
+
+
+class DaemonServer(object):
+    """Serves commands sent by thin clients over a Unix domain socket.
+
+    Commands are run one at a time, in this process. Thin clients which
+    find the daemon busy run their command themselves instead.
+
+    Attributes:
+        listener: A listening socket.socket object.
+        socket_path: A string containing the path to the socket.
+        run_command: A function taking a list of command line arguments
+            which runs the command and returns its exit code.
+        after_command: A function to call after each command.
+        start_time: A float containing when the daemon started.
+        commands_run: An integer containing how many commands have
+            been run.
+        running: A boolean specifying whether to keep serving.
+    """
+
+    def __init__(self, socket_path, run_command, after_command=None):
+        """Start listening on the socket.
+
+        Args:
+            socket_path: A string containing the path to the socket. Any
+                (stale) file at the path is replaced.
+            run_command: A function taking a list of command line
+                arguments which runs the command and returns its exit
+                code.
+            after_command: An optional function to call after each
+                command.
+        """
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        # Only let the user who started the daemon connect to it, since
+        # it runs commands with their auth token
+        old_umask = os.umask(0o177)
+
+        try:
+            self.listener.bind(socket_path)
+        finally:
+            os.umask(old_umask)
+
+        self.listener.listen(16)
+
+        self.socket_path = socket_path
+        self.run_command = run_command
+        self.after_command = after_command
+        self.start_time = time.time()
+        self.commands_run = 0
+        self.running = True
+
+    def serve_forever(self):
+        """Serve requests until asked to stop."""
+        try:
+            while self.running:
+                connection, _ = self.listener.accept()
+
+                try:
+                    self.handle(connection)
+                except (socket.error, IOError, ValueError) as e:
+                    # Most likely the thin client went away
+                    sys.__stderr__.write("Dropped request: %s\n" % e)
+                finally:
+                    connection.close()
+        finally:
+            self.listener.close()
+
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def status(self):
+        """Get the daemon's status.
+
+        Returns:
+            A dictionary containing the daemon's process ID, uptime in
+            seconds, and the number of commands it has run.
+        """
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.start_time,
+            "commands_run": self.commands_run,
+        }
+
+    def handle(self, connection):
+        """Handle a request from a thin client.
+
+        Args:
+            connection: A socket.socket object connected to the thin
+                client.
+        """
+        # Don't let a thin client that never sends its request hold
+        # everyone else up
+        connection.settimeout(DAEMON_REQUEST_TIMEOUT)
+
+        stream = connection.makefile("rwb")
+        frame = read_frame(stream)
+
+        if frame is None:
+            return
+
+        send_frame(stream, {"accepted": True})
+
+        if frame.get("command") == "run":
+            # Make sure the thin client didn't give up on us while it
+            # was waiting, so that the command doesn't get run twice
+            if read_frame(stream) is None:
+                return
+
+            connection.settimeout(None)
+            send_frame(stream, {"exit": self.run(stream, frame)})
+        elif frame.get("command") == "status":
+            send_frame(stream, self.status())
+        elif frame.get("command") == "stop":
+            self.running = False
+            send_frame(stream, self.status())
+        else:
+            send_frame(stream, {"error": "unknown command"})
+
+    def run(self, stream, frame):
+        """Run a command, sending its output to the thin client.
+
+        Args:
+            stream: A file-like object for the socket.
+            frame: A dictionary containing the command line arguments
+                ("args"), working directory ("cwd"), and description of
+                the thin client's terminal ("terminal") to run the
+                command with.
+
+        Returns:
+            An integer containing the command's exit code.
+        """
+        saved_streams = sys.stdin, sys.stdout, sys.stderr
+        saved_cwd = os.getcwd()
+        saved_size = {
+            name: os.environ.get(name) for name in TERMINAL_SIZE_ENV_VARS
+        }
+        terminal = frame.get("terminal") or {}
+
+        try:
+            os.chdir(frame.get("cwd") or saved_cwd)
+        except OSError as e:
+            send_frame(stream, {"stderr": "Error: %s\n" % e})
+            return 1
+
+        # Commands can't read from the thin client's stdin, so anything
+        # trying to (e.g., a confirmation prompt) sees it as closed
+        sys.stdin = io.StringIO()
+        sys.stdout = FrameWriter(
+            stream, "stdout", bool(terminal.get("stdout"))
+        )
+        sys.stderr = FrameWriter(
+            stream, "stderr", bool(terminal.get("stderr"))
+        )
+
+        # Terminal sizes are looked up in the environment before the
+        # daemon's own terminal (which it doesn't have)
+        if terminal.get("size"):
+            for name, value in zip(TERMINAL_SIZE_ENV_VARS, terminal["size"]):
+                os.environ[name] = str(value)
+
+        try:
+            return self.run_command(list(frame.get("args", [])))
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.chdir(saved_cwd)
+
+            for name, value in saved_size.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+            self.commands_run += 1
+
+            if self.after_command is not None:
+                self.after_command()
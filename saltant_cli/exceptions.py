@@ -5,3 +5,21 @@ class ConfigFileNotFound(Exception):
     """Raised when a config file can't be found."""
 
     pass
+
+
+class NotInMirror(Exception):
+    """Raised when an object isn't in the local mirror."""
+
+    pass
+
+
+class DownloadFailed(Exception):
+    """Raised when a task instance's logs or results can't be fetched."""
+
+    pass
+
+
+class ArtifactNotFound(DownloadFailed):
+    """Raised when a task instance's logs or results don't exist."""
+
+    pass
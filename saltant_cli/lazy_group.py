@@ -0,0 +1,126 @@
+"""Contains a command group which loads its subcommands on demand."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import importlib
+import click
+
+
+class LazyGroup(click.Group):
+    """A command group which only imports subcommands when they're used.
+
+    Importing every subcommand module (and everything those modules
+    import) up front dominates the startup time of the CLI, so instead
+    subcommands are registered by import path and are only imported
+    when Click resolves them.
+
+    Attributes:
+        lazy_subcommands: A dictionary mapping subcommand names to
+            two-tuples containing an import path of the form
+            "package.module:attribute" and a short help string to show
+            in the group's help text.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the group.
+
+        Args:
+            *args: Positional arguments for click.Group.
+            **kwargs: Keyword arguments for click.Group, plus an
+                optional lazy_subcommands dictionary as described in
+                the class docstring.
+        """
+        self.lazy_subcommands = kwargs.pop("lazy_subcommands", {})
+
+        super(LazyGroup, self).__init__(*args, **kwargs)
+
+    def list_commands(self, ctx):
+        """List the names of all subcommands, loaded or not.
+
+        Args:
+            ctx: A click.core.Context object containing information
+                about the Click session.
+
+        Returns:
+            A sorted list of subcommand names.
+        """
+        eager_commands = super(LazyGroup, self).list_commands(ctx)
+
+        return sorted(set(eager_commands) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        """Get a subcommand, importing it if necessary.
+
+        Args:
+            ctx: A click.core.Context object containing information
+                about the Click session.
+            cmd_name: A string containing the name of the subcommand.
+
+        Returns:
+            A click.Command object, or None if there is no such
+            subcommand.
+        """
+        if cmd_name not in self.commands and cmd_name in self.lazy_subcommands:
+            self.add_command(self.load_command(cmd_name), cmd_name)
+
+        return super(LazyGroup, self).get_command(ctx, cmd_name)
+
+    def load_command(self, cmd_name):
+        """Import a lazily registered subcommand.
+
+        Args:
+            cmd_name: A string containing the name of the subcommand.
+
+        Returns:
+            The click.Command object found at the subcommand's import
+            path.
+        """
+        import_path, _ = self.lazy_subcommands[cmd_name]
+        module_name, attr_name = import_path.split(":")
+
+        return getattr(importlib.import_module(module_name), attr_name)
+
+    def format_commands(self, ctx, formatter):
+        """Write the subcommand list into the help text.
+
+        This uses the short help strings registered with the lazy
+        subcommands so that running --help doesn't import everything.
+
+        Args:
+            ctx: A click.core.Context object containing information
+                about the Click session.
+            formatter: A click.formatting.HelpFormatter object to
+                write to.
+        """
+        commands = []
+
+        for cmd_name in self.list_commands(ctx):
+            if cmd_name in self.commands:
+                cmd = self.commands[cmd_name]
+
+                if cmd.hidden:
+                    continue
+
+                commands.append((cmd_name, cmd))
+            else:
+                commands.append((cmd_name, None))
+
+        if not commands:
+            return
+
+        # Same spacing Click uses for its own command listings
+        limit = formatter.width - 6 - max(len(cmd[0]) for cmd in commands)
+
+        rows = []
+
+        for cmd_name, cmd in commands:
+            if cmd is None:
+                help = self.lazy_subcommands[cmd_name][1]
+            else:
+                help = cmd.get_short_help_str(limit)
+
+            rows.append((cmd_name, help))
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
@@ -5,24 +5,81 @@ from __future__ import division
 from __future__ import print_function
 import errno
 import os
+import sys
+import time
 import click
-import click_completion
-from saltant.client import Client
-import yaml
 from .config import parse_config_file
-from .constants import CONFIG_FILE_NAME, PROJECT_CONFIG_HOME
-from .exceptions import ConfigFileNotFound
-from .subcommands.completion import completion
-from .subcommands.task_instances import (
-    container_task_instances,
-    executable_task_instances,
+from .constants import (
+    CONFIG_FILE_NAME,
+    LOCAL,
+    OUTPUT_FORMATS,
+    PROJECT_CONFIG_HOME,
+    SOURCES,
 )
-from .subcommands.task_queues import task_queues
-from .subcommands.task_types import container_task_types, executable_task_types
-from .subcommands.task_whitelists import task_whitelists
-from .subcommands.users import users
+from .daemon import forward_command_line
+from .exceptions import ConfigFileNotFound
+from .lazy_group import LazyGroup
+from .timings import PROCESS_START_TIME, Recorder, measure
 from .version import NAME, VERSION
 
+# Subcommands of the main group. Each subcommand maps to the import
+# path of its command group and the short help to show for it in the
+# main group's help text; the command group itself is only imported
+# when it's actually used.
+SUBCOMMANDS = {
+    "cache": (
+        "saltant_cli.subcommands.cache:cache",
+        "Command group for the local caches.",
+    ),
+    "completion": (
+        "saltant_cli.subcommands.completion:completion",
+        "Shell completion for click-completion-command.",
+    ),
+    "container-task-instances": (
+        "saltant_cli.subcommands.task_instances:container_task_instances",
+        "Command group for container task instances.",
+    ),
+    "container-task-types": (
+        "saltant_cli.subcommands.task_types:container_task_types",
+        "Command group for container task types.",
+    ),
+    "daemon": (
+        "saltant_cli.subcommands.daemon:daemon",
+        "Command group for the background daemon.",
+    ),
+    "executable-task-instances": (
+        "saltant_cli.subcommands.task_instances:executable_task_instances",
+        "Command group for executable task instances.",
+    ),
+    "executable-task-types": (
+        "saltant_cli.subcommands.task_types:executable_task_types",
+        "Command group for executable task types.",
+    ),
+    "shell": (
+        "saltant_cli.subcommands.shell:shell",
+        "Run commands interactively, reusing one client.",
+    ),
+    "sync": (
+        "saltant_cli.subcommands.sync:sync",
+        "Sync the local mirror (or just the resources named).",
+    ),
+    "task-queues": (
+        "saltant_cli.subcommands.task_queues:task_queues",
+        "Command group for task queues.",
+    ),
+    "task-whitelists": (
+        "saltant_cli.subcommands.task_whitelists:task_whitelists",
+        "Command group for task whitelists.",
+    ),
+    "users": (
+        "saltant_cli.subcommands.users:users",
+        "Command group for users.",
+    ),
+}
+
+# The environment variable shells set when asking for completions
+COMPLETE_VAR = "_%s_COMPLETE" % NAME.replace("-", "_").upper()
+
 
 def setup_config(ctx, param, value):
     """Set up file config and exit.
@@ -71,7 +128,10 @@ def setup_config(ctx, param, value):
         else:
             raise
 
-    # Write to the file
+    # Write to the file. PyYAML is slow to import, so only bring it in
+    # when we need it.
+    import yaml
+
     with open(config_file_path, "w") as config_file:
         yaml.dump(config_dict, config_file, default_flow_style=False)
 
@@ -81,7 +141,39 @@ def setup_config(ctx, param, value):
     ctx.exit()
 
 
-@click.group(help="saltant CLI")
+def install_recorder(ctx, recorder, timings, trace_path):
+    """Record what the client does, reporting it when the command ends.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        recorder: A saltant_cli.timings.Recorder object.
+        timings: A boolean specifying whether to show where the time
+            went.
+        trace_path: A string (or None) containing a path to write a
+            Chrome trace to.
+    """
+    client = ctx.obj["client"]
+    recorder.install(client)
+
+    def report():
+        # The client outlives the command when run from the shell
+        recorder.uninstall(client)
+
+        if timings:
+            click.echo(recorder.report(), err=True)
+
+        if trace_path:
+            try:
+                with open(trace_path, "w") as trace_file:
+                    recorder.write_trace(trace_file)
+            except (IOError, OSError) as e:
+                click.echo("Couldn't write trace: %s" % e, err=True)
+
+    ctx.call_on_close(report)
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=SUBCOMMANDS, help="saltant CLI")
 @click.option(
     "-c",
     "--config-path",
@@ -89,6 +181,69 @@ def setup_config(ctx, param, value):
     default=None,
     type=click.Path(),
 )
+@click.option(
+    "-o",
+    "--output",
+    "output_format",
+    help="Output format for commands which display objects.",
+    default="table",
+    show_default=True,
+    type=click.Choice(OUTPUT_FORMATS),
+)
+@click.option(
+    "--no-cache",
+    help="Don't read from or write to the local cache.",
+    is_flag=True,
+)
+@click.option(
+    "--source",
+    help=(
+        "Where to get objects from: the server (remote), or the local "
+        "mirror kept up to date by the sync command (local)."
+    ),
+    default="remote",
+    show_default=True,
+    type=click.Choice(SOURCES),
+)
+@click.option(
+    "--offline",
+    help="Same as --source local.",
+    is_flag=True,
+)
+@click.option(
+    "--max-connections",
+    help=(
+        "Most connections to the server to keep alive at once. Overrides "
+        "the config file's transport.pool-maxsize."
+    ),
+    default=None,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--concurrency",
+    help=(
+        "Most requests to make at once in commands which make many "
+        "(e.g., batch and wait-all commands). Overrides their --workers "
+        "option."
+    ),
+    default=None,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--timings",
+    help=(
+        "Show where the time went on exit: each phase of the command and "
+        "each request made to the server."
+    ),
+    is_flag=True,
+)
+@click.option(
+    "--trace",
+    "trace_path",
+    help="Write where the time went to a Chrome trace-event JSON file.",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+)
 @click.option(
     "--setup",
     help="Set up config file and exit.",
@@ -99,7 +254,18 @@ def setup_config(ctx, param, value):
 )
 @click.version_option(version=VERSION, prog_name=NAME)
 @click.pass_context
-def main(ctx, config_path):
+def main(
+    ctx,
+    config_path,
+    output_format,
+    no_cache,
+    source,
+    offline,
+    max_connections,
+    concurrency,
+    timings,
+    trace_path,
+):
     """Main entry point for saltant CLI.
 
     Args:
@@ -107,33 +273,118 @@ def main(ctx, config_path):
             the Click session.
         config_path: A string (or None) containing an explicit path to a
             config file.
+        output_format: A string containing the name of the format to
+            display objects in.
+        no_cache: A boolean specifying whether to bypass the local
+            cache.
+        source: A string containing where to get objects from (one of
+            SOURCES).
+        offline: A boolean specifying whether to get objects from the
+            local mirror, regardless of source.
+        max_connections: An integer (or None) containing the most
+            connections to the server to keep alive at once.
+        concurrency: An integer (or None) containing the most requests
+            to make at once in commands which make many.
+        timings: A boolean specifying whether to show where the time
+            went on exit.
+        trace_path: A string (or None) containing a path to write a
+            Chrome trace of where the time went to.
     """
-    # Load in the config file
-    try:
-        config_dict = parse_config_file(config_path)
-    except ConfigFileNotFound:
-        # Error! Get out!
-        click.echo("No config file found. Please run program with --setup.")
-        ctx.exit()
-
-    # Create a saltant session
     ctx.ensure_object(dict)
-    ctx.obj["client"] = Client(
-        base_api_url=config_dict["saltant-api-url"],
-        auth_token=config_dict["saltant-auth-token"],
-        test_if_authenticated=False,
-    )
+
+    recorder = None
+
+    if timings or trace_path:
+        recorder = Recorder()
+
+    # Commands run from the shell reuse the shell's config and client
+    if "client" not in ctx.obj:
+        if recorder is not None:
+            recorder.start_time = PROCESS_START_TIME
+            recorder.add("startup", "phase", PROCESS_START_TIME, time.time())
+
+        # Load in the config file
+        try:
+            with measure(recorder, "parse_config_file"):
+                config_dict = parse_config_file(config_path)
+        except ConfigFileNotFound:
+            # Error! Get out!
+            click.echo(
+                "No config file found. Please run program with --setup."
+            )
+            ctx.exit()
+
+        # Create a saltant session. The client is imported here since
+        # importing it (and requests along with it) is slow, and isn't
+        # needed just to show help text.
+        with measure(recorder, "client"):
+            from saltant.client import Client
+            from .transport import (
+                configure_session,
+                get_timeout,
+                parse_transport_config,
+            )
+
+            try:
+                transport = parse_transport_config(
+                    config_dict.get("transport"), max_connections
+                )
+            except ValueError as e:
+                click.echo("Invalid transport settings: %s" % e, err=True)
+                ctx.exit(1)
+
+            ctx.obj["client"] = Client(
+                base_api_url=config_dict["saltant-api-url"],
+                auth_token=config_dict["saltant-auth-token"],
+                default_timeout=get_timeout(transport),
+                test_if_authenticated=False,
+            )
+            configure_session(ctx.obj["client"].session, transport)
+
+        ctx.obj["config"] = config_dict
+    elif max_connections is not None:
+        # The shell's client is shared, so only ever grow its pool
+        from .concurrency import ensure_connection_pool_size
+
+        ensure_connection_pool_size(ctx.obj["client"], max_connections)
+
+    ctx.obj["output_format"] = output_format
+    ctx.obj["use_cache"] = not no_cache
+    ctx.obj["source"] = LOCAL if offline else source
+    ctx.obj["concurrency"] = concurrency
+
+    # Make sure nothing goes to the server when working locally. The
+    # client is replaced rather than modified, since commands run from
+    # the shell share it.
+    if ctx.obj["source"] == LOCAL:
+        from .mirror import make_offline_client
+
+        ctx.obj["client"] = make_offline_client(ctx.obj["client"])
+
+    ctx.obj["recorder"] = recorder
+
+    if recorder is not None:
+        install_recorder(ctx, recorder, timings, trace_path)
+
+
+def run():
+    """Run saltant CLI, handing the command off to a daemon if possible.
+
+    If a daemon is running (see the daemon command group), it runs the
+    command instead; otherwise the command is run in this process.
+    """
+    exit_code = forward_command_line(sys.argv[1:])
+
+    if exit_code is None:
+        main()
+    else:
+        sys.exit(exit_code)
 
 
-# Add in subcommands
-main.add_command(completion)
-main.add_command(container_task_instances)
-main.add_command(container_task_types)
-main.add_command(executable_task_instances)
-main.add_command(executable_task_types)
-main.add_command(task_queues)
-main.add_command(task_whitelists)
-main.add_command(users)
+# Enable the click_completion monkey patch, but only when a shell is
+# asking for completions (the completion command group enables it
+# itself when it's used)
+if COMPLETE_VAR in os.environ:
+    import click_completion
 
-# Enable click_completion monkey patch
-click_completion.init()
+    click_completion.init()
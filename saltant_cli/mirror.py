@@ -0,0 +1,786 @@
+"""Contains a local SQLite mirror of a saltant server's records.
+
+Unlike the caches, which hold whatever happens to have been fetched,
+the mirror holds every task instance, task type, and task queue on the
+server as of the last sync. Each record is stored as the raw data the
+API responded with, alongside columns for the fields worth querying
+by, which are indexed where that pays off.
+
+Task instances are synced incrementally: after the first full pull,
+only those created or finished since the latest ones in the mirror
+(its high-water marks) are fetched, along with those which haven't
+finished yet, since those are the only ones which can have changed.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import datetime
+import json
+import os
+import re
+import sqlite3
+import time
+import click
+import dateutil.parser
+import requests
+from dateutil.tz import tzutc
+from .cache import make_directories
+
+# Columns stored for each kind of record (besides its raw data). The
+# first column is the primary key.
+TASK_INSTANCE_COLUMNS = (
+    "uuid",
+    "name",
+    "state",
+    "user",
+    "task_queue",
+    "task_type",
+    "datetime_created",
+    "datetime_finished",
+)
+TASK_TYPE_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "user",
+    "datetime_created",
+    "command_to_run",
+)
+TASK_QUEUE_COLUMNS = (
+    "id",
+    "user",
+    "name",
+    "description",
+    "private",
+    "runs_executable_tasks",
+    "runs_docker_container_tasks",
+    "runs_singularity_container_tasks",
+    "active",
+)
+
+# Columns which don't hold text. Giving them numeric affinity means
+# filter values given as strings (e.g., "1") still match.
+INTEGER_COLUMNS = frozenset(["id", "task_queue", "task_type"])
+BOOLEAN_COLUMNS = frozenset(
+    [
+        "private",
+        "runs_executable_tasks",
+        "runs_docker_container_tasks",
+        "runs_singularity_container_tasks",
+        "active",
+    ]
+)
+
+# Columns of task instances to index
+TASK_INSTANCE_INDEXES = (
+    "state",
+    "task_queue",
+    "task_type",
+    "user",
+    "datetime_created",
+    "datetime_finished",
+)
+
+# What the mirror holds, keyed by the name of the saltant.client.Client
+# manager for each kind of record. Each maps to the columns stored for
+# it and the columns to index.
+MIRRORED_RESOURCES = collections.OrderedDict(
+    [
+        (
+            "container_task_instances",
+            (TASK_INSTANCE_COLUMNS, TASK_INSTANCE_INDEXES),
+        ),
+        (
+            "executable_task_instances",
+            (TASK_INSTANCE_COLUMNS, TASK_INSTANCE_INDEXES),
+        ),
+        ("container_task_types", (TASK_TYPE_COLUMNS, ())),
+        ("executable_task_types", (TASK_TYPE_COLUMNS, ())),
+        ("task_queues", (TASK_QUEUE_COLUMNS, ())),
+    ]
+)
+
+# Resources which are synced incrementally
+TASK_INSTANCE_RESOURCES = (
+    "container_task_instances",
+    "executable_task_instances",
+)
+
+INFO_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    created_high_water_mark TEXT,
+    finished_high_water_mark TEXT,
+    synced REAL NOT NULL
+);
+"""
+
+# How datetimes are stored, so that they sort (and compare) as text.
+# This is how the API formats them.
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+DATETIME_RE = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z$")
+
+# Django-style lookups which local queries support, mapped to SQL
+# templates for a column
+COMPARISON_LOOKUPS = {
+    "exact": "%s = ?",
+    "gt": "%s > ?",
+    "gte": "%s >= ?",
+    "lt": "%s < ?",
+    "lte": "%s <= ?",
+    "contains": "INSTR(%s, ?) > 0",
+    "icontains": "INSTR(LOWER(%s), LOWER(?)) > 0",
+    "startswith": "SUBSTR(%s, 1, LENGTH(?2)) = ?2",
+    "istartswith": "LOWER(SUBSTR(%s, 1, LENGTH(?2))) = LOWER(?2)",
+}
+LOOKUPS = frozenset(COMPARISON_LOOKUPS) | frozenset(["in", "isnull"])
+
+# Filters which don't select anything, and so are ignored locally
+IGNORED_FILTERS = frozenset(["page", "page_size", "fields"])
+
+# The state of the last sync of a resource
+SyncState = collections.namedtuple(
+    "SyncState",
+    ["created_high_water_mark", "finished_high_water_mark", "synced"],
+)
+
+
+def get_column_type(column):
+    """Get the SQLite type of a column.
+
+    Args:
+        column: A string containing the name of the column.
+
+    Returns:
+        A string containing the column's type.
+    """
+    if column in INTEGER_COLUMNS or column in BOOLEAN_COLUMNS:
+        return "INTEGER"
+
+    return "TEXT"
+
+
+def normalize_datetime(value):
+    """Convert a datetime into the form it's stored in.
+
+    Args:
+        value: A string containing a datetime in any format dateutil
+            understands (naive datetimes are taken to be in UTC), or a
+            datetime.datetime.
+
+    Returns:
+        A string containing the datetime formatted with
+        DATETIME_FORMAT in UTC.
+
+    Raises:
+        ValueError: The value isn't a datetime.
+    """
+    if not isinstance(value, datetime.datetime):
+        if DATETIME_RE.match(value):
+            # Already in shape
+            return value
+
+        value = dateutil.parser.parse(value)
+
+    if value.tzinfo is not None:
+        value = value.astimezone(tzutc()).replace(tzinfo=None)
+
+    return value.strftime(DATETIME_FORMAT)
+
+
+def parse_datetime(value):
+    """Parse a datetime in the form it's stored in.
+
+    Args:
+        value: A string containing a datetime formatted with
+            DATETIME_FORMAT.
+
+    Returns:
+        A timezone-aware datetime.datetime in UTC.
+    """
+    return datetime.datetime.strptime(value, DATETIME_FORMAT).replace(
+        tzinfo=tzutc()
+    )
+
+
+def convert_filter_value(column, value):
+    """Convert a filter value into what the column stores.
+
+    Args:
+        column: A string containing the name of the column.
+        value: The value given in the filters.
+
+    Returns:
+        The value to compare the column with.
+
+    Raises:
+        ValueError: The value can't be compared with the column.
+    """
+    if value is None:
+        return None
+
+    if column.startswith("datetime_"):
+        return normalize_datetime(str(value))
+
+    if column in BOOLEAN_COLUMNS and not isinstance(value, bool):
+        if str(value).lower() not in ("true", "false", "1", "0"):
+            raise ValueError("%s must be true or false" % column)
+
+        return str(value).lower() in ("true", "1")
+
+    return value
+
+
+def translate_filters(resource, filters):
+    """Translate API filters into a WHERE clause for a resource.
+
+    Filters are Django-style: a column name, optionally followed by
+    "__" and a lookup (see LOOKUPS).
+
+    Args:
+        resource: A string containing the name of a resource in
+            MIRRORED_RESOURCES.
+        filters: A dictionary containing API filters.
+
+    Returns:
+        A two-tuple containing a string of SQL conditions (joined by
+        AND, or "1" if there are none) and a list of their parameters.
+
+    Raises:
+        ValueError: A filter can't be answered locally.
+    """
+    columns = MIRRORED_RESOURCES[resource][0]
+    conditions = []
+    params = []
+
+    for key, value in sorted(filters.items()):
+        if key in IGNORED_FILTERS or key == "ordering":
+            continue
+
+        column, _, lookup = key.partition("__")
+        lookup = lookup or "exact"
+
+        if column not in columns:
+            raise ValueError("can't filter on %s locally" % column)
+
+        if lookup not in LOOKUPS:
+            raise ValueError("unsupported lookup %s" % key)
+
+        if lookup == "isnull":
+            is_null = str(value).lower() in ("true", "1")
+            conditions.append(
+                "%s IS %sNULL" % (column, "" if is_null else "NOT ")
+            )
+        elif lookup == "in":
+            if not isinstance(value, (list, tuple)):
+                value = str(value).split(",")
+
+            conditions.append(
+                "%s IN (%s)" % (column, ", ".join("?" * len(value)))
+                if value
+                else "0"
+            )
+            params.extend(convert_filter_value(column, item) for item in value)
+        elif value is None and lookup == "exact":
+            conditions.append("%s IS NULL" % column)
+        else:
+            # Number the parameter, since some templates use it twice
+            conditions.append(
+                COMPARISON_LOOKUPS[lookup].replace(
+                    "?2", "?%d" % (len(params) + 1)
+                )
+                % column
+            )
+            params.append(convert_filter_value(column, value))
+
+    return " AND ".join(conditions) or "1", params
+
+
+def translate_ordering(resource, ordering):
+    """Translate an API ordering into an ORDER BY clause.
+
+    Args:
+        resource: A string containing the name of a resource in
+            MIRRORED_RESOURCES.
+        ordering: A string (or None) containing comma-separated columns
+            to order by, each optionally prefixed with "-" to order in
+            descending order. If None, records are ordered by creation
+            (where that's known) and primary key.
+
+    Returns:
+        A string containing the SQL to order by.
+
+    Raises:
+        ValueError: The ordering uses columns the mirror doesn't have.
+    """
+    columns = MIRRORED_RESOURCES[resource][0]
+
+    if ordering is None:
+        if "datetime_created" in columns:
+            return "datetime_created, %s" % columns[0]
+
+        return columns[0]
+
+    terms = []
+
+    for field in str(ordering).split(","):
+        field = field.strip()
+        column = field.lstrip("-")
+
+        if column not in columns:
+            raise ValueError("can't order by %s locally" % column)
+
+        terms.append(column + (" DESC" if field.startswith("-") else ""))
+
+    return ", ".join(terms) or columns[0]
+
+
+def make_resource_schema(resource):
+    """Make the SQL to create the table (and indexes) for a resource.
+
+    Args:
+        resource: A string containing the name of a resource in
+            MIRRORED_RESOURCES.
+
+    Returns:
+        A string containing the SQL.
+    """
+    columns, indexes = MIRRORED_RESOURCES[resource]
+
+    schema = "CREATE TABLE IF NOT EXISTS %s (\n    %s %s PRIMARY KEY,\n" % (
+        resource,
+        columns[0],
+        get_column_type(columns[0]),
+    )
+    schema += "".join(
+        "    %s %s,\n" % (column, get_column_type(column))
+        for column in columns[1:]
+    )
+    schema += "    data TEXT NOT NULL\n);\n"
+    schema += "".join(
+        "CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s);\n"
+        % (resource, column, resource, column)
+        for column in indexes
+    )
+
+    return schema
+
+
+class Mirror(object):
+    """A local SQLite mirror of a saltant server's records.
+
+    Attributes:
+        path: A string containing the path to the SQLite database.
+        connection: An sqlite3.Connection object for the database.
+    """
+
+    def __init__(self, path):
+        """Open (creating if necessary) the mirror.
+
+        Args:
+            path: A string containing the path to the SQLite database.
+        """
+        make_directories(os.path.dirname(path))
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            INFO_SCHEMA
+            + "".join(
+                make_resource_schema(resource)
+                for resource in MIRRORED_RESOURCES
+            )
+        )
+
+    def get_server(self):
+        """Get the API URL of the server the mirror is of.
+
+        Returns:
+            A string containing the URL, or None if nothing has been
+            synced yet.
+        """
+        row = self.connection.execute(
+            "SELECT value FROM info WHERE key = 'server'"
+        ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def set_server(self, server):
+        """Set the API URL of the server the mirror is of.
+
+        Args:
+            server: A string containing the URL.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO info (key, value) VALUES ('server', ?)",
+            (server,),
+        )
+        self.connection.commit()
+
+    def upsert(self, resource, records):
+        """Insert or update records.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+            records: An iterable of dictionaries containing the raw data
+                of records, as the API responded with it.
+
+        Returns:
+            An integer containing the number of records written.
+        """
+        columns, _ = MIRRORED_RESOURCES[resource]
+        cursor = self.connection.executemany(
+            "INSERT OR REPLACE INTO %s (%s, data) VALUES (%s)"
+            % (
+                resource,
+                ", ".join(columns),
+                ", ".join("?" * (len(columns) + 1)),
+            ),
+            (
+                [
+                    (
+                        normalize_datetime(record[column])
+                        if column.startswith("datetime_")
+                        and record.get(column) is not None
+                        else record.get(column)
+                    )
+                    for column in columns
+                ]
+                + [json.dumps(record)]
+                for record in records
+            ),
+        )
+
+        return cursor.rowcount
+
+    def delete_missing(self, resource, keys):
+        """Delete the records of a resource which aren't in a set.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+            keys: A set containing the primary keys of the records to
+                keep.
+
+        Returns:
+            An integer containing the number of records deleted.
+        """
+        key_column = MIRRORED_RESOURCES[resource][0][0]
+        missing = [
+            (key,)
+            for (key,) in self.connection.execute(
+                "SELECT %s FROM %s" % (key_column, resource)
+            )
+            if key not in keys
+        ]
+
+        self.connection.executemany(
+            "DELETE FROM %s WHERE %s = ?" % (resource, key_column), missing
+        )
+
+        return len(missing)
+
+    def count(self, resource):
+        """Count the records of a resource.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+
+        Returns:
+            An integer containing the number of records.
+        """
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM %s" % resource
+        ).fetchone()[0]
+
+    def get_data(self, resource, key):
+        """Get the raw data of a record.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+            key: The primary key of the record.
+
+        Returns:
+            A dictionary containing the record's raw data, or None if
+            the mirror doesn't have it.
+        """
+        key_column = MIRRORED_RESOURCES[resource][0][0]
+        row = self.connection.execute(
+            "SELECT data FROM %s WHERE %s = ?" % (resource, key_column),
+            (key,),
+        ).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def select(self, resource, selected, filters=None, limit=None):
+        """Select records matching API filters.
+
+        The query is built (and so checked) straight away, but records
+        are only read as they're iterated through.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+            selected: A list of strings containing the columns to
+                select.
+            filters: An optional dictionary containing API filters
+                (including an "ordering").
+            limit: An optional integer containing the maximum number of
+                records to select.
+
+        Returns:
+            An sqlite3.Cursor over the selected columns.
+
+        Raises:
+            ValueError: The filters can't be answered locally.
+        """
+        filters = filters or {}
+        where, params = translate_filters(resource, filters)
+        query = "SELECT %s FROM %s WHERE %s ORDER BY %s" % (
+            ", ".join(selected),
+            resource,
+            where,
+            translate_ordering(resource, filters.get("ordering")),
+        )
+
+        if limit is not None:
+            query += " LIMIT %d" % limit
+
+        return self.connection.execute(query, params)
+
+    def iterate_data(self, resource, filters=None, limit=None):
+        """Iterate through the raw data of records matching API filters.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+            filters: An optional dictionary containing API filters.
+            limit: An optional integer containing the maximum number of
+                records to read.
+
+        Returns:
+            An iterator of dictionaries containing the records' raw
+            data.
+
+        Raises:
+            ValueError: The filters can't be answered locally.
+        """
+        cursor = self.select(resource, ["data"], filters, limit)
+
+        return (json.loads(data) for (data,) in cursor)
+
+    def iterate_rows(self, resource, fields, filters=None, limit=None):
+        """Iterate through projected rows of records matching API filters.
+
+        This is the local equivalent of
+        saltant_cli.pagination.iterate_rows. Fields which have a column
+        are read straight from it, skipping decoding the records' raw
+        data where possible.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+            fields: An iterable of strings containing the fields to get.
+            filters: An optional dictionary containing API filters.
+            limit: An optional integer containing the maximum number of
+                records to read.
+
+        Returns:
+            An iterator of collections.OrderedDict objects mapping the
+            fields to their values.
+
+        Raises:
+            ValueError: The filters can't be answered locally.
+        """
+        fields = list(fields)
+        columns = MIRRORED_RESOURCES[resource][0]
+        selected = [field for field in fields if field in columns]
+        needs_data = len(selected) < len(fields)
+
+        cursor = self.select(
+            resource,
+            selected + ["data"] if needs_data else selected,
+            filters,
+            limit,
+        )
+
+        def generate_rows():
+            for values in cursor:
+                found = dict(zip(selected, values))
+                data = json.loads(values[-1]) if needs_data else {}
+                row = collections.OrderedDict()
+
+                for field in fields:
+                    if field in found:
+                        value = found[field]
+
+                        if field.startswith("datetime_") and value is not None:
+                            value = parse_datetime(value)
+                        elif field in BOOLEAN_COLUMNS and value is not None:
+                            value = bool(value)
+                    else:
+                        value = data.get(field)
+
+                        if field.startswith("datetime_") and value is not None:
+                            value = dateutil.parser.parse(value)
+
+                    row[field] = value
+
+                yield row
+
+        return generate_rows()
+
+    def get_high_water_marks(self, resource):
+        """Find the latest creation and finishing times of task instances.
+
+        Args:
+            resource: A string containing the name of a task instance
+                resource.
+
+        Returns:
+            A two-tuple containing strings of the latest
+            datetime_created and datetime_finished (either of which is
+            None if there isn't one).
+        """
+        return self.connection.execute(
+            "SELECT MAX(datetime_created), MAX(datetime_finished) FROM %s"
+            % resource
+        ).fetchone()
+
+    def get_sync_state(self, resource):
+        """Get the state of the last sync of a resource.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+
+        Returns:
+            A SyncState object, or None if the resource has never been
+            synced.
+        """
+        row = self.connection.execute(
+            "SELECT created_high_water_mark, finished_high_water_mark, "
+            "synced FROM sync_state WHERE resource = ?",
+            (resource,),
+        ).fetchone()
+
+        return SyncState(*row) if row is not None else None
+
+    def record_sync(self, resource):
+        """Record that a resource has been synced, storing its marks.
+
+        Args:
+            resource: A string containing the name of a resource in
+                MIRRORED_RESOURCES.
+        """
+        if resource in TASK_INSTANCE_RESOURCES:
+            high_water_marks = self.get_high_water_marks(resource)
+        else:
+            high_water_marks = (None, None)
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sync_state (resource, "
+            "created_high_water_mark, finished_high_water_mark, synced) "
+            "VALUES (?, ?, ?, ?)",
+            (resource,) + tuple(high_water_marks) + (time.time(),),
+        )
+        self.connection.commit()
+
+    def clear(self, resources=None):
+        """Remove records and their sync state.
+
+        Args:
+            resources: An optional iterable of strings containing the
+                names of the resources in MIRRORED_RESOURCES to clear.
+                If None, everything is cleared, including which server
+                the mirror is of.
+        """
+        if resources is None:
+            resources = MIRRORED_RESOURCES
+            self.connection.execute("DELETE FROM info")
+
+        for resource in resources:
+            self.connection.execute("DELETE FROM %s" % resource)
+            self.connection.execute(
+                "DELETE FROM sync_state WHERE resource = ?", (resource,)
+            )
+
+        self.connection.commit()
+
+    def commit(self):
+        """Commit any writes."""
+        self.connection.commit()
+
+    def close(self):
+        """Commit any writes and close the mirror."""
+        self.connection.commit()
+        self.connection.close()
+
+
+class OfflineError(click.ClickException):
+    """Raised when something tries to reach the server while offline.
+
+    This is a Click exception so that commands which need the server
+    exit with this message, rather than a traceback.
+    """
+
+    pass
+
+
+class OfflineAdapter(requests.adapters.BaseAdapter):
+    """A transport adapter which refuses to make requests.
+
+    Mounted on a client's session when running against the local
+    mirror, so that anything which would go to the server fails fast
+    rather than waiting on a network which might not be there.
+    """
+
+    def send(self, request, **kwargs):
+        """Refuse to send a request.
+
+        Args:
+            request: The requests.PreparedRequest being sent.
+            **kwargs: The rest of the send arguments, which are ignored.
+
+        Raises:
+            OfflineError: Always.
+        """
+        raise OfflineError(
+            "Not requesting %s, since only the local mirror is being "
+            "used (see --source)" % request.url
+        )
+
+    def close(self):
+        """Do nothing, since there's nothing to clean up."""
+        pass
+
+
+def make_offline_client(client):
+    """Make a client which uses the same server but never connects to it.
+
+    Args:
+        client: A saltant.client.Client object.
+
+    Returns:
+        A new saltant.client.Client object for the same server, whose
+        requests all fail.
+    """
+    offline_client = type(client)(
+        base_api_url=client.base_api_url,
+        auth_token="",
+        test_if_authenticated=False,
+    )
+
+    for prefix in ("http://", "https://"):
+        offline_client.session.mount(prefix, OfflineAdapter())
+
+    return offline_client
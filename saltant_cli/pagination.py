@@ -0,0 +1,178 @@
+"""Contains functions for iterating through paginated list queries.
+
+saltant-py's list methods request every object in one giant page and
+only return once all of them have been decoded. The functions here
+instead walk through the API's pages one at a time, following each
+page's "next" link, so that callers can start processing objects as
+soon as the first page arrives.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import dateutil.parser
+from saltant.constants import HTTP_200_OK
+from .constants import DEFAULT_PAGE_SIZE
+
+# A page size big enough to get every object in one page. This is the
+# same "magic number" saltant-py uses: 2^63 - 1.
+ALL_OBJECTS_PAGE_SIZE = 9223372036854775807
+
+
+def encode_filters(filters):
+    """Encode API filters as query parameters.
+
+    Lists and tuples are encoded as comma-separated values, which is
+    what the API expects for "__in" lookups.
+
+    Args:
+        filters: A dictionary containing API filters.
+
+    Returns:
+        A dictionary mapping query parameter names to strings.
+    """
+    params = {}
+
+    for key, value in filters.items():
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(item) for item in value)
+
+        params[key] = str(value)
+
+    return params
+
+
+def iterate_pages(
+    manager, filters=None, page_size=DEFAULT_PAGE_SIZE, session=None
+):
+    """Iterate through the pages of a list query.
+
+    Args:
+        manager: A saltant.models.resource.ModelManager object to list
+            objects with.
+        filters: An optional dictionary containing API filters. If it
+            contains "page" or "page_size" keys, these take precedence
+            over the default starting page and the page_size argument.
+        page_size: An integer specifying how many objects to request
+            per page.
+        session: An optional object to make GET requests with in place
+            of the client's requests.Session (e.g., a
+            saltant_cli.cache.CachedSession object).
+
+    Yields:
+        Lists of dictionaries, each list containing the raw data of the
+        objects in one page.
+
+    Raises:
+        saltant.exceptions.BadHttpRequestError: A request for a page
+            failed.
+    """
+    params = {"page": 1, "page_size": page_size}
+    params.update(encode_filters(filters or {}))
+
+    request_url = manager._client.base_api_url + manager.list_url
+
+    if session is None:
+        session = manager._client.session
+
+    while request_url is not None:
+        response = session.get(request_url, params=params)
+
+        # Validate that the request was successful
+        manager.validate_request_success(
+            response_text=response.text,
+            request_url=response.url,
+            status_code=response.status_code,
+            expected_status_code=HTTP_200_OK,
+        )
+
+        response_data = response.json()
+
+        yield response_data["results"]
+
+        # The next page's URL already has all our query parameters
+        request_url = response_data["next"]
+        params = None
+
+
+def iterate_objects(
+    manager, filters=None, page_size=DEFAULT_PAGE_SIZE, session=None
+):
+    """Iterate through the objects of a list query.
+
+    Args:
+        manager: A saltant.models.resource.ModelManager object to list
+            objects with.
+        filters: An optional dictionary containing API filters.
+        page_size: An integer specifying how many objects to request
+            per page.
+        session: An optional object to make GET requests with in place
+            of the client's requests.Session.
+
+    Yields:
+        Model instances (for example, container task type model
+        instances) in the order the API lists them.
+    """
+    for page in iterate_pages(manager, filters, page_size, session):
+        for response_data in page:
+            yield manager.response_data_to_model_instance(response_data)
+
+
+def project(response_data, fields):
+    """Project an object's raw data down to some of its fields.
+
+    Fields missing from the data come out as None. As in saltant-py's
+    models, fields whose names start with "datetime_" are parsed into
+    datetimes.
+
+    Args:
+        response_data: A dictionary containing an object's raw data.
+        fields: An iterable of strings containing the fields to keep.
+
+    Returns:
+        A collections.OrderedDict mapping the fields to their values.
+    """
+    row = collections.OrderedDict()
+
+    for field in fields:
+        value = response_data.get(field)
+
+        if field.startswith("datetime_") and value is not None:
+            value = dateutil.parser.parse(value)
+
+        row[field] = value
+
+    return row
+
+
+def iterate_rows(
+    manager, fields, filters=None, page_size=DEFAULT_PAGE_SIZE, session=None
+):
+    """Iterate through projected rows of a list query.
+
+    The server is asked to only send the given fields. Servers which
+    don't support that send whole objects, which are projected here as
+    they arrive instead. Either way, rows are plain dictionaries rather
+    than model instances, since saltant-py's models need every field.
+
+    Args:
+        manager: A saltant.models.resource.ModelManager object to list
+            objects with.
+        fields: An iterable of strings containing the fields to get.
+        filters: An optional dictionary containing API filters.
+        page_size: An integer specifying how many objects to request
+            per page.
+        session: An optional object to make GET requests with in place
+            of the client's requests.Session.
+
+    Yields:
+        collections.OrderedDict objects mapping the fields to their
+        values, in the order the API lists the objects.
+    """
+    fields = list(fields)
+    filters = dict(filters or {}, fields=fields)
+
+    for page in iterate_pages(manager, filters, page_size, session):
+        for response_data in page:
+            yield project(response_data, fields)
@@ -0,0 +1,162 @@
+"""Contains adaptive polling for waiting on task instances."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import random
+import time
+from saltant.constants import TASK_INSTANCE_FINISH_STATUSES
+
+# Polling defaults
+DEFAULT_REFRESH_PERIOD = 1.0
+DEFAULT_MAX_REFRESH_PERIOD = 60.0
+DEFAULT_BACKOFF_FACTOR = 1.5
+DEFAULT_JITTER = 0.1
+
+
+class AdaptivePoller(object):
+    """Decides how long to wait in between polls.
+
+    The wait starts short and grows exponentially (up to a cap) for as
+    long as polls keep seeing nothing change, and drops back to the
+    initial period as soon as a poll sees a change. Each wait is
+    randomly jittered so that many pollers started at once don't all
+    hit the server at the same moments.
+
+    Attributes:
+        refresh_period: A float containing the initial number of
+            seconds to wait in between polls.
+        max_refresh_period: A float containing the maximum number of
+            seconds to wait in between polls.
+        backoff_factor: A float containing what to multiply the wait by
+            after each poll which sees no change. A factor of 1 polls at
+            a fixed period.
+        jitter: A float containing the maximum fraction by which to
+            randomly lengthen or shorten each wait.
+        period: A float containing the current (unjittered) number of
+            seconds to wait in between polls.
+        polls: An integer containing how many polls have been made.
+        resets: An integer containing how many times the period was
+            reset due to a change.
+        start_time: A float containing when polling started.
+    """
+
+    def __init__(
+        self,
+        refresh_period=DEFAULT_REFRESH_PERIOD,
+        max_refresh_period=DEFAULT_MAX_REFRESH_PERIOD,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        jitter=DEFAULT_JITTER,
+    ):
+        """Initialize the poller.
+
+        Args:
+            refresh_period: A float containing the initial number of
+                seconds to wait in between polls.
+            max_refresh_period: A float containing the maximum number
+                of seconds to wait in between polls.
+            backoff_factor: A float containing what to multiply the
+                wait by after each poll which sees no change.
+            jitter: A float containing the maximum fraction by which to
+                randomly lengthen or shorten each wait.
+        """
+        self.refresh_period = refresh_period
+        self.max_refresh_period = max(max_refresh_period, refresh_period)
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.period = refresh_period
+        self.polls = 0
+        self.resets = 0
+        self.start_time = time.time()
+
+    def record_poll(self, changed):
+        """Record a poll and adjust the period accordingly.
+
+        Args:
+            changed: A boolean specifying whether the poll saw anything
+                change since the previous poll.
+        """
+        self.polls += 1
+
+        if changed and self.period != self.refresh_period:
+            self.period = self.refresh_period
+            self.resets += 1
+        elif not changed:
+            self.period = min(
+                self.period * self.backoff_factor, self.max_refresh_period
+            )
+
+    def next_wait(self):
+        """Get the number of seconds to wait before the next poll.
+
+        Returns:
+            A float containing the jittered wait in seconds.
+        """
+        return self.period * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def wait(self):
+        """Sleep until it's time for the next poll."""
+        time.sleep(self.next_wait())
+
+    def summary(self):
+        """Summarize the polls made.
+
+        Returns:
+            A string describing the polls made.
+        """
+        return (
+            "%d polls over %.1fs; polling period reset %d times, ending at "
+            "%.1fs"
+            % (
+                self.polls,
+                time.time() - self.start_time,
+                self.resets,
+                self.period,
+            )
+        )
+
+
+def wait_until_finished(manager, uuid, poller, on_poll=None):
+    """Wait until a task instance is finished, polling adaptively.
+
+    This is an adaptive version of saltant-py's wait_until_finished:
+    it resets to fast polling whenever the task instance's state
+    changes (e.g., from created to running).
+
+    Args:
+        manager: A task instance manager.
+        uuid: A string containing the UUID of the task instance.
+        poller: An AdaptivePoller object to pace the polls with.
+        on_poll: An optional function to call with the task instance
+            after each poll (including the last, once it's finished),
+            e.g., to fetch what's new about it. It returns whether it
+            saw anything change, which resets to fast polling just as a
+            change of state does.
+
+    Returns:
+        The task instance model instance once it has finished.
+
+    Raises:
+        saltant.exceptions.BadHttpRequestError: A request for the task
+            instance failed (e.g., because it doesn't exist).
+    """
+    task_instance = manager.get(uuid)
+
+    if on_poll is not None:
+        on_poll(task_instance)
+
+    poller.record_poll(changed=True)
+
+    while task_instance.state not in TASK_INSTANCE_FINISH_STATUSES:
+        poller.wait()
+
+        previous_state = task_instance.state
+        task_instance = manager.get(uuid)
+        changed = task_instance.state != previous_state
+
+        if on_poll is not None and on_poll(task_instance):
+            changed = True
+
+        poller.record_poll(changed=changed)
+
+    return task_instance
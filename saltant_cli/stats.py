@@ -0,0 +1,373 @@
+"""Contains streaming aggregates for task instance statistics.
+
+Everything here looks at each task instance once and keeps memory
+bounded no matter how many task instances go by: counts are kept per
+distinct value, durations go into a logarithmic sketch with a fixed
+relative error, and throughput is counted in time buckets which widen
+as needed to stay under a fixed number of buckets.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import calendar
+import collections
+import datetime
+import math
+from dateutil.tz import tzutc
+
+# Duration sketch defaults
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Throughput histogram defaults
+DEFAULT_BUCKET_SECONDS = 3600
+DEFAULT_MAX_BUCKETS = 1000
+
+# Percentiles of durations to report
+DURATION_PERCENTILES = (50, 90, 95, 99)
+
+# Attributes task instances are counted by
+COUNT_ATTRS = ("state", "task_queue", "task_type", "user")
+
+
+def to_timestamp(value):
+    """Convert a datetime into seconds since the epoch.
+
+    Args:
+        value: A datetime.datetime, which is assumed to be in UTC if
+            it's naive.
+
+    Returns:
+        A float containing the seconds since the epoch.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(tzutc())
+
+    return calendar.timegm(value.timetuple()) + value.microsecond / 1e6
+
+
+class QuantileSketch(object):
+    """Estimates quantiles of a stream of non-negative numbers.
+
+    Values are counted in logarithmically sized buckets, so that any
+    quantile is estimated to within a fixed relative error (see
+    Masson et al., "DDSketch", VLDB 2019). The number of buckets only
+    grows with the logarithm of the range of values, so a sketch of
+    durations from milliseconds to months needs a couple of thousand
+    buckets at most.
+
+    Attributes:
+        relative_accuracy: A float containing the relative error
+            quantile estimates are guaranteed to be within.
+        gamma: A float containing the ratio between the bounds of each
+            bucket.
+        log_gamma: A float containing the natural logarithm of gamma.
+        buckets: A dictionary mapping bucket indices to counts.
+        zeros: An integer containing how many values were (about) zero.
+        count: An integer containing how many values were added.
+        total: A float containing the sum of the values added.
+        min: The smallest value added, or None.
+        max: The largest value added, or None.
+    """
+
+    # Values smaller than this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """Initialize the sketch.
+
+        Args:
+            relative_accuracy: A float containing the relative error
+                quantile estimates should be within.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = collections.Counter()
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Add a value to the sketch.
+
+        Args:
+            value: A non-negative number. Negative values (e.g., from
+                clock skew) are counted as zero.
+        """
+        value = max(value, 0)
+
+        if value < self.MIN_VALUE:
+            self.zeros += 1
+        else:
+            self.buckets[int(math.ceil(math.log(value) / self.log_gamma))] += 1
+
+        self.count += 1
+        self.total += value
+
+        if self.min is None or value < self.min:
+            self.min = value
+
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimate a quantile of the values added.
+
+        Args:
+            q: A float between 0 and 1 specifying the quantile.
+
+        Returns:
+            A float containing the estimated quantile, or None if no
+            values were added.
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+
+        if rank < self.zeros:
+            return 0.0
+
+        seen = self.zeros
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+
+            if seen > rank:
+                # The middle of the bucket, relatively speaking
+                estimate = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+    def mean(self):
+        """Get the mean of the values added.
+
+        Returns:
+            A float containing the mean, or None if no values were
+            added.
+        """
+        if not self.count:
+            return None
+
+        return self.total / self.count
+
+
+class ThroughputHistogram(object):
+    """Counts events in fixed-width time buckets.
+
+    Whenever the buckets would span more than max_buckets periods, they
+    are doubled in width (merging neighbours), so memory (and the size
+    of the histogram) stays bounded however long a time the events
+    span.
+
+    Attributes:
+        bucket_seconds: An integer containing the width of each bucket
+            in seconds.
+        max_buckets: An integer containing the most buckets to keep.
+        series: A tuple of strings containing the names of the series
+            of events counted.
+        buckets: A dictionary mapping the start of each bucket (in
+            seconds since the epoch) to a Counter of events in it.
+        first: An integer containing the start of the earliest bucket,
+            or None.
+        last: An integer containing the start of the latest bucket, or
+            None.
+    """
+
+    def __init__(
+        self,
+        series,
+        bucket_seconds=DEFAULT_BUCKET_SECONDS,
+        max_buckets=DEFAULT_MAX_BUCKETS,
+    ):
+        """Initialize the histogram.
+
+        Args:
+            series: An iterable of strings containing the names of the
+                series of events to count.
+            bucket_seconds: An integer containing the initial width of
+                each bucket in seconds.
+            max_buckets: An integer containing the most buckets to
+                keep.
+        """
+        self.series = tuple(series)
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.buckets = collections.defaultdict(collections.Counter)
+        self.first = None
+        self.last = None
+
+    def add(self, series, when):
+        """Count an event.
+
+        Args:
+            series: A string containing the name of the event's series.
+            when: A datetime.datetime containing when it happened.
+        """
+        timestamp = to_timestamp(when)
+        start = int(timestamp // self.bucket_seconds * self.bucket_seconds)
+        self.buckets[start][series] += 1
+
+        if self.first is None or start < self.first:
+            self.first = start
+
+        if self.last is None or start > self.last:
+            self.last = start
+
+        # Keep the span of the histogram (empty periods included) under
+        # the limit
+        while (self.last - self.first) // self.bucket_seconds >= (
+            self.max_buckets
+        ):
+            self.widen()
+
+    def widen(self):
+        """Double the width of the buckets."""
+        self.bucket_seconds *= 2
+        widened = collections.defaultdict(collections.Counter)
+
+        for start, counts in self.buckets.items():
+            widened[start // self.bucket_seconds * self.bucket_seconds].update(
+                counts
+            )
+
+        self.buckets = widened
+        self.first = min(widened)
+        self.last = max(widened)
+
+    def rows(self):
+        """Get the histogram's buckets in order, including empty ones.
+
+        Yields:
+            Ordered dictionaries containing the start of a bucket (as a
+            datetime.datetime in UTC) under "period", and the count of
+            each series.
+        """
+        if not self.buckets:
+            return
+
+        for start in range(self.first, self.last + 1, self.bucket_seconds):
+            row = collections.OrderedDict(
+                [
+                    (
+                        "period",
+                        datetime.datetime.fromtimestamp(start, tzutc()),
+                    )
+                ]
+            )
+
+            for series in self.series:
+                row[series] = self.buckets.get(start, {}).get(series, 0)
+
+            yield row
+
+
+class TaskInstanceStats(object):
+    """Aggregates statistics over a stream of task instances.
+
+    Attributes:
+        count: An integer containing how many task instances were seen.
+        counts: A dictionary mapping each of COUNT_ATTRS to a Counter of
+            its values.
+        durations: A QuantileSketch of how many seconds finished task
+            instances took, from creation to finishing.
+        throughput: A ThroughputHistogram of how many task instances
+            were created and finished over time.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds=DEFAULT_BUCKET_SECONDS,
+        max_buckets=DEFAULT_MAX_BUCKETS,
+        relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+    ):
+        """Initialize the statistics.
+
+        Args:
+            bucket_seconds: An integer containing the initial width of
+                the throughput histogram's buckets in seconds.
+            max_buckets: An integer containing the most buckets the
+                throughput histogram keeps.
+            relative_accuracy: A float containing the relative error of
+                duration percentiles.
+        """
+        self.count = 0
+        self.counts = collections.OrderedDict(
+            (attr, collections.Counter()) for attr in COUNT_ATTRS
+        )
+        self.durations = QuantileSketch(relative_accuracy)
+        self.throughput = ThroughputHistogram(
+            ("created", "finished"), bucket_seconds, max_buckets
+        )
+
+    def add(self, row):
+        """Add a task instance to the statistics.
+
+        Args:
+            row: A dictionary containing a task instance's COUNT_ATTRS,
+                "datetime_created", and "datetime_finished".
+        """
+        self.count += 1
+
+        for attr, counter in self.counts.items():
+            counter[row.get(attr)] += 1
+
+        created = row.get("datetime_created")
+        finished = row.get("datetime_finished")
+
+        if created is not None:
+            self.throughput.add("created", created)
+
+        if finished is not None:
+            self.throughput.add("finished", finished)
+
+            if created is not None:
+                self.durations.add(
+                    to_timestamp(finished) - to_timestamp(created)
+                )
+
+    def update(self, rows):
+        """Add many task instances to the statistics.
+
+        Args:
+            rows: An iterable of dictionaries (see add).
+
+        Returns:
+            The statistics, for chaining.
+        """
+        for row in rows:
+            self.add(row)
+
+        return self
+
+    def duration_summary(self, percentiles=DURATION_PERCENTILES):
+        """Summarize how long task instances took.
+
+        Args:
+            percentiles: An iterable of numbers between 0 and 100
+                containing the percentiles to estimate.
+
+        Returns:
+            An ordered dictionary mapping statistic names (e.g.,
+            "count", "mean", and "p50") to their values in seconds (or
+            None if nothing finished).
+        """
+        sketch = self.durations
+        summary = collections.OrderedDict(
+            [
+                ("count", sketch.count),
+                ("min", sketch.min),
+                ("mean", sketch.mean()),
+            ]
+        )
+
+        for percentile in percentiles:
+            summary["p%g" % percentile] = sketch.quantile(percentile / 100)
+
+        summary["max"] = sketch.max
+
+        return summary
@@ -0,0 +1,135 @@
+"""Contains command group for the local caches."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import os
+import sqlite3
+import click
+from ..cache import ArtifactCache, MetadataCache, TaskInstanceCache
+from ..constants import (
+    ARTIFACT_CACHE_DIR_NAME,
+    ARTIFACT_CACHE_FILE_NAME,
+    CACHE_FILE_NAME,
+    METADATA_CACHE_FILE_NAME,
+    PROJECT_CACHE_HOME,
+)
+from .output import TABLE, write_objects
+from .resource import get_output_format
+from .utils import generate_table
+
+# The local caches, mapped to how to open them. The task instance and
+# artifact caches' size limits only matter when writing to them, so
+# they're left unlimited here.
+CACHES = collections.OrderedDict(
+    [
+        (
+            "task-instances",
+            lambda: TaskInstanceCache(
+                os.path.join(PROJECT_CACHE_HOME, CACHE_FILE_NAME),
+                float("inf"),
+            ),
+        ),
+        (
+            "metadata",
+            lambda: MetadataCache(
+                os.path.join(PROJECT_CACHE_HOME, METADATA_CACHE_FILE_NAME)
+            ),
+        ),
+        (
+            "artifacts",
+            lambda: ArtifactCache(
+                os.path.join(PROJECT_CACHE_HOME, ARTIFACT_CACHE_FILE_NAME),
+                os.path.join(PROJECT_CACHE_HOME, ARTIFACT_CACHE_DIR_NAME),
+                float("inf"),
+            ),
+        ),
+    ]
+)
+
+# Statistics about one of the local caches
+CacheStats = collections.namedtuple(
+    "CacheStats",
+    [
+        "cache",
+        "entries",
+        "bytes",
+        "hits",
+        "revalidations",
+        "misses",
+        "evictions",
+    ],
+)
+CACHE_STATS_ATTRS = CacheStats._fields
+
+
+def open_caches(ctx, names):
+    """Open local caches, exiting if any can't be opened.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        names: An iterable of strings containing the names of caches
+            in CACHES.
+
+    Returns:
+        A list of two-tuples containing the name of a cache and the
+        saltant_cli.cache.SQLiteCache object for it.
+    """
+    caches = []
+
+    for name in names:
+        try:
+            cache = CACHES[name]()
+        except (OSError, sqlite3.Error) as e:
+            click.echo("Couldn't open the %s cache: %s" % (name, e), err=True)
+            ctx.exit(1)
+
+        ctx.call_on_close(cache.close)
+        caches.append((name, cache))
+
+    return caches
+
+
+@click.group()
+def cache():
+    """Command group for the local caches."""
+    pass
+
+
+@cache.command(name="clear")
+@click.argument("names", nargs=-1, type=click.Choice(list(CACHES)))
+@click.pass_context
+def clear_cache(ctx, names):
+    """Clear the local caches (or just those named)."""
+    for name, cache in open_caches(ctx, names or CACHES):
+        cache.clear()
+        click.echo("Cleared the %s cache" % name)
+
+
+@cache.command(name="stats")
+@click.pass_context
+def show_cache_stats(ctx):
+    """Show statistics about the local caches."""
+    rows = []
+
+    for name, cache in open_caches(ctx, CACHES):
+        stats = cache.stats()
+        rows.append(
+            CacheStats(
+                name, *(stats.get(attr, 0) for attr in CACHE_STATS_ATTRS[1:])
+            )
+        )
+
+    output_format = get_output_format(ctx)
+
+    if output_format == TABLE:
+        click.echo(generate_table(rows, CACHE_STATS_ATTRS))
+    else:
+        write_objects(
+            rows,
+            CACHE_STATS_ATTRS,
+            output_format,
+            click.get_text_stream("stdout"),
+        )
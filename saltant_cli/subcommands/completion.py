@@ -19,6 +19,10 @@ CMD_HELP = (
 )
 
 
+# Enable click_completion monkey patch
+click_completion.init()
+
+
 @click.group(help=CMD_HELP)
 def completion():
     """Command group to generate shell command completions."""
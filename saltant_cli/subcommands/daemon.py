@@ -0,0 +1,201 @@
+"""Contains command group for the background daemon."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import os
+import signal
+import sys
+import click
+from ..cache import make_directories
+from ..constants import DAEMON_LOG_FILE_NAME, PROJECT_CACHE_HOME
+from ..daemon import DaemonServer, get_socket_path, is_supported, request
+from .resource import (
+    get_metadata_session,
+    get_task_instance_cache,
+    output_object,
+)
+from .shell import run_command_line
+
+# How many seconds to wait for the daemon to respond to commands from
+# this command group. This is longer than thin clients wait, since
+# these commands have no fallback.
+DAEMON_RESPONSE_TIMEOUT = 5.0
+
+# Caches the daemon keeps open (under these keys of the context object)
+CACHE_KEYS = ("task_instance_cache", "metadata_cache")
+
+# The status of a running daemon
+DaemonStatus = collections.namedtuple(
+    "DaemonStatus", ["pid", "socket", "uptime", "commands_run"]
+)
+DAEMON_STATUS_ATTRS = DaemonStatus._fields
+
+
+def ask_daemon(ctx, command):
+    """Ask the daemon to do something, exiting if it doesn't respond.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        command: A string containing the command to send the daemon.
+
+    Returns:
+        A DaemonStatus object containing the daemon's status.
+    """
+    response = request({"command": command}, DAEMON_RESPONSE_TIMEOUT)
+
+    if response is None:
+        if os.path.exists(get_socket_path()):
+            click.echo(
+                "The daemon didn't respond. It may be busy running a "
+                "command.",
+                err=True,
+            )
+        else:
+            click.echo("No daemon is running.", err=True)
+
+        ctx.exit(1)
+
+    return DaemonStatus(
+        response["pid"],
+        get_socket_path(),
+        round(response["uptime"], 1),
+        response["commands_run"],
+    )
+
+
+def daemonize(log_file_path):
+    """Detach from the terminal, continuing in a background process.
+
+    Args:
+        log_file_path: A string containing the path to the file to
+            send the background process's output to.
+
+    Returns:
+        A boolean specifying whether this is the background process
+        (as opposed to the original process, which should carry on with
+        whatever it was doing).
+    """
+    pid = os.fork()
+
+    if pid > 0:
+        # Wait for the intermediate process to exit
+        os.waitpid(pid, 0)
+        return False
+
+    # Start a new session so that the terminal closing doesn't kill us,
+    # then fork again so that we can't reacquire a terminal
+    os.setsid()
+
+    if os.fork() > 0:
+        os._exit(0)
+
+    with open(os.devnull) as devnull:
+        os.dup2(devnull.fileno(), sys.stdin.fileno())
+
+    with open(log_file_path, "a") as log_file:
+        os.dup2(log_file.fileno(), sys.stdout.fileno())
+        os.dup2(log_file.fileno(), sys.stderr.fileno())
+
+    return True
+
+
+@click.group()
+def daemon():
+    """Command group for the background daemon."""
+    pass
+
+
+@daemon.command(name="start")
+@click.option(
+    "--foreground",
+    help="Run the daemon in the foreground rather than in the background.",
+    is_flag=True,
+)
+@click.pass_context
+def start_daemon(ctx, foreground):
+    """Start a daemon which runs commands for saltant-cli.
+
+    While it's running, saltant-cli commands are run by the daemon,
+    which reuses its client, connections, and caches from one command
+    to the next. Commands which need the terminal or stdin (e.g.,
+    shell) still run in-process, as does everything when the daemon is
+    busy.
+    """
+    if not is_supported():
+        click.echo("The daemon isn't supported on this platform.", err=True)
+        ctx.exit(1)
+
+    if request({"command": "status"}) is not None:
+        click.echo("A daemon is already running.", err=True)
+        ctx.exit(1)
+
+    root_ctx = ctx.find_root()
+    obj = ctx.obj
+
+    def run_command(args):
+        return run_command_line(
+            root_ctx.command, args, obj, prog_name=root_ctx.info_name
+        )
+
+    def commit_caches():
+        for key in CACHE_KEYS:
+            if key in obj:
+                obj[key].commit()
+
+    socket_path = get_socket_path()
+    make_directories(os.path.dirname(socket_path))
+
+    server = DaemonServer(socket_path, run_command, commit_caches)
+
+    if not foreground:
+        make_directories(PROJECT_CACHE_HOME)
+
+        if not daemonize(
+            os.path.join(PROJECT_CACHE_HOME, DAEMON_LOG_FILE_NAME)
+        ):
+            # Leave the listening to the background process
+            server.listener.close()
+
+            status = ask_daemon(ctx, "status")
+            click.echo("Daemon started (pid %d)" % status.pid)
+            return
+    else:
+        click.echo("Daemon listening on %s" % socket_path)
+
+    # Clean up when asked to terminate
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # Open the caches now (SQLite connections can't be carried across a
+    # fork) so that they stay open between commands
+    cache_ctx = click.Context(root_ctx.command, obj=obj)
+    get_task_instance_cache(cache_ctx, "container_task_instances")
+    get_metadata_session(cache_ctx, "task_queues")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cache_ctx.close()
+
+
+@daemon.command(name="stop")
+@click.pass_context
+def stop_daemon(ctx):
+    """Stop the running daemon."""
+    status = ask_daemon(ctx, "stop")
+
+    click.echo(
+        "Daemon stopped (pid %d, ran %d commands)"
+        % (status.pid, status.commands_run)
+    )
+
+
+@daemon.command(name="status")
+@click.pass_context
+def show_daemon_status(ctx):
+    """Show the status of the running daemon."""
+    output_object(ctx, ask_daemon(ctx, "status"), DAEMON_STATUS_ATTRS)
@@ -0,0 +1,180 @@
+"""Contains writers for machine-readable output formats.
+
+Each writer takes an iterable of objects and writes them out one at a
+time as the iterable produces them, so that large result sets never
+need to be held in memory (or rendered into one giant string).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import csv
+import datetime
+import json
+
+# Output format names (matching those in constants.OUTPUT_FORMATS)
+TABLE = "table"
+JSON = "json"
+JSON_LINES = "jsonl"
+CSV = "csv"
+TSV = "tsv"
+
+
+def serialize_value(value):
+    """Convert an attribute value into something JSON-encodable.
+
+    Args:
+        value: The value of an object's attribute.
+
+    Returns:
+        The value, with datetimes converted to ISO 8601 strings.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+
+    return value
+
+
+def get_attribute(object, attr):
+    """Get an attribute of an object or projected row.
+
+    Args:
+        object: An object which has specific attributes, or a
+            dictionary containing a projected row (see
+            saltant_cli.pagination.iterate_rows).
+        attr: A string containing the attribute to get.
+
+    Returns:
+        The value of the attribute.
+    """
+    if isinstance(object, dict):
+        return object.get(attr)
+
+    return getattr(object, attr)
+
+
+def object_to_dict(object, attrs):
+    """Convert an object into an ordered dictionary of attributes.
+
+    Args:
+        object: An object which has specific attributes (or a projected
+            row).
+        attrs: An iterable of strings containing attributes to get from
+            the above object.
+
+    Returns:
+        A collections.OrderedDict mapping the attributes to their
+        serialized values.
+    """
+    return collections.OrderedDict(
+        (attr, serialize_value(get_attribute(object, attr))) for attr in attrs
+    )
+
+
+def write_json(objects, attrs, stream):
+    """Write objects as a JSON array.
+
+    The array is written element by element rather than being encoded
+    all at once.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An iterable of strings containing attributes to get from
+            the above objects.
+        stream: A file-like object to write to.
+    """
+    stream.write("[")
+
+    for idx, object in enumerate(objects):
+        stream.write(",\n" if idx else "\n")
+        stream.write(json.dumps(object_to_dict(object, attrs)))
+
+    stream.write("\n]\n")
+
+
+def write_json_lines(objects, attrs, stream):
+    """Write objects as JSON Lines, i.e., one JSON object per line.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An iterable of strings containing attributes to get from
+            the above objects.
+        stream: A file-like object to write to.
+    """
+    for object in objects:
+        stream.write(json.dumps(object_to_dict(object, attrs)) + "\n")
+
+
+def write_delimited(objects, attrs, stream, delimiter):
+    """Write objects as delimiter-separated values with a header row.
+
+    Values which are themselves containers (e.g., task instance
+    arguments) are written as JSON, and None values are left empty.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An iterable of strings containing attributes to get from
+            the above objects.
+        stream: A file-like object to write to.
+        delimiter: A one-character string used to separate values.
+    """
+    writer = csv.writer(stream, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(attrs)
+
+    for object in objects:
+        row = []
+
+        for value in object_to_dict(object, attrs).values():
+            if value is None:
+                value = ""
+            elif isinstance(value, (dict, list)):
+                value = json.dumps(value)
+
+            row.append(value)
+
+        writer.writerow(row)
+
+
+def write_objects(objects, attrs, output_format, stream):
+    """Write objects in a machine-readable format.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An iterable of strings containing attributes to get from
+            the above objects.
+        output_format: A string containing the name of a
+            machine-readable output format.
+        stream: A file-like object to write to.
+    """
+    if output_format == JSON:
+        write_json(objects, attrs, stream)
+    elif output_format == JSON_LINES:
+        write_json_lines(objects, attrs, stream)
+    elif output_format == CSV:
+        write_delimited(objects, attrs, stream, ",")
+    elif output_format == TSV:
+        write_delimited(objects, attrs, stream, "\t")
+    else:
+        raise ValueError("%s isn't a machine-readable format" % output_format)
+
+
+def write_object(object, attrs, output_format, stream):
+    """Write a single object in a machine-readable format.
+
+    This is the same as write_objects except that for JSON the object
+    is written on its own rather than in an array.
+
+    Args:
+        object: An object which has specific attributes.
+        attrs: An iterable of strings containing attributes to get from
+            the above object.
+        output_format: A string containing the name of a
+            machine-readable output format.
+        stream: A file-like object to write to.
+    """
+    if output_format == JSON:
+        stream.write(json.dumps(object_to_dict(object, attrs), indent=2))
+        stream.write("\n")
+    else:
+        write_objects([object], attrs, output_format, stream)
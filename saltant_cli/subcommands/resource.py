@@ -3,223 +3,2780 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
+import collections
+import functools
+import itertools
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
 import click
 import click_spinner
+import requests
+from saltant.constants import (
+    HTTP_200_OK,
+    SUCCESSFUL,
+    TASK_INSTANCE_FINISH_STATUSES,
+)
 from saltant.exceptions import BadHttpRequestError
-from .utils import combine_filter_json, generate_table, generate_list_display
+from ..artifacts import (
+    copy_file_to_stream,
+    download_to_file,
+    download_to_stream,
+    stream_download,
+)
+from ..cache import (
+    ArtifactCache,
+    CachedSession,
+    MetadataCache,
+    TaskInstanceCache,
+    is_finished,
+    make_directories,
+)
+from ..concurrency import Engine, RateLimiter
+from ..constants import (
+    ARTIFACT_CACHE_DIR_NAME,
+    ARTIFACT_CACHE_FILE_NAME,
+    CACHE_FILE_NAME,
+    DEFAULT_ARTIFACT_CACHE_MAX_MEGABYTES,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_COLUMN_WIDTH,
+    DEFAULT_METADATA_CACHE_TTL,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TASK_INSTANCE_CACHE_MAX_MEGABYTES,
+    IN_FILTER_CHUNK_SIZE,
+    LOCAL,
+    METADATA_CACHE_FILE_NAME,
+    MIRROR_FILE_NAME,
+    PROJECT_CACHE_HOME,
+)
+from ..exceptions import ArtifactNotFound, DownloadFailed, NotInMirror
+from ..mirror import MIRRORED_RESOURCES, Mirror
+from ..pagination import ALL_OBJECTS_PAGE_SIZE, iterate_objects, iterate_rows
+from ..polling import (
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_JITTER,
+    DEFAULT_MAX_REFRESH_PERIOD,
+    DEFAULT_REFRESH_PERIOD,
+    AdaptivePoller,
+    wait_until_finished,
+)
+from ..stats import (
+    COUNT_ATTRS,
+    DEFAULT_BUCKET_SECONDS,
+    DURATION_PERCENTILES,
+    TaskInstanceStats,
+)
+from ..timings import measure
+from .output import (
+    JSON_LINES,
+    TABLE,
+    get_attribute,
+    write_object,
+    write_objects,
+)
+from .utils import (
+    combine_filter_json,
+    generate_list_display,
+    generate_streamed_table,
+    generate_table,
+    generate_table_chunks,
+    LiveTable,
+    iterate_manifest,
+    parse_manifest_record,
+    read_identifiers,
+)
 
+try:
+    # Python 3
+    from urllib.parse import urlsplit
+except ImportError:
+    # Python 2
+    from urlparse import urlsplit
 
-def generic_get_command(manager_name, attrs, ctx, id):
+# The outcome of submitting one record of a batch command
+BatchResult = collections.namedtuple(
+    "BatchResult", ["record", "status", "uuid", "error"]
+)
+BATCH_RESULT_ATTRS = BatchResult._fields
+
+# The outcome of acting on one task instance of a bulk command
+BulkResult = collections.namedtuple(
+    "BulkResult", ["uuid", "status", "clone_uuid", "error"]
+)
+
+# Past tenses of the actions bulk commands can take, and the attributes
+# of their results to display
+BULK_ACTIONS = {
+    "clone": ("cloned", ("uuid", "status", "clone_uuid", "error")),
+    "terminate": ("terminated", ("uuid", "status", "error")),
+}
+
+# The outcome of fetching one task instance's logs or results
+DownloadResult = collections.namedtuple(
+    "DownloadResult", ["uuid", "status", "path", "bytes", "error"]
+)
+DOWNLOAD_RESULT_ATTRS = DownloadResult._fields
+
+# A task instance's logs or results to fetch, and what to do with them
+ArtifactJob = collections.namedtuple(
+    "ArtifactJob", ["uuid", "url", "headers", "path", "cached_path", "keep"]
+)
+
+# Attributes of task instances which artifact URL templates can use
+ARTIFACT_URL_FIELDS = ("uuid", "name", "user", "task_queue", "task_type")
+
+# Pulls the status code out of saltant-py's request failure messages
+STATUS_CODE_RE = re.compile(r"failed with status (\d+)")
+
+# One statistic computed by a stats command, as output in
+# machine-readable formats
+Statistic = collections.namedtuple("Statistic", ["section", "name", "value"])
+STATISTIC_ATTRS = Statistic._fields
+
+# How many task instances to read in between progress updates
+STATS_PROGRESS_INTERVAL = 1000
+
+# Filters which select task instances by UUID alone
+UUID_FILTERS = frozenset(["uuid", "uuid__in"])
+
+# Managers whose responses go through the metadata cache, mapped to the
+# key their time to live is configured under in the "ttl" section of
+# the config file's cache settings
+METADATA_CACHE_RESOURCES = {
+    "container_task_types": "task-types",
+    "executable_task_types": "task-types",
+    "task_queues": "task-queues",
+    "task_whitelists": "task-whitelists",
+}
+
+# Foreign keys which --resolve shows the names of, per manager, with
+# the managers of the objects they refer to
+FOREIGN_KEYS = {
+    "container_task_instances": (
+        ("task_queue", "task_queues"),
+        ("task_type", "container_task_types"),
+    ),
+    "executable_task_instances": (
+        ("task_queue", "task_queues"),
+        ("task_type", "executable_task_types"),
+    ),
+}
+
+# How many objects to collect foreign keys from before resolving them
+RESOLVE_BATCH_SIZE = 100
+
+
+class ResolvedObject(object):
+    """An object along with the names its foreign keys refer to.
+
+    Attributes not given names for are looked up on the object.
+
+    Attributes:
+        object: An object which has specific attributes, or a
+            dictionary containing a projected row.
+        names: A dictionary mapping attributes (e.g., "task_queue_name")
+            to names.
+    """
+
+    def __init__(self, object, names):
+        """Initialize the resolved object.
+
+        Args:
+            object: An object which has specific attributes, or a
+                dictionary containing a projected row.
+            names: A dictionary mapping attributes to names.
+        """
+        self.object = object
+        self.names = names
+
+    def __getattr__(self, attr):
+        """Get a name, or an attribute of the object.
+
+        Args:
+            attr: A string containing the attribute to get.
+
+        Returns:
+            The value of the attribute.
+        """
+        if attr in self.names:
+            return self.names[attr]
+
+        return get_attribute(self.object, attr)
+
+
+class ProgressLine(object):
+    """A status line on stderr which is rewritten as progress is made.
+
+    When stderr isn't a terminal, each new status is instead written on
+    its own line, and only when it changes.
+
+    Attributes:
+        is_terminal: A boolean specifying whether stderr is a terminal.
+        status: A string containing the last status shown.
+    """
+
+    def __init__(self):
+        """Initialize the status line."""
+        self.is_terminal = click.get_text_stream("stderr").isatty()
+        self.status = None
+
+    def update(self, status):
+        """Show a new status.
+
+        Args:
+            status: A string containing the status to show.
+        """
+        if status == self.status:
+            return
+
+        if self.is_terminal:
+            click.echo("\r\033[K" + status, nl=False, err=True)
+        else:
+            click.echo(status, err=True)
+
+        self.status = status
+
+    def clear(self):
+        """Clear the status line so that something else can be shown."""
+        if self.is_terminal and self.status is not None:
+            click.echo("\r\033[K", nl=False, err=True)
+            self.status = None
+
+    def finish(self):
+        """Leave the last status shown on its own line."""
+        if self.is_terminal and self.status is not None:
+            click.echo(err=True)
+
+
+def get_output_format(ctx):
+    """Get the output format chosen for the Click session.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+
+    Returns:
+        A string containing the name of the output format.
+    """
+    return ctx.obj.get("output_format", TABLE)
+
+
+def echo_error(ctx, message):
+    """Report an error message.
+
+    Errors go to stderr when the output format is machine-readable so
+    that they don't end up mixed in with the records.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        message: A string containing the message to report.
+    """
+    click.echo(message, err=get_output_format(ctx) != TABLE)
+
+
+def measure_phase(name):
+    """Measure a phase of the current command, if timings are on.
+
+    Args:
+        name: A string containing the name of the phase.
+
+    Returns:
+        A context manager which records the phase.
+    """
+    ctx = click.get_current_context(silent=True)
+    recorder = None
+
+    if ctx is not None and ctx.obj:
+        recorder = ctx.obj.get("recorder")
+
+    return measure(recorder, name)
+
+
+def timed_command(function):
+    """Decorate a generic command function so that it's measured.
+
+    Args:
+        function: The generic command function.
+
+    Returns:
+        The decorated function.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with measure_phase(function.__name__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def output_object(ctx, object, attrs):
+    """Output an object in the session's output format.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        object: An object which has specific attributes.
+        attrs: An iterable containing the attributes of the object to
+            use when displaying it.
+    """
+    output_format = get_output_format(ctx)
+
+    with measure_phase("format"):
+        if output_format == TABLE:
+            # Output a list display of the object
+            click.echo(generate_list_display(object, attrs))
+        else:
+            write_object(
+                object, attrs, output_format, click.get_text_stream("stdout")
+            )
+
+
+def get_cache_config(ctx):
+    """Get the cache settings from the config file.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+
+    Returns:
+        A dictionary containing the cache settings.
+    """
+    return ctx.obj.get("config", {}).get("cache") or {}
+
+
+def get_engine(ctx, workers=None):
+    """Get an engine to make many requests at once with.
+
+    The engine is shut down along with the Click session.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        workers: An optional integer containing how many requests the
+            command was asked to make at once. The global --concurrency
+            option takes precedence over this.
+
+    Returns:
+        A saltant_cli.concurrency.Engine object.
+    """
+    concurrency = ctx.obj.get("concurrency") or workers or DEFAULT_CONCURRENCY
+    engine = ctx.obj.get("engine")
+
+    if engine is None or engine.concurrency != concurrency:
+        engine = Engine(ctx.obj["client"], concurrency)
+        ctx.obj["engine"] = engine
+        ctx.find_root().call_on_close(engine.shutdown)
+
+    return engine
+
+
+def get_max_column_width(ctx, max_column_width=None):
+    """Get how many characters of a value to show in tables.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        max_column_width: An optional integer given on the command line,
+            which takes precedence over the config file.
+
+    Returns:
+        An integer containing how many characters of a value to show
+        before truncating it, or 0 to show everything.
+    """
+    if max_column_width is not None:
+        return max_column_width
+
+    table_config = ctx.obj.get("config", {}).get("table") or {}
+
+    return table_config.get("max-column-width", DEFAULT_MAX_COLUMN_WIDTH)
+
+
+def open_cache(ctx, name, cache_class, *args):
+    """Open a cache, or get it if it's already open.
+
+    Each cache is opened the first time it's needed in a Click session
+    and closed when the session ends.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        name: A string containing the key to keep the cache under in
+            the context's object.
+        cache_class: The saltant_cli.cache.SQLiteCache subclass to open
+            the cache with.
+        *args: Arguments to open the cache with.
+
+    Returns:
+        A saltant_cli.cache.SQLiteCache object, or None if the cache
+        couldn't be opened.
+    """
+    if name not in ctx.obj:
+        try:
+            cache = cache_class(*args)
+        except (OSError, sqlite3.Error) as e:
+            # Carry on without a cache
+            click.echo("Not using the cache: %s" % e, err=True)
+            ctx.obj["use_cache"] = False
+            return None
+
+        ctx.obj[name] = cache
+        ctx.find_root().call_on_close(cache.close)
+
+    return ctx.obj[name]
+
+
+def get_task_instance_cache(ctx, manager_name):
+    """Get the finished task instance cache, if it applies.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager being used.
+
+    Returns:
+        A saltant_cli.cache.TaskInstanceCache object, or None if the
+        manager doesn't manage task instances or caching is disabled.
+    """
+    if not manager_name.endswith("task_instances"):
+        return None
+
+    if not ctx.obj.get("use_cache", False):
+        return None
+
+    max_megabytes = get_cache_config(ctx).get(
+        "task-instances-max-megabytes",
+        DEFAULT_TASK_INSTANCE_CACHE_MAX_MEGABYTES,
+    )
+
+    return open_cache(
+        ctx,
+        "task_instance_cache",
+        TaskInstanceCache,
+        os.path.join(PROJECT_CACHE_HOME, CACHE_FILE_NAME),
+        int(max_megabytes * 1024 * 1024),
+    )
+
+
+def get_artifact_cache(ctx):
+    """Get the cache of finished task instances' logs and results.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+
+    Returns:
+        A saltant_cli.cache.ArtifactCache object, or None if caching is
+        disabled.
+    """
+    if not ctx.obj.get("use_cache", False):
+        return None
+
+    max_megabytes = get_cache_config(ctx).get(
+        "artifacts-max-megabytes", DEFAULT_ARTIFACT_CACHE_MAX_MEGABYTES
+    )
+
+    return open_cache(
+        ctx,
+        "artifact_cache",
+        ArtifactCache,
+        os.path.join(PROJECT_CACHE_HOME, ARTIFACT_CACHE_FILE_NAME),
+        os.path.join(PROJECT_CACHE_HOME, ARTIFACT_CACHE_DIR_NAME),
+        int(max_megabytes * 1024 * 1024),
+    )
+
+
+def get_metadata_session(ctx, manager_name):
+    """Get a session which makes requests through the metadata cache.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager being used.
+
+    Returns:
+        A saltant_cli.cache.CachedSession object, or None if the
+        manager's responses aren't cached or caching is disabled.
+    """
+    if manager_name not in METADATA_CACHE_RESOURCES:
+        return None
+
+    if not ctx.obj.get("use_cache", False):
+        return None
+
+    cache = open_cache(
+        ctx,
+        "metadata_cache",
+        MetadataCache,
+        os.path.join(PROJECT_CACHE_HOME, METADATA_CACHE_FILE_NAME),
+    )
+
+    if cache is None:
+        return None
+
+    ttls = get_cache_config(ctx).get("ttl") or {}
+    ttl = ttls.get(
+        METADATA_CACHE_RESOURCES[manager_name], DEFAULT_METADATA_CACHE_TTL
+    )
+
+    client = ctx.obj["client"]
+    manager = getattr(client, manager_name)
+
+    return CachedSession(
+        cache, client.session, client.base_api_url + manager.list_url, ttl
+    )
+
+
+def get_mirror(ctx, manager_name):
+    """Get the local mirror, if objects are to come from it.
+
+    The mirror is opened the first time it's needed in a Click session
+    and closed when the session ends.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager being used.
+
+    Returns:
+        A saltant_cli.mirror.Mirror object, or None if objects come
+        from the server.
+
+    Raises:
+        click.ClickException: The mirror doesn't have the objects.
+    """
+    if ctx.obj.get("source") != LOCAL:
+        return None
+
+    resource = manager_name.replace("_", " ")
+
+    if manager_name not in MIRRORED_RESOURCES:
+        raise click.ClickException(
+            "%s aren't kept in the local mirror" % resource
+        )
+
+    if "mirror" not in ctx.obj:
+        path = os.path.join(PROJECT_CACHE_HOME, MIRROR_FILE_NAME)
+
+        if not os.path.exists(path):
+            raise click.ClickException(
+                "There's no local mirror yet. Run the sync command first."
+            )
+
+        try:
+            mirror = Mirror(path)
+        except sqlite3.Error as e:
+            raise click.ClickException(
+                "Couldn't open the local mirror: %s" % e
+            )
+
+        ctx.obj["mirror"] = mirror
+        ctx.find_root().call_on_close(mirror.close)
+
+    mirror = ctx.obj["mirror"]
+
+    if mirror.get_server() != ctx.obj["client"].base_api_url:
+        raise click.ClickException(
+            "The local mirror is of %s. Run the sync command to mirror "
+            "this server instead." % mirror.get_server()
+        )
+
+    if mirror.get_sync_state(manager_name) is None:
+        raise click.ClickException(
+            "%s haven't been synced to the local mirror yet. Run the "
+            "sync command first." % resource.capitalize()
+        )
+
+    return mirror
+
+
+def query_mirror(mirror, manager, manager_name, filters, fields, limit):
+    """Query for objects in the local mirror.
+
+    Args:
+        mirror: A saltant_cli.mirror.Mirror object.
+        manager: The saltant.models.resource.ModelManager object for
+            the objects, used to turn their data into model instances.
+        manager_name: A string containing the name of the manager.
+        filters: A dictionary containing API filters.
+        fields: An optional iterable of strings containing the only
+            fields to get. If given, objects come back as projected
+            rows.
+        limit: An optional integer containing the maximum number of
+            objects to get.
+
+    Returns:
+        An iterator of model instances (or projected rows).
+
+    Raises:
+        click.UsageError: The filters can't be answered locally.
+    """
+    try:
+        if fields is not None:
+            return mirror.iterate_rows(manager_name, fields, filters, limit)
+
+        records = mirror.iterate_data(manager_name, filters, limit)
+    except ValueError as e:
+        raise click.UsageError("Can't query the local mirror: %s" % e)
+
+    return (manager.response_data_to_model_instance(data) for data in records)
+
+
+def get_object(ctx, manager_name, id):
+    """Get an object, going through the caches (or the local mirror).
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use.
+        id: A string or int (depending on the object type) containing
+            the primary identifier of the object to get.
+
+    Returns:
+        A model instance.
+
+    Raises:
+        saltant.exceptions.BadHttpRequestError: The request for the
+            object failed.
+        saltant_cli.exceptions.NotInMirror: The object isn't in the
+            local mirror.
+    """
+    manager = getattr(ctx.obj["client"], manager_name)
+
+    mirror = get_mirror(ctx, manager_name)
+
+    if mirror is not None:
+        response_data = mirror.get_data(manager_name, id)
+
+        if response_data is None:
+            raise NotInMirror(id)
+
+        return manager.response_data_to_model_instance(response_data)
+
+    # Finished task instances we already have don't need fetching
+    task_instance_cache = get_task_instance_cache(ctx, manager_name)
+
+    if task_instance_cache is not None:
+        object = task_instance_cache.get(manager, id)
+
+        if object is None:
+            object = manager.get(id)
+            task_instance_cache.put(object)
+
+        return object
+
+    # Metadata may be fresh enough (or confirmed unchanged)
+    session = get_metadata_session(ctx, manager_name)
+
+    if session is not None:
+        response = session.get(
+            manager._client.base_api_url + manager.detail_url.format(id=id)
+        )
+
+        # Validate that the request was successful
+        manager.validate_request_success(
+            response_text=response.text,
+            request_url=response.url,
+            status_code=response.status_code,
+            expected_status_code=HTTP_200_OK,
+        )
+
+        return manager.response_data_to_model_instance(response.json())
+
+    return manager.get(id)
+
+
+def get_resolved_attrs(manager_name, attrs):
+    """Add name attributes after the foreign keys among attributes.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager the objects come from.
+        attrs: An iterable containing the attributes of the objects to
+            display.
+
+    Returns:
+        A list of strings containing the attributes, with
+        "<foreign key>_name" after each foreign key.
+    """
+    foreign_keys = dict(FOREIGN_KEYS.get(manager_name, ()))
+    resolved_attrs = []
+
+    for attr in attrs:
+        resolved_attrs.append(attr)
+
+        if attr in foreign_keys:
+            resolved_attrs.append(attr + "_name")
+
+    return resolved_attrs
+
+
+def resolve_names(ctx, manager_name, ids):
+    """Get the names of objects, fetching each only once per session.
+
+    Names are memoized for the rest of the Click session. Objects come
+    through the metadata cache where it applies, so across sessions
+    they're usually not fetched at all.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager for the objects.
+        ids: An iterable of the primary identifiers of the objects.
+
+    Returns:
+        A dictionary mapping the primary identifiers to names (or None
+        for objects which weren't found). It may contain other objects'
+        names too.
+    """
+    names = ctx.obj.setdefault("resolved_names", {}).setdefault(
+        manager_name, {}
+    )
+    unresolved_ids = sorted(set(ids) - set(names))
+
+    if unresolved_ids:
+        with measure_phase("resolve"):
+            for id, object in fetch_objects(ctx, manager_name, unresolved_ids):
+                names[id] = None if object is None else object.name
+
+    return names
+
+
+def resolve_foreign_keys(ctx, manager_name, objects, attrs):
+    """Attach the names objects' foreign keys refer to.
+
+    Objects are resolved a batch at a time, so that every object
+    referred to within a batch is fetched at once, and objects can be
+    streamed.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager the objects come from.
+        objects: An iterable of objects which have specific attributes
+            (or projected rows).
+        attrs: An iterable containing the attributes of the objects
+            being displayed. Only foreign keys among them are resolved.
+
+    Yields:
+        ResolvedObject objects.
+    """
+    foreign_keys = [
+        (attr, referenced_manager_name)
+        for attr, referenced_manager_name in FOREIGN_KEYS.get(manager_name, ())
+        if attr in attrs
+    ]
+    objects = iter(objects)
+
+    while True:
+        batch = list(itertools.islice(objects, RESOLVE_BATCH_SIZE))
+
+        if not batch:
+            return
+
+        names = {}
+
+        for attr, referenced_manager_name in foreign_keys:
+            ids = set(get_attribute(object, attr) for object in batch)
+            ids.discard(None)
+            names[attr] = resolve_names(ctx, referenced_manager_name, ids)
+
+        for object in batch:
+            yield ResolvedObject(
+                object,
+                dict(
+                    (
+                        attr + "_name",
+                        names[attr].get(get_attribute(object, attr)),
+                    )
+                    for attr, _ in foreign_keys
+                ),
+            )
+
+
+def invalidate_metadata(ctx, manager_name):
+    """Forget cached metadata for a resource which has been modified.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager used.
+    """
+    session = get_metadata_session(ctx, manager_name)
+
+    if session is not None:
+        session.invalidate()
+
+
+def iterate_cached_task_instances(cache, manager, filters, page_size):
+    """Iterate through task instances selected by UUID via the cache.
+
+    Finished task instances which are cached come straight from the
+    cache; only the rest are queried for.
+
+    Args:
+        cache: A saltant_cli.cache.TaskInstanceCache object.
+        manager: A task instance manager.
+        filters: A dictionary containing only "uuid" and "uuid__in"
+            filters.
+        page_size: An integer specifying how many task instances to
+            fetch per page.
+
+    Yields:
+        Task instance model instances.
+    """
+    uuids = filters.get("uuid__in", [])
+
+    if not isinstance(uuids, (list, tuple)):
+        uuids = str(uuids).split(",")
+
+    uuids = list(uuids)
+
+    if "uuid" in filters:
+        uuids.append(filters["uuid"])
+
+    cached = cache.get_many(manager, uuids)
+
+    for uuid in uuids:
+        if uuid in cached:
+            yield cached[uuid]
+
+    uncached_uuids = [uuid for uuid in uuids if uuid not in cached]
+
+    for idx in range(0, len(uncached_uuids), IN_FILTER_CHUNK_SIZE):
+        for object in cache.cache_through(
+            iterate_objects(
+                manager,
+                {"uuid__in": uncached_uuids[idx : idx + IN_FILTER_CHUNK_SIZE]},
+                page_size,
+            )
+        ):
+            yield object
+
+
+def query_objects(
+    ctx,
+    manager_name,
+    filters,
+    page_size,
+    paginate=True,
+    fields=None,
+    limit=None,
+):
+    """Query for objects, going through the caches.
+
+    Finished task instances which come back are cached, and queries
+    which select task instances by UUID alone are answered from the
+    cache as far as possible. Metadata pages come through the metadata
+    cache. When working locally, objects come from the local mirror
+    instead.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use.
+        filters: A dictionary containing API filters.
+        page_size: An integer specifying how many objects to fetch per
+            page when paginating.
+        paginate: A boolean specifying whether to fetch objects page by
+            page. Otherwise they're fetched all at once, in pages as
+            big as the server allows.
+        fields: An optional iterable of strings containing the only
+            fields to fetch. If given, objects come back as projected
+            rows (see saltant_cli.pagination.iterate_rows), which
+            aren't cached.
+        limit: An optional integer containing the maximum number of
+            objects to fetch.
+
+    Returns:
+        An iterable of model instances (or projected rows).
+    """
+    manager = getattr(ctx.obj["client"], manager_name)
+    mirror = get_mirror(ctx, manager_name)
+
+    if mirror is not None:
+        return query_mirror(
+            mirror, manager, manager_name, filters, fields, limit
+        )
+
+    cache = get_task_instance_cache(ctx, manager_name)
+    session = get_metadata_session(ctx, manager_name)
+
+    # Don't ask for more than we're going to show
+    if limit is not None:
+        page_size = min(page_size, limit)
+    elif not paginate:
+        page_size = ALL_OBJECTS_PAGE_SIZE
+
+    if cache is not None and filters and UUID_FILTERS.issuperset(filters):
+        objects = iterate_cached_task_instances(
+            cache, manager, filters, page_size
+        )
+    elif fields is not None:
+        objects = iterate_rows(manager, fields, filters, page_size, session)
+    else:
+        objects = iterate_objects(manager, filters, page_size, session)
+
+        if cache is not None:
+            objects = cache.cache_through(objects)
+
+    if limit is not None:
+        objects = itertools.islice(objects, limit)
+
+    return objects
+
+
+def parse_identifiers(ctx, identifiers, identifiers_file, identifier_type):
+    """Collect and convert the identifiers given to a get command.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        identifiers: An iterable of strings containing identifiers, or
+            "-" to read identifiers from stdin.
+        identifiers_file: An optional file object to read identifiers
+            from.
+        identifier_type: A click.ParamType object to convert the
+            identifiers with.
+
+    Returns:
+        A list of the converted identifiers, without duplicates.
+
+    Raises:
+        click.BadParameter: An identifier isn't valid.
+    """
+    converted = []
+
+    for identifier in read_identifiers(identifiers, identifiers_file):
+        value = identifier_type.convert(identifier, None, ctx)
+
+        # Compare UUIDs as the strings saltant-py uses
+        if not isinstance(value, int):
+            value = str(value)
+
+        if value not in converted:
+            converted.append(value)
+
+    return converted
+
+
+def fetch_task_instances(ctx, manager_name, uuids):
+    """Fetch many task instances, a chunk of UUIDs per request.
+
+    Finished task instances which are cached come straight from the
+    cache. The rest are fetched with uuid__in queries, several chunks
+    at once.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's task instance manager to use.
+        uuids: A list of strings containing task instance UUIDs.
+
+    Yields:
+        Two-tuples containing each UUID, in the order given, and its
+        task instance model instance, or None if it wasn't found.
+    """
+    manager = getattr(ctx.obj["client"], manager_name)
+    cache = get_task_instance_cache(ctx, manager_name)
+    cached = {} if cache is None else cache.get_many(manager, uuids)
+    chunks = [
+        uuids[idx : idx + IN_FILTER_CHUNK_SIZE]
+        for idx in range(0, len(uuids), IN_FILTER_CHUNK_SIZE)
+    ]
+
+    def fetch_chunk(chunk):
+        uncached_uuids = [uuid for uuid in chunk if uuid not in cached]
+
+        if not uncached_uuids:
+            return {}
+
+        return dict(
+            (object.uuid, object)
+            for object in iterate_objects(
+                manager, {"uuid__in": uncached_uuids}, IN_FILTER_CHUNK_SIZE
+            )
+        )
+
+    # Caching happens back in this thread, which owns the cache's
+    # connection
+    for chunk, fetched in zip(
+        chunks, get_engine(ctx).map(fetch_chunk, chunks)
+    ):
+        for uuid in chunk:
+            if uuid in fetched:
+                if cache is not None:
+                    cache.put(fetched[uuid])
+
+                yield uuid, fetched[uuid]
+            else:
+                yield uuid, cached.get(uuid)
+
+
+def fetch_objects(ctx, manager_name, ids):
+    """Fetch many objects by their primary identifiers.
+
+    Task instances are fetched a chunk at a time with uuid__in queries.
+    Other objects are fetched one request per object, concurrently,
+    unless they come through the metadata cache or the local mirror,
+    whose connections belong to this thread.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use.
+        ids: A list of strings or ints (depending on the object type)
+            containing the primary identifiers of the objects to get.
+
+    Returns:
+        An iterator of two-tuples containing each identifier, in the
+        order given, and its model instance, or None if it wasn't
+        found.
+    """
+    if get_mirror(ctx, manager_name) is None:
+        if manager_name.endswith("task_instances"):
+            return fetch_task_instances(ctx, manager_name, ids)
+
+        if get_metadata_session(ctx, manager_name) is None:
+            manager = getattr(ctx.obj["client"], manager_name)
+
+            def fetch(id):
+                try:
+                    return manager.get(id)
+                except BadHttpRequestError:
+                    return None
+
+            return zip(ids, get_engine(ctx).map(fetch, ids))
+
+    def fetch_locally():
+        for id in ids:
+            try:
+                yield id, get_object(ctx, manager_name, id)
+            except (BadHttpRequestError, NotInMirror):
+                yield id, None
+
+    return fetch_locally()
+
+
+@timed_command
+def generic_get_command(
+    manager_name,
+    attrs,
+    ctx,
+    ids,
+    ids_file=None,
+    id_type=click.STRING,
+    resolve=False,
+):
     """Performs a generic get command.
 
+    A single identifier gets its object displayed on its own. Many
+    identifiers get their objects fetched concurrently and streamed
+    out, as a table or in the session's output format, in the order
+    given. Identifiers which aren't found are reported at the end.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "task_queues".
+        attrs: An iterable containing the attributes of the objects to
+            use when displaying them.
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        ids: An iterable of strings containing the primary identifiers
+            of the objects to get, or "-" to read identifiers from
+            stdin.
+        ids_file: An optional file object to read identifiers from.
+        id_type: A click.ParamType object to convert the identifiers
+            with.
+        resolve: A boolean specifying whether to also show the names
+            the objects' foreign keys refer to.
+    """
+    ids_list = parse_identifiers(ctx, ids, ids_file, id_type)
+
+    if not ids_list:
+        echo_error(ctx, "No identifiers given")
+        ctx.exit(1)
+
+    if len(ids_list) == 1 and list(ids) != ["-"] and ids_file is None:
+        # Query for the object
+        try:
+            object = get_object(ctx, manager_name, ids_list[0])
+        except (BadHttpRequestError, NotInMirror):
+            # Bad request
+            click.echo("%s: not found" % ids_list[0], err=True)
+            ctx.exit(1)
+
+        if resolve:
+            attrs = get_resolved_attrs(manager_name, attrs)
+            object = next(
+                resolve_foreign_keys(ctx, manager_name, [object], attrs)
+            )
+
+        # Output the object
+        output_object(ctx, object, attrs)
+        return
+
+    missing = []
+
+    def found_objects():
+        for id, object in fetch_objects(ctx, manager_name, ids_list):
+            if object is None:
+                missing.append(id)
+            else:
+                yield object
+
+    objects = found_objects()
+
+    if resolve:
+        attrs = get_resolved_attrs(manager_name, attrs)
+        objects = resolve_foreign_keys(ctx, manager_name, objects, attrs)
+
+    # Formatting includes fetching the objects, which are recorded as
+    # requests within it
+    output_format = get_output_format(ctx)
+
+    with measure_phase("format"):
+        if output_format == TABLE:
+            click.echo_via_pager(
+                generate_streamed_table(
+                    objects,
+                    attrs,
+                    max_column_width=get_max_column_width(ctx),
+                )
+            )
+        else:
+            write_objects(
+                objects,
+                attrs,
+                output_format,
+                click.get_text_stream("stdout"),
+            )
+
+    for id in missing:
+        click.echo("%s: not found" % id, err=True)
+
+    if missing:
+        ctx.exit(1)
+
+
+@timed_command
+def generic_put_command(manager_name, attrs, ctx, id, **kwargs):
+    """Performs a generic put command.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "task_queues".
+        attrs: An iterable containing the attributes of the object to
+            use when displaying it.
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        id: A string or int (depending on the object type) containing
+            the primary identifier of the object to update.
+        **kwargs: A dictionary of arbitrary keyword arguments which
+            should match attributes used to update the object.
+    """
+    # Get the client from the context
+    client = ctx.obj["client"]
+
+    # Update the object
+    manager = getattr(client, manager_name)
+    object = manager.put(id, **kwargs)
+    invalidate_metadata(ctx, manager_name)
+
+    # Output the object
+    output_object(ctx, object, attrs)
+
+
+@timed_command
+def generic_create_command(manager_name, attrs, ctx, **kwargs):
+    """Performs a generic create command.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "task_queues".
+        attrs: An iterable containing the attributes of the object to
+            use when displaying it.
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        **kwargs: A dictionary of arbitrary keyword arguments which
+            should match attributes used to create the object.
+    """
+    # Get the client from the context
+    client = ctx.obj["client"]
+
+    # Create the object
+    manager = getattr(client, manager_name)
+    object = manager.create(**kwargs)
+    invalidate_metadata(ctx, manager_name)
+
+    # Output the object
+    output_object(ctx, object, attrs)
+
+
+def read_resume_file(resume_file):
+    """Read which records a resume file says were already submitted.
+
+    Args:
+        resume_file: A string containing the path to a resume file,
+            which may not exist yet.
+
+    Returns:
+        A set of integers containing record numbers.
+    """
+    record_numbers = set()
+
+    try:
+        with open(resume_file) as f:
+            for line in f:
+                try:
+                    record_numbers.add(json.loads(line)["record"])
+                except (KeyError, TypeError, ValueError):
+                    # Most likely a line cut off by the previous run
+                    # being killed
+                    continue
+    except IOError:
+        # No resume file yet
+        pass
+
+    return record_numbers
+
+
+@timed_command
+def generic_create_batch_command(
+    manager_name, ctx, manifest, manifest_format, workers, resume_file
+):
+    """Performs a generic batch create command for task instances.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "executable_task_instances".
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manifest: A file object to read the manifest of task instances
+            to create from. See iterate_manifest in the utils module
+            for the manifest format.
+        manifest_format: A string (or None, to infer it) containing the
+            format of the manifest.
+        workers: An integer specifying the maximum number of task
+            instances to submit at once.
+        resume_file: A string (or None) containing the path to a file
+            recording which records were submitted successfully.
+    """
+    # Get the client from the context
+    client = ctx.obj["client"]
+    manager = getattr(client, manager_name)
+
+    engine = get_engine(ctx, workers)
+
+    # Find records submitted by a previous run
+    if resume_file is None:
+        submitted_records = set()
+    else:
+        submitted_records = read_resume_file(resume_file)
+
+    counts = {"created": 0, "failed": 0, "skipped": 0}
+
+    def pending_records():
+        for record_number, record in iterate_manifest(
+            manifest, manifest_format
+        ):
+            if record_number in submitted_records:
+                counts["skipped"] += 1
+            else:
+                yield record_number, record
+
+    def submit(numbered_record):
+        return manager.create(**parse_manifest_record(numbered_record[1]))
+
+    def submit_records(resume_log):
+        for numbered_record, object, exception in engine.map_unordered(
+            submit, pending_records()
+        ):
+            record_number = numbered_record[0]
+
+            if exception is not None:
+                counts["failed"] += 1
+
+                yield BatchResult(
+                    record_number,
+                    "failed",
+                    None,
+                    " ".join(str(exception).split()),
+                )
+                continue
+
+            counts["created"] += 1
+
+            if resume_log is not None:
+                resume_log.write(
+                    json.dumps({"record": record_number, "uuid": object.uuid})
+                    + "\n"
+                )
+                resume_log.flush()
+
+            yield BatchResult(record_number, "created", object.uuid, None)
+
+    # Submit everything, reporting on each record as it finishes
+    start_time = time.time()
+    resume_log = None if resume_file is None else open(resume_file, "a")
+
+    try:
+        output_format = get_output_format(ctx)
+
+        if output_format == TABLE:
+            for result in submit_records(resume_log):
+                if result.error is None:
+                    click.echo(
+                        "record %d: created %s" % (result.record, result.uuid)
+                    )
+                else:
+                    click.echo(
+                        "record %d: failed: %s" % (result.record, result.error)
+                    )
+        else:
+            write_objects(
+                submit_records(resume_log),
+                BATCH_RESULT_ATTRS,
+                output_format,
+                click.get_text_stream("stdout"),
+            )
+    finally:
+        if resume_log is not None:
+            resume_log.close()
+
+    # Summarize how it went
+    elapsed_time = time.time() - start_time
+
+    click.echo(
+        "Created %d task instances (%d failed, %d skipped) in %.1fs "
+        "(%.1f per second)"
+        % (
+            counts["created"],
+            counts["failed"],
+            counts["skipped"],
+            elapsed_time,
+            counts["created"] / elapsed_time if elapsed_time else 0,
+        ),
+        err=True,
+    )
+
+    if counts["failed"]:
+        ctx.exit(1)
+
+
+@timed_command
+def generic_list_command(
+    manager_name,
+    attrs,
+    ctx,
+    filters,
+    filters_file,
+    stream=False,
+    page_size=DEFAULT_PAGE_SIZE,
+    fields=None,
+    limit=None,
+    ordering=None,
+    max_column_width=None,
+    resolve=False,
+):
+    """Performs a generic list command.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "task_queues".
+        attrs: An iterable containing the attributes of the object to
+            use when displaying the list.
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        filters: A JSON-encoded string containing filter information.
+        filters_file: A string containing a path to a JSON-encoded file
+            specifying filter information.
+        stream: A boolean specifying whether to fetch and show objects
+            page by page rather than all at once.
+        page_size: An integer specifying how many objects to fetch per
+            page when streaming.
+        fields: A string (or None) containing comma-separated fields to
+            show instead of those in attrs.
+        limit: An integer (or None) specifying the maximum number of
+            objects to show.
+        ordering: A string (or None) containing comma-separated fields
+            to have the server order objects by.
+        max_column_width: An integer (or None) containing how many
+            characters of a value to show in the table before truncating
+            it. Defaults to what's in the config file.
+        resolve: A boolean specifying whether to also show the names
+            the objects' foreign keys refer to.
+    """
+    # Build up JSON filters to use
+    combined_filters = combine_filter_json(filters, filters_file)
+
+    if ordering is not None:
+        combined_filters["ordering"] = ordering
+
+    # Only fetch the fields we're going to show
+    if fields is not None:
+        attrs = [field.strip() for field in fields.split(",") if field.strip()]
+
+    # Names resolved from foreign keys are shown alongside them
+    if resolve:
+        shown_attrs = get_resolved_attrs(manager_name, attrs)
+    else:
+        shown_attrs = attrs
+
+    def query(paginate=True):
+        objects = query_objects(
+            ctx,
+            manager_name,
+            combined_filters,
+            page_size,
+            paginate=paginate,
+            fields=attrs,
+            limit=limit,
+        )
+
+        if resolve:
+            objects = resolve_foreign_keys(
+                ctx, manager_name, objects, shown_attrs
+            )
+
+        return objects
+
+    # Query for objects
+    output_format = get_output_format(ctx)
+
+    # Formatting streamed output includes fetching the pages, which
+    # are recorded as requests within it
+    if output_format != TABLE:
+        # Write out records (as their pages arrive, if streaming).
+        # There's no point in formatting anything for a human here, so
+        # skip the table and the pager entirely.
+        with measure_phase("format"):
+            write_objects(
+                query(paginate=stream),
+                shown_attrs,
+                output_format,
+                click.get_text_stream("stdout"),
+            )
+    elif stream:
+        # Show rows as their pages arrive
+        with measure_phase("format"):
+            click.echo_via_pager(
+                generate_streamed_table(
+                    query(),
+                    shown_attrs,
+                    max_column_width=get_max_column_width(
+                        ctx, max_column_width
+                    ),
+                )
+            )
+    else:
+        object_list = query(paginate=False)
+
+        # Output a pretty table, written out a chunk at a time rather
+        # than built up as one big string
+        with measure_phase("format"):
+            click.echo_via_pager(
+                generate_table_chunks(
+                    object_list,
+                    shown_attrs,
+                    get_max_column_width(ctx, max_column_width),
+                )
+            )
+
+
+@timed_command
+def generic_clone_command(manager_name, attrs, ctx, uuid):
+    """Performs a generic clone command for task instances.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "executable_task_instances".
+        attrs: An iterable containing the attributes of the object to
+            use when displaying it.
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        uuid: A string containing the uuid of the task instance to
+            clone.
+    """
+    # Get the client from the context
+    client = ctx.obj["client"]
+
+    # Clone the task instance
+    try:
+        manager = getattr(client, manager_name)
+        object = manager.clone(uuid)
+    except BadHttpRequestError:
+        # Bad request
+        echo_error(ctx, "task instance %s not found" % uuid)
+        return
+
+    # Output the object
+    output_object(ctx, object, attrs)
+
+
+@timed_command
+def generic_terminate_command(manager_name, attrs, ctx, uuid):
+    """Performs a generic terminate command for task instances.
+
+    Args:
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use. For example,
+            "executable_task_instances".
+        attrs: An iterable containing the attributes of the object to
+            use when displaying it.
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        uuid: A string containing the uuid of the task instance to
+            terminate.
+    """
+    # Get the client from the context
+    client = ctx.obj["client"]
+
+    # Terminate the task instance
+    try:
+        manager = getattr(client, manager_name)
+        object = manager.terminate(uuid)
+    except BadHttpRequestError:
+        # Bad request
+        echo_error(ctx, "task instance %s not found" % uuid)
+        return
+
+    # Output the object
+    output_object(ctx, object, attrs)
+
+
+def summarize_exception(exception):
+    """Summarize an exception for grouping similar failures together.
+
+    Args:
+        exception: An Exception object.
+
+    Returns:
+        A short string describing the exception.
+    """
+    if isinstance(exception, BadHttpRequestError):
+        match = STATUS_CODE_RE.search(str(exception))
+
+        if match is not None:
+            return "HTTP status %s" % match.group(1)
+
+    return type(exception).__name__
+
+
+def select_task_instance_uuids(
+    ctx, manager_name, uuids, uuids_file, filters, filters_file
+):
+    """Collect the UUIDs of task instances for a bulk command to act on.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        manager_name: A string containing the name of the
+            saltant.client.Client's manager to use.
+        uuids: An iterable of strings containing UUIDs, or "-" to read
+            UUIDs from stdin.
+        uuids_file: An optional file object to read UUIDs from.
+        filters: A JSON-encoded string (or None) containing filters
+            selecting task instances.
+        filters_file: A string (or None) containing a path to a
+            JSON-encoded file containing filters.
+
+    Returns:
+        A list of strings containing the UUIDs, without duplicates.
+    """
+    selected = read_identifiers(uuids, uuids_file)
+
+    if filters is None and filters_file is None:
+        if not selected:
+            echo_error(ctx, "No task instances given")
+            ctx.exit(1)
+
+        return selected
+
+    combined_filters = combine_filter_json(filters, filters_file)
+
+    if not combined_filters:
+        echo_error(
+            ctx, "Refusing to select every task instance with empty filters"
+        )
+        ctx.exit(1)
+
+    # Collect every match before acting on any of them. Acting on them
+    # can change which task instances match (e.g., terminating running
+    # task instances), which would shift later pages out from under us.
+    # Only their UUIDs are needed, so nothing else is fetched.
+    seen = set(selected)
+
+    for row in query_objects(
+        ctx, manager_name, combined_filters, DEFAULT_PAGE_SIZE, fields=["uuid"]
+    ):
+        uuid = get_attribute(row, "uuid")
+
+        if uuid not in seen:
+            seen.add(uuid)
+            selected.append(uuid)
+
+    return selected
+
+
+@timed_command
+def generic_bulk_command(
+    manager_name,
+    action,
+    ctx,
+    uuids,
+    uuids_file,
+    filters,
+    filters_file,
+    workers,
+    rate,
+    dry_run,
+):
+    """Performs a generic bulk terminate or clone command.
+
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
-            "task_queues".
-        attrs: An iterable containing the attributes of the object to
-            use when displaying it.
+            "executable_task_instances".
+        action: A string containing the action to take on each task
+            instance: either "terminate" or "clone".
         ctx: A click.core.Context object containing information about
             the Click session.
-        id: A string or int (depending on the object type) containing
-            the primary identifier of the object to get.
+        uuids: An iterable of strings containing UUIDs, or "-" to read
+            UUIDs from stdin.
+        uuids_file: An optional file object to read UUIDs from.
+        filters: A JSON-encoded string (or None) containing filters
+            selecting task instances.
+        filters_file: A string (or None) containing a path to a
+            JSON-encoded file containing filters.
+        workers: An integer specifying the maximum number of requests
+            to make at once.
+        rate: A float (or None) containing the maximum number of
+            requests to make per second.
+        dry_run: A boolean specifying whether to only show which task
+            instances would be acted on.
     """
     # Get the client from the context
     client = ctx.obj["client"]
+    manager = getattr(client, manager_name)
+    cache = get_task_instance_cache(ctx, manager_name)
+    past_tense, attrs = BULK_ACTIONS[action]
 
-    # Query for the object
-    try:
-        manager = getattr(client, manager_name)
-        object = manager.get(id)
+    selected_uuids = select_task_instance_uuids(
+        ctx, manager_name, uuids, uuids_file, filters, filters_file
+    )
 
-        # Output a list display of the object
-        output = generate_list_display(object, attrs)
-    except BadHttpRequestError:
-        # Bad request
-        output = "not found"
+    engine = get_engine(ctx, workers)
+    rate_limiter = RateLimiter(rate)
+    failures = collections.Counter()
 
-    click.echo(output)
+    def act(uuid):
+        rate_limiter.wait()
 
+        return getattr(manager, action)(uuid)
 
-def generic_put_command(manager_name, attrs, ctx, id, **kwargs):
-    """Performs a generic put command.
+    def act_on_task_instances():
+        if dry_run:
+            for uuid in selected_uuids:
+                yield BulkResult(uuid, "would be " + past_tense, None, None)
+
+            return
+
+        for uuid, object, exception in engine.map_unordered(
+            act, selected_uuids
+        ):
+            if exception is not None:
+                failures[summarize_exception(exception)] += 1
+
+                yield BulkResult(
+                    uuid, "failed", None, " ".join(str(exception).split())
+                )
+            elif action == "clone":
+                yield BulkResult(uuid, past_tense, object.uuid, None)
+            else:
+                # Terminated task instances may well be finished
+                if cache is not None:
+                    cache.put(object)
+
+                yield BulkResult(uuid, past_tense, None, None)
+
+    # Report on each task instance as it's done
+    start_time = time.time()
+    output_format = get_output_format(ctx)
+
+    if output_format == TABLE:
+        for result in act_on_task_instances():
+            if result.error is not None:
+                click.echo("%s: failed: %s" % (result.uuid, result.error))
+            elif result.clone_uuid is not None:
+                click.echo(
+                    "%s: %s as %s"
+                    % (result.uuid, result.status, result.clone_uuid)
+                )
+            else:
+                click.echo("%s: %s" % (result.uuid, result.status))
+    else:
+        write_objects(
+            act_on_task_instances(),
+            attrs,
+            output_format,
+            click.get_text_stream("stdout"),
+        )
+
+    if dry_run:
+        click.echo(
+            "%d task instances would be %s"
+            % (len(selected_uuids), past_tense),
+            err=True,
+        )
+        return
+
+    # Summarize how it went
+    elapsed_time = time.time() - start_time
+    num_failed = sum(failures.values())
+    num_succeeded = len(selected_uuids) - num_failed
+
+    click.echo(
+        "%s %d of %d task instances in %.1fs (%.1f per second)"
+        % (
+            past_tense.capitalize(),
+            num_succeeded,
+            len(selected_uuids),
+            elapsed_time,
+            len(selected_uuids) / elapsed_time if elapsed_time else 0,
+        ),
+        err=True,
+    )
+
+    if num_failed:
+        click.echo("%d failed:" % num_failed, err=True)
+
+        for reason, count in failures.most_common():
+            click.echo("  %s: %d" % (reason, count), err=True)
+
+        ctx.exit(1)
+
+
+@timed_command
+def generic_wait_command(
+    manager_name,
+    attrs,
+    ctx,
+    uuid,
+    refresh_period=DEFAULT_REFRESH_PERIOD,
+    max_refresh_period=DEFAULT_MAX_REFRESH_PERIOD,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    jitter=DEFAULT_JITTER,
+    show_stats=False,
+):
+    """Performs a generic wait command for task instances.
 
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
-            "task_queues".
+            "executable_task_instances".
         attrs: An iterable containing the attributes of the object to
             use when displaying it.
         ctx: A click.core.Context object containing information about
             the Click session.
-        id: A string or int (depending on the object type) containing
-            the primary identifier of the object to update.
-        **kwargs: A dictionary of arbitrary keyword arguments which
-            should match attributes used to update the object.
+        uuid: A string containing the uuid of the task instance to
+            wait for.
+        refresh_period: A float specifying how many seconds to wait in
+            between checking the task's status at first, and again
+            whenever its status changes.
+        max_refresh_period: A float specifying the most seconds to wait
+            in between checking the task's status.
+        backoff_factor: A float specifying what to multiply the wait in
+            between checks by whenever the task's status is unchanged.
+        jitter: A float specifying the maximum fraction by which to
+            randomly vary each wait.
+        show_stats: A boolean specifying whether to report how many
+            times the task's status was checked.
     """
     # Get the client from the context
     client = ctx.obj["client"]
 
-    # Create the object
-    manager = getattr(client, manager_name)
-    object = manager.put(id, **kwargs)
+    poller = AdaptivePoller(
+        refresh_period, max_refresh_period, backoff_factor, jitter
+    )
+
+    # Terminate the task instance
+    try:
+        manager = getattr(client, manager_name)
+
+        # Wait for the task instance to finish, unless we already know
+        # it has
+        cache = get_task_instance_cache(ctx, manager_name)
+        object = None if cache is None else cache.get(manager, uuid)
 
-    # Output a list display of the object created
-    output = generate_list_display(object, attrs)
+        if object is None:
+            with click_spinner.spinner():
+                object = wait_until_finished(manager, uuid, poller)
 
-    click.echo(output)
+            if cache is not None:
+                cache.put(object)
+    except BadHttpRequestError:
+        # Bad request
+        echo_error(ctx, "task instance %s not found" % uuid)
+        return
 
+    if show_stats:
+        click.echo(poller.summary(), err=True)
 
-def generic_create_command(manager_name, attrs, ctx, **kwargs):
-    """Performs a generic create command.
+    # Output the object
+    output_object(ctx, object, attrs)
+
+
+@timed_command
+def generic_wait_all_command(
+    manager_name,
+    attrs,
+    ctx,
+    uuids,
+    uuids_file,
+    fail_fast,
+    refresh_period=DEFAULT_REFRESH_PERIOD,
+    max_refresh_period=DEFAULT_MAX_REFRESH_PERIOD,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    jitter=DEFAULT_JITTER,
+    show_stats=False,
+):
+    """Performs a generic wait command for many task instances.
+
+    Rather than polling each task instance separately, this polls all
+    of the task instances still running together using list queries
+    filtered by UUID, dropping task instances from the queries as they
+    finish.
 
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
-            "task_queues".
-        attrs: An iterable containing the attributes of the object to
-            use when displaying it.
+            "executable_task_instances".
+        attrs: An iterable containing the attributes of the objects to
+            use when displaying them.
         ctx: A click.core.Context object containing information about
             the Click session.
-        **kwargs: A dictionary of arbitrary keyword arguments which
-            should match attributes used to create the object.
+        uuids: An iterable of strings containing the UUIDs of the task
+            instances to wait for, where "-" means to read UUIDs from
+            stdin.
+        uuids_file: A file object (or None) to read more UUIDs from.
+        fail_fast: A boolean specifying whether to stop waiting as soon
+            as any task instance finishes unsuccessfully.
+        refresh_period: A float specifying how many seconds to wait in
+            between checking the task instances' statuses at first, and
+            again whenever any of their statuses change.
+        max_refresh_period: A float specifying the most seconds to wait
+            in between checking the task instances' statuses.
+        backoff_factor: A float specifying what to multiply the wait in
+            between checks by whenever no statuses change.
+        jitter: A float specifying the maximum fraction by which to
+            randomly vary each wait.
+        show_stats: A boolean specifying whether to report how many
+            times the task instances' statuses were checked.
     """
     # Get the client from the context
     client = ctx.obj["client"]
-
-    # Create the object
     manager = getattr(client, manager_name)
-    object = manager.create(**kwargs)
 
-    # Output a list display of the object created
-    output = generate_list_display(object, attrs)
+    uuids = parse_identifiers(ctx, uuids, uuids_file, click.UUID)
 
-    click.echo(output)
+    # Anything in the cache has already finished
+    cache = get_task_instance_cache(ctx, manager_name)
 
+    if cache is None:
+        finished_objects = {}
+    else:
+        finished_objects = cache.get_many(manager, uuids)
 
-def generic_list_command(manager_name, attrs, ctx, filters, filters_file):
-    """Performs a generic list command.
+    active_uuids = [uuid for uuid in uuids if uuid not in finished_objects]
+    previous_states = {}
+    state_counts = collections.Counter(
+        object.state for object in finished_objects.values()
+    )
+    progress = ProgressLine()
+    poller = AdaptivePoller(
+        refresh_period, max_refresh_period, backoff_factor, jitter
+    )
+
+    engine = get_engine(ctx)
+
+    def poll_chunk(chunk):
+        return list(
+            iterate_objects(manager, {"uuid__in": chunk}, IN_FILTER_CHUNK_SIZE)
+        )
+
+    while True:
+        # Poll every task instance still running, a chunk at a time,
+        # with the chunks polled concurrently
+        chunks = (
+            active_uuids[idx : idx + IN_FILTER_CHUNK_SIZE]
+            for idx in range(0, len(active_uuids), IN_FILTER_CHUNK_SIZE)
+        )
+
+        try:
+            polled_objects = list(
+                itertools.chain.from_iterable(engine.map(poll_chunk, chunks))
+            )
+        except (BadHttpRequestError, requests.RequestException) as e:
+            # Keep waiting on what we have, and try again next time
+            polled_objects = None
+            status_error = "; poll failed: %s" % e
+        else:
+            status_error = ""
+
+        states = {}
+
+        if polled_objects is not None:
+            found_uuids = set()
+
+            for object in polled_objects:
+                found_uuids.add(object.uuid)
+                states[object.uuid] = object.state
+
+                if object.state in TASK_INSTANCE_FINISH_STATUSES:
+                    finished_objects[object.uuid] = object
+                    state_counts[object.state] += 1
+
+                    if cache is not None:
+                        cache.put(object)
+
+            # Drop anything which doesn't exist or has finished
+            for uuid in active_uuids:
+                if uuid not in found_uuids:
+                    progress.clear()
+                    click.echo("task instance %s not found" % uuid, err=True)
+
+            active_uuids = [
+                uuid
+                for uuid in active_uuids
+                if uuid in found_uuids and uuid not in finished_objects
+            ]
+
+        # Show how we're doing
+        progress.update(
+            "%d/%d finished (%s), %d running%s"
+            % (
+                len(finished_objects),
+                len(finished_objects) + len(active_uuids),
+                ", ".join(
+                    "%d %s" % (count, state)
+                    for state, count in sorted(state_counts.items())
+                )
+                or "none yet",
+                len(active_uuids),
+                status_error,
+            )
+        )
+
+        failed = sum(
+            count
+            for state, count in state_counts.items()
+            if state != SUCCESSFUL
+        )
+
+        # Poll quickly again if anything changed
+        poller.record_poll(
+            changed=any(
+                previous_states.get(uuid) != state
+                for uuid, state in states.items()
+            )
+        )
+
+        if polled_objects is not None:
+            previous_states = states
+
+        if not active_uuids or (fail_fast and failed):
+            break
+
+        poller.wait()
+
+    progress.finish()
+
+    if show_stats:
+        click.echo(poller.summary(), err=True)
+
+    # Output the task instances which finished, in the order given
+    objects = [
+        finished_objects[uuid] for uuid in uuids if uuid in finished_objects
+    ]
+    output_format = get_output_format(ctx)
+
+    if output_format == TABLE:
+        click.echo(generate_table(objects, attrs, get_max_column_width(ctx)))
+    else:
+        write_objects(
+            objects, attrs, output_format, click.get_text_stream("stdout")
+        )
+
+    # Fail if anything didn't succeed or didn't finish
+    if failed or len(finished_objects) < len(uuids):
+        ctx.exit(1)
+
+
+@timed_command
+def generic_watch_command(
+    manager_name,
+    attrs,
+    ctx,
+    filters,
+    filters_file,
+    interval=5.0,
+    page_size=DEFAULT_PAGE_SIZE,
+):
+    """Performs a generic watch command for task instances.
+
+    The task instances matching the filters are fetched once, and kept
+    in an index keyed by UUID. From then on, each refresh only asks for
+    task instances created since the newest one seen, and for those
+    which haven't finished yet (finished task instances don't change),
+    and only the rows which changed are redrawn. With JSON lines
+    output, changed rows are written as they change, and task instances
+    which no longer match the filters are written as records with just
+    their UUID and "removed" set to true.
 
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
-            "task_queues".
-        attrs: An iterable containing the attributes of the object to
-            use when displaying the list.
+            "executable_task_instances".
+        attrs: An iterable containing the attributes of the objects to
+            use when displaying them.
         ctx: A click.core.Context object containing information about
             the Click session.
         filters: A JSON-encoded string containing filter information.
         filters_file: A string containing a path to a JSON-encoded file
             specifying filter information.
+        interval: A float specifying how many seconds to wait in
+            between refreshes.
+        page_size: An integer specifying how many objects to fetch per
+            page.
     """
+    if ctx.obj.get("source") == LOCAL:
+        raise click.UsageError("watch needs the server, not the local mirror")
+
+    output_format = get_output_format(ctx)
+
+    if output_format not in (TABLE, JSON_LINES):
+        raise click.UsageError(
+            "watch only supports the %s and %s output formats"
+            % (TABLE, JSON_LINES)
+        )
+
     # Get the client from the context
     client = ctx.obj["client"]
+    manager = getattr(client, manager_name)
 
-    # Build up JSON filters to use
     combined_filters = combine_filter_json(filters, filters_file)
 
-    # Query for objects
-    manager = getattr(client, manager_name)
-    object_list = manager.list(combined_filters)
+    # We need these to know what to ask for on each refresh
+    fields = list(attrs) + [
+        field
+        for field in ("uuid", "state", "datetime_created")
+        if field not in attrs
+    ]
 
-    # Output a pretty table
-    output = generate_table(object_list, attrs)
+    index = collections.OrderedDict()
+    latest_created = None
 
-    click.echo_via_pager(output)
+    def refresh():
+        """Fetch what's changed since the last refresh.
 
+        Returns:
+            A two-tuple containing a list of rows which are new or have
+            changed, and a list of the UUIDs of rows which no longer
+            match the filters.
+        """
+        active_uuids = [
+            uuid
+            for uuid, row in index.items()
+            if row["state"] not in TASK_INSTANCE_FINISH_STATUSES
+        ]
 
-def generic_clone_command(manager_name, attrs, ctx, uuid):
-    """Performs a generic clone command for task instances.
+        # Ask for anything created since the newest task instance seen
+        queries = [
+            (
+                dict(
+                    combined_filters,
+                    datetime_created__gte=latest_created.isoformat(),
+                )
+                if latest_created is not None
+                else combined_filters
+            )
+        ]
+
+        # And for whatever could have changed
+        for idx in range(0, len(active_uuids), IN_FILTER_CHUNK_SIZE):
+            queries.append(
+                dict(
+                    combined_filters,
+                    uuid__in=active_uuids[idx : idx + IN_FILTER_CHUNK_SIZE],
+                )
+            )
+
+        changed = []
+        found_uuids = set()
+
+        for query in queries:
+            for row in iterate_rows(manager, fields, query, page_size):
+                # The newest task instance can turn up in two queries
+                if row["uuid"] in found_uuids:
+                    continue
+
+                found_uuids.add(row["uuid"])
+
+                if index.get(row["uuid"]) != row:
+                    changed.append(row)
+
+        # Active task instances which weren't found no longer match
+        removed = [uuid for uuid in active_uuids if uuid not in found_uuids]
+
+        return changed, removed
+
+    table = LiveTable(attrs) if output_format == TABLE else None
+    stdout = click.get_text_stream("stdout")
+    status_error = ""
+
+    try:
+        while True:
+            try:
+                changed, removed = refresh()
+            except (BadHttpRequestError, requests.RequestException) as e:
+                # Keep showing what we have, and try again next time
+                changed, removed = [], []
+                status_error = "; refresh failed: %s" % e
+            else:
+                status_error = ""
+
+            for row in changed:
+                index[row["uuid"]] = row
+
+                if (
+                    latest_created is None
+                    or row["datetime_created"] > latest_created
+                ):
+                    latest_created = row["datetime_created"]
+
+            for uuid in removed:
+                del index[uuid]
+
+            if table is None:
+                # Rows which left are marked as removed, so that readers
+                # of the stream can drop them too
+                write_objects(changed, attrs, output_format, stdout)
+                write_objects(
+                    ({"uuid": uuid, "removed": True} for uuid in removed),
+                    ("uuid", "removed"),
+                    output_format,
+                    stdout,
+                )
+                stdout.flush()
+            else:
+                state_counts = collections.Counter(
+                    row["state"] for row in index.values()
+                )
+                table.update(
+                    changed,
+                    removed,
+                    status="Every %gs: %d task instances (%s), updated %s%s"
+                    % (
+                        interval,
+                        len(index),
+                        ", ".join(
+                            "%d %s" % (count, state)
+                            for state, count in sorted(state_counts.items())
+                        )
+                        or "none",
+                        time.strftime("%H:%M:%S"),
+                        status_error,
+                    ),
+                )
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if table is not None:
+            table.finish()
+
+
+@timed_command
+def generic_stats_command(
+    manager_name,
+    ctx,
+    filters,
+    filters_file,
+    page_size=DEFAULT_PAGE_SIZE,
+    bucket_seconds=DEFAULT_BUCKET_SECONDS,
+    percentiles=None,
+):
+    """Performs a generic stats command for task instances.
+
+    The task instances matching the filters are streamed through once,
+    page by page (or straight out of the local mirror), fetching only
+    the fields needed, and aggregated with bounded memory (see
+    saltant_cli.stats).
 
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
             "executable_task_instances".
-        attrs: An iterable containing the attributes of the object to
-            use when displaying it.
         ctx: A click.core.Context object containing information about
             the Click session.
-        uuid: A string containing the uuid of the task instance to
-            clone.
+        filters: A JSON-encoded string containing filter information.
+        filters_file: A string containing a path to a JSON-encoded file
+            specifying filter information.
+        page_size: An integer specifying how many objects to fetch per
+            page.
+        bucket_seconds: An integer specifying the initial width of the
+            throughput histogram's periods in seconds.
+        percentiles: A string (or None) containing comma-separated
+            percentiles of durations to show.
     """
+    if percentiles is None:
+        percentiles = DURATION_PERCENTILES
+    else:
+        try:
+            percentiles = [
+                float(percentile)
+                for percentile in percentiles.split(",")
+                if percentile.strip()
+            ]
+        except ValueError:
+            percentiles = None
+
+        if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+            raise click.BadParameter(
+                "must be comma-separated numbers from 0 to 100",
+                param_hint="--percentiles",
+            )
+
     # Get the client from the context
     client = ctx.obj["client"]
+    manager = getattr(client, manager_name)
+
+    combined_filters = combine_filter_json(filters, filters_file)
+    fields = list(COUNT_ATTRS) + ["datetime_created", "datetime_finished"]
+
+    mirror = get_mirror(ctx, manager_name)
+
+    if mirror is None:
+        rows = iterate_rows(manager, fields, combined_filters, page_size)
+    else:
+        rows = query_mirror(
+            mirror, manager, manager_name, combined_filters, fields, None
+        )
+
+    stats = TaskInstanceStats(bucket_seconds)
+    progress = ProgressLine()
+
+    for row in rows:
+        stats.add(row)
+
+        if stats.count % STATS_PROGRESS_INTERVAL == 0:
+            progress.update("Read %d task instances" % stats.count)
+
+    progress.clear()
+
+    with measure_phase("format"):
+        durations = stats.duration_summary(percentiles)
+        throughput = list(stats.throughput.rows())
+        output_format = get_output_format(ctx)
+
+        if output_format != TABLE:
+            statistics = [Statistic("count", "task_instances", stats.count)]
+
+            for attr, counter in stats.counts.items():
+                statistics.extend(
+                    Statistic(attr, value, count)
+                    for value, count in counter.most_common()
+                )
+
+            statistics.extend(
+                Statistic("duration", name, value)
+                for name, value in durations.items()
+            )
+
+            for row in throughput:
+                statistics.extend(
+                    Statistic(series, row["period"], row[series])
+                    for series in stats.throughput.series
+                )
+
+            write_objects(
+                statistics,
+                STATISTIC_ATTRS,
+                output_format,
+                click.get_text_stream("stdout"),
+            )
+            return
+
+        # Output a pretty table for each kind of statistic
+        click.echo("%d task instances" % stats.count)
+
+        for attr, counter in stats.counts.items():
+            click.echo()
+            click.echo(
+                generate_table(
+                    [
+                        collections.OrderedDict(
+                            [(attr, value), ("count", count)]
+                        )
+                        for value, count in counter.most_common()
+                    ],
+                    (attr, "count"),
+                )
+            )
+
+        click.echo()
+        click.echo("Durations (seconds)")
+        click.echo(
+            generate_table(
+                [
+                    collections.OrderedDict(
+                        (name, round(value, 3) if value is not None else None)
+                        for name, value in durations.items()
+                    )
+                ],
+                list(durations),
+            )
+        )
+
+        click.echo()
+        click.echo(
+            "Throughput (per %d seconds)" % stats.throughput.bucket_seconds
+        )
+        click.echo(
+            generate_table(throughput, ("period",) + stats.throughput.series)
+        )
+
+
+def get_artifact_url(ctx, kind, task_instance):
+    """Get where a task instance's logs or results are.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        kind: A string containing what to get: "logs" or "results".
+        task_instance: A task instance model instance.
+
+    Returns:
+        A string containing the URL, filled in from the template in
+        the config file.
+
+    Raises:
+        click.ClickException: The config file doesn't have a valid
+            template.
+    """
+    key = "%s-url" % kind
+    template = (ctx.obj.get("config", {}).get("artifacts") or {}).get(key)
+
+    if not template:
+        raise click.ClickException(
+            "Set %s in the artifacts section of the config file to fetch "
+            "task instances' %s" % (key, kind)
+        )
+
+    fields = dict(
+        (attr, getattr(task_instance, attr)) for attr in ARTIFACT_URL_FIELDS
+    )
 
-    # Clone the task instance
     try:
-        manager = getattr(client, manager_name)
-        object = manager.clone(uuid)
+        return template.format(**fields)
+    except (IndexError, KeyError, ValueError) as e:
+        raise click.ClickException(
+            "Invalid %s in the config file: %r" % (key, e)
+        )
 
-        # Output a list display of the task instance
-        output = generate_list_display(object, attrs)
-    except BadHttpRequestError:
-        # Bad request
-        output = "task instance %s not found" % uuid
 
-    click.echo(output)
+def get_artifact_headers(ctx, url):
+    """Get the headers to request logs or results with.
 
+    The client's session sends the saltant auth token with every
+    request, which only the saltant server itself should see.
 
-def generic_terminate_command(manager_name, attrs, ctx, uuid):
-    """Performs a generic terminate command for task instances.
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        url: A string containing the URL of the logs or results.
+
+    Returns:
+        A dictionary containing headers to add to (or, with values of
+        None, remove from) the session's.
+    """
+    api_url = urlsplit(ctx.obj["client"].base_api_url)
+    artifact_url = urlsplit(url)
+
+    if (artifact_url.scheme, artifact_url.netloc) == (
+        api_url.scheme,
+        api_url.netloc,
+    ):
+        return {}
+
+    return {"Authorization": None}
+
+
+def write_artifact(ctx, kind, task_instance):
+    """Write a task instance's logs or results to stdout.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+        kind: A string containing what to get: "logs" or "results".
+        task_instance: A task instance model instance.
+
+    Raises:
+        saltant_cli.exceptions.DownloadFailed: The logs or results
+            couldn't be downloaded.
+    """
+    url = get_artifact_url(ctx, kind, task_instance)
+    stdout = click.get_binary_stream("stdout")
+
+    # Only finished task instances' artifacts are done changing
+    cache = get_artifact_cache(ctx) if is_finished(task_instance) else None
+    cached_path = None if cache is None else cache.get(url)
+
+    if cached_path is not None:
+        copy_file_to_stream(cached_path, stdout)
+        stdout.flush()
+        return
+
+    temporary_path = None if cache is None else cache.make_temporary_path()
+
+    try:
+        digest, size = download_to_stream(
+            ctx.obj["client"].session,
+            url,
+            stdout,
+            temporary_path,
+            get_artifact_headers(ctx, url),
+        )
+    except Exception:
+        if temporary_path is not None:
+            os.remove(temporary_path)
+
+        raise
+
+    if cache is not None:
+        cache.put(url, temporary_path, digest, size)
+
+
+@timed_command
+def generic_artifact_command(
+    manager_name, kind, ctx, uuids, uuids_file, output_dir
+):
+    """Performs a generic logs or results command for task instances.
+
+    Artifacts (logs or results) of finished task instances come from
+    the artifact cache when they're in it, and are added to it when
+    they're not. Others are always downloaded. Downloads to a directory
+    are made concurrently, and resume partial downloads left there by
+    previous runs.
 
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
             "executable_task_instances".
-        attrs: An iterable containing the attributes of the object to
-            use when displaying it.
+        kind: A string containing what to get: "logs" or "results".
         ctx: A click.core.Context object containing information about
             the Click session.
-        uuid: A string containing the uuid of the task instance to
-            terminate.
+        uuids: An iterable of strings containing UUIDs, or "-" to read
+            UUIDs from stdin.
+        uuids_file: An optional file object to read UUIDs from.
+        output_dir: A string (or None) containing the path to a
+            directory to save artifacts in, as <uuid>.<kind>. Without
+            one, a single task instance's artifact is written to
+            stdout.
     """
-    # Get the client from the context
-    client = ctx.obj["client"]
+    uuid_list = parse_identifiers(ctx, uuids, uuids_file, click.UUID)
 
-    # Terminate the task instance
-    try:
-        manager = getattr(client, manager_name)
-        object = manager.terminate(uuid)
+    if not uuid_list:
+        echo_error(ctx, "No task instances given")
+        ctx.exit(1)
 
-        # Output a list display of the task instance
-        output = generate_list_display(object, attrs)
-    except BadHttpRequestError:
-        # Bad request
-        output = "task instance %s not found" % uuid
+    if output_dir is None:
+        if len(uuid_list) > 1:
+            raise click.UsageError(
+                "Give --output-dir to get %s for more than one task "
+                "instance" % kind
+            )
 
-    click.echo(output)
+        try:
+            task_instance = get_object(ctx, manager_name, uuid_list[0])
+        except (BadHttpRequestError, NotInMirror):
+            click.echo("not found", err=True)
+            ctx.exit(1)
 
+        try:
+            write_artifact(ctx, kind, task_instance)
+        except DownloadFailed as e:
+            click.echo(str(e), err=True)
+            ctx.exit(1)
 
-def generic_wait_command(manager_name, attrs, ctx, uuid, refresh_period):
-    """Performs a generic wait command for task instances.
+        return
+
+    make_directories(output_dir)
+
+    session = ctx.obj["client"].session
+    cache = get_artifact_cache(ctx)
+    results = []
+    jobs = []
+    failures = []
+
+    # Work out what to fetch, and what's cached already
+    for uuid, task_instance in fetch_objects(ctx, manager_name, uuid_list):
+        if task_instance is None:
+            failures.append(uuid)
+            results.append(
+                DownloadResult(
+                    uuid, "failed", None, None, "task instance not found"
+                )
+            )
+            continue
+
+        url = get_artifact_url(ctx, kind, task_instance)
+        keep = cache is not None and is_finished(task_instance)
+        jobs.append(
+            ArtifactJob(
+                uuid,
+                url,
+                get_artifact_headers(ctx, url),
+                os.path.join(output_dir, "%s.%s" % (uuid, kind)),
+                cache.get(url) if keep else None,
+                keep,
+            )
+        )
+
+    def fetch(job):
+        if job.cached_path is not None:
+            shutil.copyfile(job.cached_path, job.path)
+
+            return "cached", os.path.getsize(job.path), None, None
+
+        digest, size = download_to_file(
+            session, job.url, job.path, job.headers
+        )
+
+        # Copy it for the cache, which is only written to from the
+        # main thread
+        if job.keep:
+            temporary_path = cache.make_temporary_path()
+            shutil.copyfile(job.path, temporary_path)
+        else:
+            temporary_path = None
+
+        return "downloaded", size, digest, temporary_path
+
+    def fetch_artifacts():
+        for result in results:
+            yield result
+
+        for job, outcome, exception in get_engine(ctx).map_unordered(
+            fetch, jobs
+        ):
+            if exception is not None:
+                failures.append(job.uuid)
+
+                yield DownloadResult(
+                    job.uuid,
+                    "failed",
+                    None,
+                    None,
+                    " ".join(str(exception).split()),
+                )
+                continue
+
+            status, size, digest, temporary_path = outcome
+
+            if temporary_path is not None:
+                cache.put(job.url, temporary_path, digest, size)
+
+            yield DownloadResult(job.uuid, status, job.path, size, None)
+
+    # Report on each task instance as its artifact arrives
+    start_time = time.time()
+    output_format = get_output_format(ctx)
+
+    if output_format == TABLE:
+        for result in fetch_artifacts():
+            if result.error is not None:
+                click.echo("%s: failed: %s" % (result.uuid, result.error))
+            else:
+                click.echo(
+                    "%s: %s %s (%d bytes)"
+                    % (result.uuid, result.status, result.path, result.bytes)
+                )
+    else:
+        write_objects(
+            fetch_artifacts(),
+            DOWNLOAD_RESULT_ATTRS,
+            output_format,
+            click.get_text_stream("stdout"),
+        )
+
+    # Summarize how it went
+    elapsed_time = time.time() - start_time
+
+    click.echo(
+        "Got %s for %d of %d task instances in %.1fs"
+        % (
+            kind,
+            len(uuid_list) - len(failures),
+            len(uuid_list),
+            elapsed_time,
+        ),
+        err=True,
+    )
+
+    if failures:
+        ctx.exit(1)
+
+
+@timed_command
+def generic_follow_logs_command(
+    manager_name,
+    ctx,
+    uuids,
+    uuids_file,
+    output_dir,
+    refresh_period=DEFAULT_REFRESH_PERIOD,
+    max_refresh_period=DEFAULT_MAX_REFRESH_PERIOD,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    jitter=DEFAULT_JITTER,
+    show_stats=False,
+):
+    """Performs a generic logs --follow command for task instances.
+
+    The task instance is polled just as by the wait command, and after
+    each poll whatever has been added to its logs since the last is
+    requested (with a Range header starting at the offset already
+    written) and written to stdout. Polls back off while neither the
+    task instance's state nor its logs change. Once the task instance
+    has finished, the rest of its logs are written and the command
+    exits.
 
     Args:
         manager_name: A string containing the name of the
             saltant.client.Client's manager to use. For example,
             "executable_task_instances".
-        attrs: An iterable containing the attributes of the object to
-            use when displaying it.
         ctx: A click.core.Context object containing information about
             the Click session.
-        uuid: A string containing the uuid of the task instance to
-            wait for.
+        uuids: An iterable of strings containing the UUID of the task
+            instance to follow, or "-" to read it from stdin.
+        uuids_file: An optional file object to read the UUID from.
+        output_dir: A string (or None) containing a directory to save
+            logs in, which isn't supported when following.
         refresh_period: A float specifying how many seconds to wait in
-            between checking the task's status.
+            between polls at first, and again whenever something
+            changes.
+        max_refresh_period: A float specifying the most seconds to wait
+            in between polls.
+        backoff_factor: A float specifying what to multiply the wait in
+            between polls by whenever nothing changes.
+        jitter: A float specifying the maximum fraction by which to
+            randomly vary each wait.
+        show_stats: A boolean specifying whether to report how many
+            polls were made.
     """
-    # Get the client from the context
+    uuid_list = parse_identifiers(ctx, uuids, uuids_file, click.UUID)
+
+    if len(uuid_list) != 1 or output_dir is not None:
+        raise click.UsageError(
+            "--follow takes exactly one task instance, and writes its logs "
+            "to stdout"
+        )
+
+    uuid = uuid_list[0]
     client = ctx.obj["client"]
+    manager = getattr(client, manager_name)
 
-    # Terminate the task instance
-    try:
-        manager = getattr(client, manager_name)
+    # Finished task instances' logs are done growing
+    cache = get_task_instance_cache(ctx, manager_name)
+    task_instance = None if cache is None else cache.get(manager, uuid)
+
+    if task_instance is not None:
+        try:
+            write_artifact(ctx, "logs", task_instance)
+        except DownloadFailed as e:
+            click.echo(str(e), err=True)
+            ctx.exit(1)
+
+        return
+
+    stdout = click.get_binary_stream("stdout")
+    poller = AdaptivePoller(
+        refresh_period, max_refresh_period, backoff_factor, jitter
+    )
+
+    # How much of the logs has been written, and whether they've been
+    # found at all yet
+    progress = {"offset": 0, "found": False}
 
-        # Wait for the task instance to finish
-        with click_spinner.spinner():
-            object = manager.wait_until_finished(uuid, refresh_period)
+    def write(chunk):
+        stdout.write(chunk)
+        stdout.flush()
 
-        # Output a list display of the task instance
-        output = generate_list_display(object, attrs)
+    def write_new_logs(task_instance):
+        url = get_artifact_url(ctx, "logs", task_instance)
+        offset = progress["offset"]
+
+        try:
+            progress["offset"] = stream_download(
+                client.session,
+                url,
+                write,
+                offset,
+                get_artifact_headers(ctx, url),
+            )
+        except ArtifactNotFound:
+            # Nothing's been logged yet
+            return False
+
+        progress["found"] = True
+
+        return progress["offset"] != offset
+
+    try:
+        task_instance = wait_until_finished(
+            manager, uuid, poller, write_new_logs
+        )
     except BadHttpRequestError:
-        # Bad request
-        output = "task instance %s not found" % uuid
+        click.echo("task instance %s not found" % uuid, err=True)
+        ctx.exit(1)
+    except DownloadFailed as e:
+        click.echo(str(e), err=True)
+        ctx.exit(1)
+
+    if cache is not None:
+        cache.put(task_instance)
+
+    if show_stats:
+        click.echo(
+            "%s; %d bytes of logs" % (poller.summary(), progress["offset"]),
+            err=True,
+        )
 
-    click.echo(output)
+    if not progress["found"]:
+        click.echo(
+            "%s not found" % get_artifact_url(ctx, "logs", task_instance),
+            err=True,
+        )
+        ctx.exit(1)
@@ -0,0 +1,277 @@
+"""Contains the interactive shell command.
+
+Every saltant-cli invocation normally starts a fresh interpreter,
+parses the config file, and opens new connections to the server. The
+shell does all of that once and then runs any number of commands
+against the same client, so its keep-alive connections are reused from
+one command to the next.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import os
+import shlex
+import click
+from ..cache import make_directories
+from ..constants import (
+    PROJECT_CACHE_HOME,
+    SHELL_HISTORY_FILE_NAME,
+    SHELL_HISTORY_LENGTH,
+)
+
+# readline isn't available everywhere (e.g., on Windows); without it
+# the shell has no history or completion, but otherwise works fine
+try:
+    import readline
+except ImportError:
+    readline = None
+
+try:
+    # Python 2
+    read_line = raw_input
+except NameError:
+    read_line = input
+
+PROMPT = "saltant> "
+
+# Commands understood by the shell itself
+EXIT_COMMANDS = ("exit", "quit")
+HELP_COMMANDS = ("help", "?")
+
+
+def run_command_line(command, args, obj, prog_name=None):
+    """Run a command line against an existing Click context object.
+
+    Errors are reported rather than raised, so that one failing
+    command doesn't bring down whatever is running it.
+
+    Args:
+        command: The click.core.Command to run (i.e., the main group).
+        args: A list of strings containing the command line arguments.
+        obj: A dictionary containing the context object to run the
+            command with. Its client and config are reused; everything
+            else set by the main group only lasts for this command.
+        prog_name: An optional string containing the program name to
+            show in usage messages.
+
+    Returns:
+        An integer containing the command's exit code.
+    """
+    try:
+        exit_code = command.main(
+            args=args,
+            prog_name=prog_name or command.name,
+            obj=dict(obj),
+            standalone_mode=False,
+        )
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        return 1
+    except SystemExit as e:
+        # Click exits this way when its output is cut off (e.g., by
+        # piping into head)
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        click.echo("Error: %s" % e, err=True)
+        return 1
+
+    # Commands which finish normally return None
+    return exit_code if isinstance(exit_code, int) else 0
+
+
+class ShellCompleter(object):
+    """Completes commands and options for readline.
+
+    Attributes:
+        ctx: A click.core.Context object for the main group.
+        builtins: A tuple of strings containing commands understood by
+            the shell itself.
+        matches: A list of strings containing the completions for the
+            text currently being completed.
+    """
+
+    def __init__(self, ctx, builtins=()):
+        """Initialize the completer.
+
+        Args:
+            ctx: A click.core.Context object for the main group.
+            builtins: An iterable of strings containing commands
+                understood by the shell itself.
+        """
+        self.ctx = ctx
+        self.builtins = tuple(builtins)
+        self.matches = []
+
+    def get_matches(self, line, text):
+        """Find the completions for a word on a command line.
+
+        Args:
+            line: A string containing the command line up to the word
+                being completed.
+            text: A string containing the part of the word being
+                completed which has been typed so far.
+
+        Returns:
+            A sorted list of strings containing the completions.
+        """
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            # Unterminated quotes
+            words = line.split()
+
+        if text:
+            words = words[:-1]
+
+        # Walk down the command tree as far as the line goes
+        command = self.ctx.command
+
+        for word in words:
+            if isinstance(command, click.MultiCommand):
+                subcommand = command.get_command(self.ctx, word)
+
+                if subcommand is not None:
+                    command = subcommand
+
+        candidates = ["--help"]
+
+        if isinstance(command, click.MultiCommand):
+            candidates.extend(command.list_commands(self.ctx))
+
+        for param in command.params:
+            if isinstance(param, click.Option):
+                candidates.extend(param.opts + param.secondary_opts)
+
+        if command is self.ctx.command:
+            candidates.extend(self.builtins)
+
+        return sorted(
+            set(
+                candidate + " "
+                for candidate in candidates
+                if candidate.startswith(text)
+            )
+        )
+
+    def complete(self, text, state):
+        """Get a completion, as readline asks for them.
+
+        Args:
+            text: A string containing the part of the word being
+                completed which has been typed so far.
+            state: An integer containing the index of the completion
+                being asked for.
+
+        Returns:
+            A string containing the completion, or None if there are no
+            more completions.
+        """
+        if state == 0:
+            line = readline.get_line_buffer()[: readline.get_begidx()]
+            self.matches = self.get_matches(line + text, text)
+
+        try:
+            return self.matches[state]
+        except IndexError:
+            return None
+
+
+def set_up_readline(ctx, history_file):
+    """Set up history and completion for the shell.
+
+    Args:
+        ctx: A click.core.Context object for the main group.
+        history_file: A string containing the path to the history
+            file.
+    """
+    try:
+        readline.read_history_file(history_file)
+    except IOError:
+        # No history yet
+        pass
+
+    readline.set_history_length(SHELL_HISTORY_LENGTH)
+
+    # Command names contain dashes, so only split words on whitespace
+    readline.set_completer_delims(" \t\n")
+    readline.set_completer(
+        ShellCompleter(ctx, EXIT_COMMANDS + HELP_COMMANDS).complete
+    )
+
+    # macOS's Python may use libedit, which binds keys differently
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+
+def save_history(history_file):
+    """Save the shell's history.
+
+    Args:
+        history_file: A string containing the path to the history
+            file.
+    """
+    try:
+        make_directories(os.path.dirname(history_file))
+        readline.write_history_file(history_file)
+    except (IOError, OSError) as e:
+        click.echo("Couldn't save history: %s" % e, err=True)
+
+
+@click.command()
+@click.pass_context
+def shell(ctx):
+    """Run commands interactively, reusing one client.
+
+    Type commands as you would after saltant-cli, e.g., "task-queues
+    list". Type "help" for the list of commands and "exit" (or press
+    Ctrl-D) to leave.
+    """
+    if ctx.obj.get("in_shell"):
+        click.echo("Already in a shell!", err=True)
+        return
+
+    root_ctx = ctx.find_root()
+    history_file = os.path.join(PROJECT_CACHE_HOME, SHELL_HISTORY_FILE_NAME)
+
+    if readline is not None:
+        set_up_readline(root_ctx, history_file)
+
+    obj = dict(ctx.obj, in_shell=True)
+
+    try:
+        while True:
+            try:
+                line = read_line(PROMPT)
+            except KeyboardInterrupt:
+                # Discard the line
+                click.echo()
+                continue
+            except EOFError:
+                click.echo()
+                break
+
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                click.echo("Error: %s" % e, err=True)
+                continue
+
+            if not args:
+                continue
+            elif args[0] in EXIT_COMMANDS:
+                break
+            elif args[0] in HELP_COMMANDS:
+                args = args[1:] + ["--help"]
+
+            run_command_line(
+                root_ctx.command, args, obj, prog_name=root_ctx.info_name
+            )
+    finally:
+        if readline is not None:
+            save_history(history_file)
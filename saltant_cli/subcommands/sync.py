@@ -0,0 +1,236 @@
+"""Contains the command which syncs the local mirror."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import os
+import sqlite3
+import time
+import click
+import requests
+from saltant.constants import CREATED, PUBLISHED, RUNNING
+from saltant.exceptions import BadHttpRequestError
+from ..constants import (
+    DEFAULT_SYNC_PAGE_SIZE,
+    MIRROR_FILE_NAME,
+    PROJECT_CACHE_HOME,
+)
+from ..mirror import MIRRORED_RESOURCES, TASK_INSTANCE_RESOURCES, Mirror
+from ..pagination import iterate_pages
+from .output import TABLE, write_objects
+from .resource import ProgressLine, echo_error, get_output_format
+from .utils import generate_table
+
+# The outcome of syncing one resource
+SyncResult = collections.namedtuple(
+    "SyncResult",
+    ["resource", "sync", "fetched", "deleted", "total", "seconds"],
+)
+SYNC_RESULT_ATTRS = SyncResult._fields
+
+# States task instances can change from
+UNFINISHED_STATES = (CREATED, PUBLISHED, RUNNING)
+
+# Resources which can be synced, as they're named on the command line
+SYNC_RESOURCE_NAMES = collections.OrderedDict(
+    (resource.replace("_", "-"), resource) for resource in MIRRORED_RESOURCES
+)
+
+
+def open_mirror(ctx):
+    """Open the local mirror, exiting if it can't be opened.
+
+    Args:
+        ctx: A click.core.Context object containing information about
+            the Click session.
+
+    Returns:
+        A saltant_cli.mirror.Mirror object, which is closed along with
+        the context.
+    """
+    try:
+        mirror = Mirror(os.path.join(PROJECT_CACHE_HOME, MIRROR_FILE_NAME))
+    except (OSError, sqlite3.Error) as e:
+        click.echo("Couldn't open the local mirror: %s" % e, err=True)
+        ctx.exit(1)
+
+    ctx.call_on_close(mirror.close)
+
+    return mirror
+
+
+def fetch_into_mirror(mirror, manager, resource, queries, page_size, progress):
+    """Fetch the results of list queries into the mirror.
+
+    Each page is written in a single transaction as it arrives.
+
+    Args:
+        mirror: A saltant_cli.mirror.Mirror object.
+        manager: A saltant.models.resource.ModelManager object for the
+            resource.
+        resource: A string containing the name of the resource.
+        queries: An iterable of dictionaries containing API filters.
+        page_size: An integer specifying how many objects to request
+            per page.
+        progress: A ProgressLine object to show progress on.
+
+    Returns:
+        A set containing the primary keys of the records fetched.
+    """
+    key_column = MIRRORED_RESOURCES[resource][0][0]
+    keys = set()
+
+    for query in queries:
+        for page in iterate_pages(manager, query, page_size):
+            mirror.upsert(resource, page)
+            mirror.commit()
+
+            keys.update(record[key_column] for record in page)
+            progress.update("Syncing %s: %d fetched" % (resource, len(keys)))
+
+    return keys
+
+
+def make_task_instance_queries(mirror, resource):
+    """Make the list queries for an incremental task instance sync.
+
+    Args:
+        mirror: A saltant_cli.mirror.Mirror object.
+        resource: A string containing the name of a task instance
+            resource which has been synced before.
+
+    Returns:
+        A list of dictionaries containing API filters.
+    """
+    state = mirror.get_sync_state(resource)
+
+    if state.created_high_water_mark is None:
+        # There was nothing there last time
+        return [{}]
+
+    # Anything created or finished since last time, with some overlap
+    # for anything created or finished at the same moment as the last
+    # task instances seen
+    queries = [{"datetime_created__gte": state.created_high_water_mark}]
+
+    if state.finished_high_water_mark is not None:
+        queries.append(
+            {"datetime_finished__gte": state.finished_high_water_mark}
+        )
+
+    # And anything which hasn't finished, since it might have changed
+    # state without finishing
+    queries.append({"state__in": UNFINISHED_STATES})
+
+    return queries
+
+
+@click.command()
+@click.argument(
+    "resources", nargs=-1, type=click.Choice(list(SYNC_RESOURCE_NAMES))
+)
+@click.option(
+    "--full",
+    help="Pull everything again rather than just what's changed.",
+    is_flag=True,
+)
+@click.option(
+    "--page-size",
+    help="Number of records to fetch per page.",
+    default=DEFAULT_SYNC_PAGE_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.pass_context
+def sync(ctx, resources, full, page_size):
+    """Sync the local mirror (or just the resources named).
+
+    The first sync pulls everything. After that, only task instances
+    created or finished since the last sync (or which haven't finished
+    yet) are fetched. Task types and task queues are few, so they're
+    pulled in full each time.
+    """
+    client = ctx.obj["client"]
+    mirror = open_mirror(ctx)
+
+    # Start over if the mirror is of a different server
+    server = mirror.get_server()
+
+    if server is not None and server != client.base_api_url:
+        click.echo(
+            "The local mirror was of %s. Starting over." % server, err=True
+        )
+        mirror.clear()
+
+    mirror.set_server(client.base_api_url)
+
+    if full:
+        mirror.clear(
+            SYNC_RESOURCE_NAMES[name]
+            for name in resources or SYNC_RESOURCE_NAMES
+        )
+
+    results = []
+    progress = ProgressLine()
+
+    for name in resources or SYNC_RESOURCE_NAMES:
+        resource = SYNC_RESOURCE_NAMES[name]
+        manager = getattr(client, resource)
+        start_time = time.time()
+        deleted = 0
+
+        incremental = (
+            resource in TASK_INSTANCE_RESOURCES
+            and mirror.get_sync_state(resource) is not None
+        )
+
+        if incremental:
+            queries = make_task_instance_queries(mirror, resource)
+        else:
+            queries = [{}]
+
+        try:
+            keys = fetch_into_mirror(
+                mirror, manager, resource, queries, page_size, progress
+            )
+        except (BadHttpRequestError, requests.RequestException) as e:
+            # What's been fetched is kept, but the high-water marks
+            # aren't moved, so the next sync picks up where this left off
+            progress.clear()
+            echo_error(ctx, "Couldn't sync %s: %s" % (resource, e))
+            ctx.exit(1)
+
+        # Pulling everything shows what's been deleted on the server.
+        # Task instances can't be deleted through the API, and holding
+        # every UUID in memory to check would defeat syncing
+        # incrementally, so only the smaller resources are checked.
+        if resource not in TASK_INSTANCE_RESOURCES:
+            deleted = mirror.delete_missing(resource, keys)
+
+        mirror.record_sync(resource)
+
+        results.append(
+            SyncResult(
+                name,
+                "incremental" if incremental else "full",
+                len(keys),
+                deleted,
+                mirror.count(resource),
+                round(time.time() - start_time, 2),
+            )
+        )
+
+    progress.clear()
+
+    output_format = get_output_format(ctx)
+
+    if output_format == TABLE:
+        click.echo(generate_table(results, SYNC_RESULT_ATTRS))
+    else:
+        write_objects(
+            results,
+            SYNC_RESULT_ATTRS,
+            output_format,
+            click.get_text_stream("stdout"),
+        )
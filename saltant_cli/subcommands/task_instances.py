@@ -9,14 +9,33 @@ from __future__ import print_function
 import json
 import click
 from .resource import (
+    generic_artifact_command,
+    generic_bulk_command,
     generic_clone_command,
+    generic_create_batch_command,
     generic_create_command,
+    generic_follow_logs_command,
     generic_get_command,
     generic_list_command,
+    generic_stats_command,
     generic_terminate_command,
+    generic_wait_all_command,
     generic_wait_command,
+    generic_watch_command,
+)
+from .utils import (
+    artifact_options,
+    bulk_action_options,
+    create_batch_options,
+    follow_options,
+    get_options,
+    list_options,
+    polling_options,
+    resolve_option,
+    stats_options,
+    wait_all_options,
+    watch_options,
 )
-from .utils import list_options
 
 # Have a hierarchy of these later if attributes for different types of
 # task instances start to diverge. For now all task instances have the
@@ -51,26 +70,71 @@ def container_task_instances():
 
 
 @container_task_instances.command(name="get")
-@click.argument("uuid", nargs=1, type=click.UUID)
+@get_options("uuid")
+@resolve_option
 @click.pass_context
-def get_container_task_instance(ctx, uuid):
-    """Get a container task instance based on UUID."""
+def get_container_task_instances(ctx, uuids, uuids_file, resolve):
+    """Get container task instances based on UUID.
+
+    Give any number of UUIDs, or - to read them from stdin.
+    """
     generic_get_command(
-        "container_task_instances", TASK_INSTANCE_GET_ATTRS, ctx, str(uuid)
+        "container_task_instances",
+        TASK_INSTANCE_GET_ATTRS,
+        ctx,
+        uuids,
+        uuids_file,
+        click.UUID,
+        resolve,
+    )
+
+
+@container_task_instances.command(name="logs")
+@artifact_options
+@follow_options
+@click.pass_context
+def get_container_task_instance_logs(
+    ctx, uuids, uuids_file, output_dir, follow, **kwargs
+):
+    """Get the logs of container task instances with given UUIDs."""
+    if follow:
+        generic_follow_logs_command(
+            "container_task_instances",
+            ctx,
+            uuids,
+            uuids_file,
+            output_dir,
+            **kwargs
+        )
+    else:
+        generic_artifact_command(
+            "container_task_instances",
+            "logs",
+            ctx,
+            uuids,
+            uuids_file,
+            output_dir,
+        )
+
+
+@container_task_instances.command(name="results")
+@artifact_options
+@click.pass_context
+def get_container_task_instance_results(ctx, **kwargs):
+    """Get the results of container task instances with given UUIDs."""
+    generic_artifact_command(
+        "container_task_instances", "results", ctx, **kwargs
     )
 
 
 @container_task_instances.command(name="list")
 @list_options
+@resolve_option
 @click.pass_context
-def list_container_task_instances(ctx, filters, filters_file):
+def list_container_task_instances(ctx, **kwargs):
     """List container task instances matching filter parameters."""
     generic_list_command(
-        "container_task_instances",
-        TASK_INSTANCE_LIST_ATTRS,
-        ctx,
-        filters,
-        filters_file,
+        "container_task_instances", TASK_INSTANCE_LIST_ATTRS, ctx, **kwargs
     )
 
 
@@ -110,6 +174,19 @@ def create_container_task_instance(ctx, **kwargs):
     )
 
 
+@container_task_instances.command(name="create-batch")
+@create_batch_options
+@click.pass_context
+def create_container_task_instances_batch(ctx, **kwargs):
+    """Create many container task instances from a manifest.
+
+    The manifest is a JSON Lines or CSV file (or - for stdin) with one
+    record per task instance, each with "name", "task_type",
+    "task_queue", and "arguments" fields.
+    """
+    generic_create_batch_command("container_task_instances", ctx, **kwargs)
+
+
 @container_task_instances.command(name="clone")
 @click.argument("uuid", nargs=1, type=click.UUID)
 @click.pass_context
@@ -130,26 +207,93 @@ def terminate_container_task_instance(ctx, uuid):
     )
 
 
+@container_task_instances.command(name="clone-many")
+@bulk_action_options
+@click.pass_context
+def clone_container_task_instances(ctx, **kwargs):
+    """Clone many container task instances.
+
+    Task instances are given by UUID (as arguments, on stdin with -, or
+    in a file) or selected with filters.
+    """
+    generic_bulk_command("container_task_instances", "clone", ctx, **kwargs)
+
+
+@container_task_instances.command(name="terminate-many")
+@bulk_action_options
+@click.pass_context
+def terminate_container_task_instances(ctx, **kwargs):
+    """Terminate many container task instances.
+
+    Task instances are given by UUID (as arguments, on stdin with -, or
+    in a file) or selected with filters.
+    """
+    generic_bulk_command(
+        "container_task_instances", "terminate", ctx, **kwargs
+    )
+
+
 @container_task_instances.command(name="wait")
-@click.option(
-    "--refresh-period",
-    help="Number of seconds to wait in between status checks.",
-    default=5,
-    type=click.FLOAT,
-)
+@polling_options
 @click.argument("uuid", nargs=1, type=click.UUID)
 @click.pass_context
-def wait_for_container_task_instance(ctx, uuid, refresh_period):
+def wait_for_container_task_instance(ctx, uuid, **kwargs):
     """Wait for an container task instance with given UUID to finish."""
     generic_wait_command(
         "container_task_instances",
         TASK_INSTANCE_GET_ATTRS,
         ctx,
         str(uuid),
-        refresh_period,
+        **kwargs
+    )
+
+
+@container_task_instances.command(name="wait-all")
+@wait_all_options
+@click.pass_context
+def wait_for_container_task_instances(ctx, **kwargs):
+    """Wait for many container task instances to finish.
+
+    Give UUIDs as arguments, or - to read them from stdin.
+    """
+    generic_wait_all_command(
+        "container_task_instances", TASK_INSTANCE_LIST_ATTRS, ctx, **kwargs
+    )
+
+
+@container_task_instances.command(name="watch")
+@watch_options
+@click.pass_context
+def watch_container_task_instances(ctx, **kwargs):
+    """Watch a live list of container task instances.
+
+    The list is fetched in full once; after that, only new task
+    instances and those still running are fetched, and only the rows
+    which changed are redrawn. Press Ctrl-C to stop.
+
+    With --output jsonl, changed rows are written as they change, and
+    task instances which no longer match the filters are written as
+    {"uuid": ..., "removed": true}.
+    """
+    generic_watch_command(
+        "container_task_instances", TASK_INSTANCE_LIST_ATTRS, ctx, **kwargs
     )
 
 
+@container_task_instances.command(name="stats")
+@stats_options
+@click.pass_context
+def show_container_task_instance_stats(ctx, **kwargs):
+    """Show statistics about container task instances.
+
+    Counts task instances by state, queue, task type, and user, and
+    shows percentiles of how long they took and how many were created
+    and finished over time. Task instances are streamed through once,
+    so this works on any number of them.
+    """
+    generic_stats_command("container_task_instances", ctx, **kwargs)
+
+
 @click.group()
 def executable_task_instances():
     """Command group for executable task instances."""
@@ -157,26 +301,71 @@ def executable_task_instances():
 
 
 @executable_task_instances.command(name="get")
-@click.argument("uuid", nargs=1, type=click.UUID)
+@get_options("uuid")
+@resolve_option
 @click.pass_context
-def get_executable_task_instance(ctx, uuid):
-    """Get an executable task instance based on UUID."""
+def get_executable_task_instances(ctx, uuids, uuids_file, resolve):
+    """Get executable task instances based on UUID.
+
+    Give any number of UUIDs, or - to read them from stdin.
+    """
     generic_get_command(
-        "executable_task_instances", TASK_INSTANCE_GET_ATTRS, ctx, str(uuid)
+        "executable_task_instances",
+        TASK_INSTANCE_GET_ATTRS,
+        ctx,
+        uuids,
+        uuids_file,
+        click.UUID,
+        resolve,
+    )
+
+
+@executable_task_instances.command(name="logs")
+@artifact_options
+@follow_options
+@click.pass_context
+def get_executable_task_instance_logs(
+    ctx, uuids, uuids_file, output_dir, follow, **kwargs
+):
+    """Get the logs of executable task instances with given UUIDs."""
+    if follow:
+        generic_follow_logs_command(
+            "executable_task_instances",
+            ctx,
+            uuids,
+            uuids_file,
+            output_dir,
+            **kwargs
+        )
+    else:
+        generic_artifact_command(
+            "executable_task_instances",
+            "logs",
+            ctx,
+            uuids,
+            uuids_file,
+            output_dir,
+        )
+
+
+@executable_task_instances.command(name="results")
+@artifact_options
+@click.pass_context
+def get_executable_task_instance_results(ctx, **kwargs):
+    """Get the results of executable task instances with given UUIDs."""
+    generic_artifact_command(
+        "executable_task_instances", "results", ctx, **kwargs
     )
 
 
 @executable_task_instances.command(name="list")
 @list_options
+@resolve_option
 @click.pass_context
-def list_executable_task_instances(ctx, filters, filters_file):
+def list_executable_task_instances(ctx, **kwargs):
     """List executable task instances matching filter parameters."""
     generic_list_command(
-        "executable_task_instances",
-        TASK_INSTANCE_LIST_ATTRS,
-        ctx,
-        filters,
-        filters_file,
+        "executable_task_instances", TASK_INSTANCE_LIST_ATTRS, ctx, **kwargs
     )
 
 
@@ -216,6 +405,19 @@ def create_executable_task_instance(ctx, **kwargs):
     )
 
 
+@executable_task_instances.command(name="create-batch")
+@create_batch_options
+@click.pass_context
+def create_executable_task_instances_batch(ctx, **kwargs):
+    """Create many executable task instances from a manifest.
+
+    The manifest is a JSON Lines or CSV file (or - for stdin) with one
+    record per task instance, each with "name", "task_type",
+    "task_queue", and "arguments" fields.
+    """
+    generic_create_batch_command("executable_task_instances", ctx, **kwargs)
+
+
 @executable_task_instances.command(name="clone")
 @click.argument("uuid", nargs=1, type=click.UUID)
 @click.pass_context
@@ -236,21 +438,88 @@ def terminate_executable_task_instance(ctx, uuid):
     )
 
 
+@executable_task_instances.command(name="clone-many")
+@bulk_action_options
+@click.pass_context
+def clone_executable_task_instances(ctx, **kwargs):
+    """Clone many executable task instances.
+
+    Task instances are given by UUID (as arguments, on stdin with -, or
+    in a file) or selected with filters.
+    """
+    generic_bulk_command("executable_task_instances", "clone", ctx, **kwargs)
+
+
+@executable_task_instances.command(name="terminate-many")
+@bulk_action_options
+@click.pass_context
+def terminate_executable_task_instances(ctx, **kwargs):
+    """Terminate many executable task instances.
+
+    Task instances are given by UUID (as arguments, on stdin with -, or
+    in a file) or selected with filters.
+    """
+    generic_bulk_command(
+        "executable_task_instances", "terminate", ctx, **kwargs
+    )
+
+
 @executable_task_instances.command(name="wait")
-@click.option(
-    "--refresh-period",
-    help="Number of seconds to wait in between status checks.",
-    default=5,
-    type=click.FLOAT,
-)
+@polling_options
 @click.argument("uuid", nargs=1, type=click.UUID)
 @click.pass_context
-def wait_for_executable_task_instance(ctx, uuid, refresh_period):
+def wait_for_executable_task_instance(ctx, uuid, **kwargs):
     """Wait for an executable task instance with given UUID to finish."""
     generic_wait_command(
         "executable_task_instances",
         TASK_INSTANCE_GET_ATTRS,
         ctx,
         str(uuid),
-        refresh_period,
+        **kwargs
+    )
+
+
+@executable_task_instances.command(name="wait-all")
+@wait_all_options
+@click.pass_context
+def wait_for_executable_task_instances(ctx, **kwargs):
+    """Wait for many executable task instances to finish.
+
+    Give UUIDs as arguments, or - to read them from stdin.
+    """
+    generic_wait_all_command(
+        "executable_task_instances", TASK_INSTANCE_LIST_ATTRS, ctx, **kwargs
+    )
+
+
+@executable_task_instances.command(name="watch")
+@watch_options
+@click.pass_context
+def watch_executable_task_instances(ctx, **kwargs):
+    """Watch a live list of executable task instances.
+
+    The list is fetched in full once; after that, only new task
+    instances and those still running are fetched, and only the rows
+    which changed are redrawn. Press Ctrl-C to stop.
+
+    With --output jsonl, changed rows are written as they change, and
+    task instances which no longer match the filters are written as
+    {"uuid": ..., "removed": true}.
+    """
+    generic_watch_command(
+        "executable_task_instances", TASK_INSTANCE_LIST_ATTRS, ctx, **kwargs
     )
+
+
+@executable_task_instances.command(name="stats")
+@stats_options
+@click.pass_context
+def show_executable_task_instance_stats(ctx, **kwargs):
+    """Show statistics about executable task instances.
+
+    Counts task instances by state, queue, task type, and user, and
+    shows percentiles of how long they took and how many were created
+    and finished over time. Task instances are streamed through once,
+    so this works on any number of them.
+    """
+    generic_stats_command("executable_task_instances", ctx, **kwargs)
@@ -10,7 +10,7 @@ from .resource import (
     generic_list_command,
     generic_put_command,
 )
-from .utils import list_options, PythonLiteralOption
+from .utils import get_options, list_options, PythonLiteralOption
 
 TASK_QUEUE_GET_ATTRS = (
     "id",
@@ -41,21 +41,24 @@ def task_queues():
 
 
 @task_queues.command(name="get")
-@click.argument("id", nargs=1, type=click.INT)
+@get_options("id")
 @click.pass_context
-def get_task_queue(ctx, id):
-    """Get task queue based on ID."""
-    generic_get_command("task_queues", TASK_QUEUE_GET_ATTRS, ctx, id)
+def get_task_queues(ctx, ids, ids_file):
+    """Get task queues based on ID.
+
+    Give any number of IDs, or - to read them from stdin.
+    """
+    generic_get_command(
+        "task_queues", TASK_QUEUE_GET_ATTRS, ctx, ids, ids_file, click.INT
+    )
 
 
 @task_queues.command(name="list")
 @list_options
 @click.pass_context
-def list_task_queues(ctx, filters, filters_file):
+def list_task_queues(ctx, **kwargs):
     """List task queues matching filter parameters."""
-    generic_list_command(
-        "task_queues", TASK_QUEUE_LIST_ATTRS, ctx, filters, filters_file
-    )
+    generic_list_command("task_queues", TASK_QUEUE_LIST_ATTRS, ctx, **kwargs)
 
 
 @task_queues.command(name="create")
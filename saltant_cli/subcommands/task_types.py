@@ -14,7 +14,7 @@ from .resource import (
     generic_list_command,
     generic_put_command,
 )
-from .utils import list_options
+from .utils import get_options, list_options
 
 BASE_TASK_TYPE_GET_ATTRS = (
     "id",
@@ -52,26 +52,30 @@ def container_task_types():
 
 
 @container_task_types.command(name="get")
-@click.argument("id", nargs=1, type=click.INT)
+@get_options("id")
 @click.pass_context
-def get_container_task_type(ctx, id):
-    """Get container task type with given ID."""
+def get_container_task_types(ctx, ids, ids_file):
+    """Get container task types with given IDs.
+
+    Give any number of IDs, or - to read them from stdin.
+    """
     generic_get_command(
-        "container_task_types", CONTAINER_TASK_TYPE_GET_ATTRS, ctx, id
+        "container_task_types",
+        CONTAINER_TASK_TYPE_GET_ATTRS,
+        ctx,
+        ids,
+        ids_file,
+        click.INT,
     )
 
 
 @container_task_types.command(name="list")
 @list_options
 @click.pass_context
-def list_container_task_types(ctx, filters, filters_file):
+def list_container_task_types(ctx, **kwargs):
     """List container task types matching filter parameters."""
     generic_list_command(
-        "container_task_types",
-        CONTAINER_TASK_TYPE_LIST_ATTRS,
-        ctx,
-        filters,
-        filters_file,
+        "container_task_types", CONTAINER_TASK_TYPE_LIST_ATTRS, ctx, **kwargs
     )
 
 
@@ -212,26 +216,30 @@ def executable_task_types():
 
 
 @executable_task_types.command(name="get")
-@click.argument("id", nargs=1, type=click.INT)
+@get_options("id")
 @click.pass_context
-def get_executable_task_type(ctx, id):
-    """Get executable task type with given ID."""
+def get_executable_task_types(ctx, ids, ids_file):
+    """Get executable task types with given IDs.
+
+    Give any number of IDs, or - to read them from stdin.
+    """
     generic_get_command(
-        "executable_task_types", EXECUTABLE_TASK_TYPE_GET_ATTRS, ctx, id
+        "executable_task_types",
+        EXECUTABLE_TASK_TYPE_GET_ATTRS,
+        ctx,
+        ids,
+        ids_file,
+        click.INT,
     )
 
 
 @executable_task_types.command(name="list")
 @list_options
 @click.pass_context
-def list_executable_task_types(ctx, filters, filters_file):
+def list_executable_task_types(ctx, **kwargs):
     """List executable types types matching filter parameters."""
     generic_list_command(
-        "executable_task_types",
-        EXECUTABLE_TASK_TYPE_LIST_ATTRS,
-        ctx,
-        filters,
-        filters_file,
+        "executable_task_types", EXECUTABLE_TASK_TYPE_LIST_ATTRS, ctx, **kwargs
     )
 
 
@@ -10,7 +10,7 @@ from .resource import (
     generic_list_command,
     generic_put_command,
 )
-from .utils import list_options, PythonLiteralOption
+from .utils import get_options, list_options, PythonLiteralOption
 
 TASK_WHITELIST_GET_ATTRS = (
     "id",
@@ -30,24 +30,30 @@ def task_whitelists():
 
 
 @task_whitelists.command(name="get")
-@click.argument("id", nargs=1, type=click.INT)
+@get_options("id")
 @click.pass_context
-def get_task_whitelist(ctx, id):
-    """Get task whitelist based on ID."""
-    generic_get_command("task_whitelists", TASK_WHITELIST_GET_ATTRS, ctx, id)
+def get_task_whitelists(ctx, ids, ids_file):
+    """Get task whitelists based on ID.
+
+    Give any number of IDs, or - to read them from stdin.
+    """
+    generic_get_command(
+        "task_whitelists",
+        TASK_WHITELIST_GET_ATTRS,
+        ctx,
+        ids,
+        ids_file,
+        click.INT,
+    )
 
 
 @task_whitelists.command(name="list")
 @list_options
 @click.pass_context
-def list_task_whitelists(ctx, filters, filters_file):
+def list_task_whitelists(ctx, **kwargs):
     """List task whitelists matching filter parameters."""
     generic_list_command(
-        "task_whitelists",
-        TASK_WHITELIST_LIST_ATTRS,
-        ctx,
-        filters,
-        filters_file,
+        "task_whitelists", TASK_WHITELIST_LIST_ATTRS, ctx, **kwargs
     )
 
 
@@ -5,7 +5,7 @@ from __future__ import division
 from __future__ import print_function
 import click
 from .resource import generic_get_command, generic_list_command
-from .utils import list_options
+from .utils import get_options, list_options
 
 USER_ATTRS = ("username", "email")
 
@@ -17,16 +17,19 @@ def users():
 
 
 @users.command(name="get")
-@click.argument("username", nargs=1)
+@get_options("username")
 @click.pass_context
-def get_user(ctx, username):
-    """Get user based on username."""
-    generic_get_command("users", USER_ATTRS, ctx, username)
+def get_users(ctx, usernames, usernames_file):
+    """Get users based on username.
+
+    Give any number of usernames, or - to read them from stdin.
+    """
+    generic_get_command("users", USER_ATTRS, ctx, usernames, usernames_file)
 
 
 @users.command(name="list")
 @list_options
 @click.pass_context
-def list_users(ctx, filters, filters_file):
+def list_users(ctx, **kwargs):
     """List users matching filter parameters."""
-    generic_list_command("users", USER_ATTRS, ctx, filters, filters_file)
+    generic_list_command("users", USER_ATTRS, ctx, **kwargs)
@@ -4,9 +4,41 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 import ast
+import collections
+import csv
+import itertools
 import json
+import numbers
+import os
 import click
 from tabulate import tabulate
+from ..constants import (
+    DEFAULT_MAX_COLUMN_WIDTH,
+    DEFAULT_PAGE_SIZE,
+    TABLE_SAMPLE_SIZE,
+    TABULATE_MAX_ROWS,
+)
+from ..polling import (
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_JITTER,
+    DEFAULT_MAX_REFRESH_PERIOD,
+    DEFAULT_REFRESH_PERIOD,
+)
+from ..stats import (
+    DEFAULT_BUCKET_SECONDS,
+    DEFAULT_MAX_BUCKETS,
+    DURATION_PERCENTILES,
+)
+from .output import get_attribute
+
+# Formats task instance manifests can be in
+MANIFEST_FORMATS = ("jsonl", "csv")
+
+# What truncated table values end with
+TRUNCATION_MARKER = "..."
+
+# How many rows of a table to generate at a time
+TABLE_CHUNK_ROWS = 100
 
 
 class PythonLiteralOption(click.Option):
@@ -22,8 +54,59 @@ class PythonLiteralOption(click.Option):
             raise click.BadParameter(value)
 
 
-def list_options(func):
-    """Adds in --filters and --filters-file options for a command.
+def get_options(identifier_name):
+    """Makes a decorator adding in options for a get command.
+
+    The command takes any number of identifiers, as arguments (with -
+    meaning to read them from stdin) or in a file.
+
+    Args:
+        identifier_name: A string containing what the objects are
+            identified by (e.g., "uuid"), which the argument and file
+            option are named after.
+
+    Returns:
+        A function which adds the options to a command function.
+    """
+    identifiers_argument = click.argument(
+        identifier_name + "s",
+        nargs=-1,
+        metavar="%s..." % identifier_name.upper(),
+    )
+    identifiers_file_option = click.option(
+        "--%ss-file" % identifier_name.replace("_", "-"),
+        help="File containing whitespace-separated identifiers to get.",
+        default=None,
+        type=click.File("r"),
+    )
+
+    def decorator(func):
+        return identifiers_argument(identifiers_file_option(func))
+
+    return decorator
+
+
+def resolve_option(func):
+    """Adds in an option to show names for objects' foreign keys.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    return click.option(
+        "--resolve",
+        help=(
+            "Also show the names of the task queues and task types "
+            "referred to, fetching each only once."
+        ),
+        is_flag=True,
+    )(func)
+
+
+def filter_options(func):
+    """Adds in options for filtering task instances or other objects.
 
     Args:
         func: The function to be enclosed.
@@ -46,6 +129,379 @@ def list_options(func):
     return filters_option(filters_file_option(func))
 
 
+def list_options(func):
+    """Adds in filter and pagination options for a list command.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    stream_option = click.option(
+        "--stream",
+        help=(
+            "Fetch results page by page and show them as they arrive "
+            "instead of all at once."
+        ),
+        is_flag=True,
+    )
+    page_size_option = click.option(
+        "--page-size",
+        help="Number of results to fetch per page when streaming.",
+        default=DEFAULT_PAGE_SIZE,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+
+    fields_option = click.option(
+        "--fields",
+        help=(
+            "Comma-separated fields to show. Only these fields are "
+            "requested from the server, where it supports that."
+        ),
+        default=None,
+    )
+    limit_option = click.option(
+        "--limit",
+        help="Maximum number of results to show.",
+        default=None,
+        type=click.IntRange(min=1),
+    )
+    ordering_option = click.option(
+        "--ordering",
+        help=(
+            "Comma-separated fields to have the server order results by. "
+            'Prefix a field with "-" to order by it in descending order.'
+        ),
+        default=None,
+    )
+    max_column_width_option = click.option(
+        "--max-column-width",
+        help=(
+            "Truncate table values longer than this many characters (0 "
+            "never truncates). Defaults to the config file's "
+            "table.max-column-width, or %d." % DEFAULT_MAX_COLUMN_WIDTH
+        ),
+        default=None,
+        type=click.IntRange(min=0),
+    )
+
+    return filter_options(
+        stream_option(
+            page_size_option(
+                fields_option(
+                    limit_option(
+                        ordering_option(max_column_width_option(func))
+                    )
+                )
+            )
+        )
+    )
+
+
+def create_batch_options(func):
+    """Adds in options for a batch task instance creation command.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    manifest_argument = click.argument("manifest", type=click.File("r"))
+    manifest_format_option = click.option(
+        "--manifest-format",
+        help=(
+            "Format of the manifest. Inferred from the manifest's file "
+            "extension if not given, falling back to jsonl."
+        ),
+        default=None,
+        type=click.Choice(MANIFEST_FORMATS),
+    )
+    workers_option = click.option(
+        "--workers",
+        help=(
+            "Maximum number of task instances to submit at once. The "
+            "global --concurrency option overrides this."
+        ),
+        default=8,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    resume_file_option = click.option(
+        "--resume-file",
+        help=(
+            "File recording which records were submitted successfully. "
+            "Records already recorded in it are skipped, so re-running "
+            "with the same resume file retries only the failures."
+        ),
+        default=None,
+        type=click.Path(dir_okay=False),
+    )
+
+    return manifest_argument(
+        manifest_format_option(workers_option(resume_file_option(func)))
+    )
+
+
+def polling_options(func):
+    """Adds in options controlling how to poll task instances.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    refresh_period_option = click.option(
+        "--refresh-period",
+        help=(
+            "Number of seconds to wait in between status checks at "
+            "first, and whenever a status changes."
+        ),
+        default=DEFAULT_REFRESH_PERIOD,
+        show_default=True,
+        type=click.FLOAT,
+    )
+    max_refresh_period_option = click.option(
+        "--max-refresh-period",
+        help="Maximum number of seconds to wait in between status checks.",
+        default=DEFAULT_MAX_REFRESH_PERIOD,
+        show_default=True,
+        type=click.FLOAT,
+    )
+    backoff_factor_option = click.option(
+        "--backoff-factor",
+        help=(
+            "What to multiply the wait in between status checks by "
+            "each time nothing changes. Use 1 to check at a fixed period."
+        ),
+        default=DEFAULT_BACKOFF_FACTOR,
+        show_default=True,
+        type=click.FloatRange(min=1),
+    )
+    jitter_option = click.option(
+        "--jitter",
+        help=(
+            "Maximum fraction by which to randomly vary each wait, so "
+            "that many waiters don't check at the same moments."
+        ),
+        default=DEFAULT_JITTER,
+        show_default=True,
+        type=click.FloatRange(min=0, max=1),
+    )
+    stats_option = click.option(
+        "--stats",
+        "show_stats",
+        help="Report how many status checks were made.",
+        is_flag=True,
+    )
+
+    return refresh_period_option(
+        max_refresh_period_option(
+            backoff_factor_option(jitter_option(stats_option(func)))
+        )
+    )
+
+
+def wait_all_options(func):
+    """Adds in options for a command waiting on many task instances.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    uuids_argument = click.argument("uuids", nargs=-1)
+    uuids_file_option = click.option(
+        "--uuids-file",
+        help="File containing whitespace-separated UUIDs to wait for.",
+        default=None,
+        type=click.File("r"),
+    )
+    fail_fast_option = click.option(
+        "--fail-fast",
+        help="Stop waiting as soon as any task instance doesn't succeed.",
+        is_flag=True,
+    )
+
+    return uuids_argument(
+        uuids_file_option(fail_fast_option(polling_options(func)))
+    )
+
+
+def bulk_action_options(func):
+    """Adds in options for a command acting on many task instances.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    uuids_argument = click.argument("uuids", nargs=-1)
+    uuids_file_option = click.option(
+        "--uuids-file",
+        help="File containing whitespace-separated UUIDs to act on.",
+        default=None,
+        type=click.File("r"),
+    )
+    workers_option = click.option(
+        "--workers",
+        help=(
+            "Maximum number of requests to make at once. The global "
+            "--concurrency option overrides this."
+        ),
+        default=8,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    rate_option = click.option(
+        "--rate",
+        help=(
+            "Maximum number of requests to make per second. Unlimited "
+            "if not given."
+        ),
+        default=None,
+        type=click.FloatRange(min=0),
+    )
+    dry_run_option = click.option(
+        "--dry-run",
+        help="Show which task instances would be acted on and exit.",
+        is_flag=True,
+    )
+
+    return uuids_argument(
+        uuids_file_option(
+            filter_options(workers_option(rate_option(dry_run_option(func))))
+        )
+    )
+
+
+def artifact_options(func):
+    """Adds in options for a command getting logs or results.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    uuids_argument = click.argument("uuids", nargs=-1)
+    uuids_file_option = click.option(
+        "--uuids-file",
+        help="File containing whitespace-separated UUIDs to get them for.",
+        default=None,
+        type=click.File("r"),
+    )
+    output_dir_option = click.option(
+        "--output-dir",
+        "-d",
+        help=(
+            "Directory to save them in, as <uuid>.logs or "
+            "<uuid>.results. Needed for more than one task instance; "
+            "otherwise they're written to stdout."
+        ),
+        default=None,
+        type=click.Path(file_okay=False),
+    )
+
+    return uuids_argument(uuids_file_option(output_dir_option(func)))
+
+
+def follow_options(func):
+    """Adds in options for following a task instance's logs.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    follow_option = click.option(
+        "--follow",
+        "-f",
+        help=(
+            "Keep writing a task instance's logs as they grow, until it "
+            "finishes. Only new output is requested each time."
+        ),
+        is_flag=True,
+    )
+
+    return follow_option(polling_options(func))
+
+
+def watch_options(func):
+    """Adds in options for a command watching a list of task instances.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    interval_option = click.option(
+        "--interval",
+        help="Number of seconds to wait in between refreshes.",
+        default=5.0,
+        show_default=True,
+        type=click.FloatRange(min=0.1),
+    )
+    page_size_option = click.option(
+        "--page-size",
+        help="Number of results to fetch per page.",
+        default=DEFAULT_PAGE_SIZE,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+
+    return filter_options(interval_option(page_size_option(func)))
+
+
+def stats_options(func):
+    """Adds in options for a command computing task instance statistics.
+
+    Args:
+        func: The function to be enclosed.
+
+    Returns:
+        The enclosed function.
+    """
+    page_size_option = click.option(
+        "--page-size",
+        help="Number of results to fetch per page.",
+        default=DEFAULT_PAGE_SIZE,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    bucket_option = click.option(
+        "--bucket",
+        "bucket_seconds",
+        help=(
+            "Number of seconds in each period of the throughput "
+            "histogram. Periods are widened as needed to keep the "
+            "histogram to %d periods." % DEFAULT_MAX_BUCKETS
+        ),
+        default=DEFAULT_BUCKET_SECONDS,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    percentiles_option = click.option(
+        "--percentiles",
+        help="Comma-separated percentiles of durations to show.",
+        default=",".join(
+            str(percentile) for percentile in DURATION_PERCENTILES
+        ),
+        show_default=True,
+    )
+
+    return filter_options(
+        page_size_option(bucket_option(percentiles_option(func)))
+    )
+
+
 def combine_filter_json(filters, filters_file):
     """Combines filter JSON sources for a list command.
 
@@ -70,23 +526,591 @@ def combine_filter_json(filters, filters_file):
     return combined_filters
 
 
-def generate_table(objects, attrs):
+def read_identifiers(identifiers, identifiers_file=None):
+    """Collect identifiers given as arguments, on stdin, or in a file.
+
+    Args:
+        identifiers: An iterable of strings containing identifiers. An
+            identifier of "-" means to read identifiers from stdin.
+        identifiers_file: An optional file object to read identifiers
+            from.
+
+    Returns:
+        A list of strings containing the identifiers, with duplicates
+        removed, in the order they were first given. Identifiers read
+        from stdin or a file are whitespace-separated.
+    """
+    collected = []
+
+    for identifier in identifiers:
+        if identifier == "-":
+            collected.extend(click.get_text_stream("stdin").read().split())
+        else:
+            collected.append(identifier)
+
+    if identifiers_file is not None:
+        collected.extend(identifiers_file.read().split())
+
+    # Remove duplicates, keeping the first instance of each
+    seen = set()
+
+    return [
+        identifier
+        for identifier in collected
+        if not (identifier in seen or seen.add(identifier))
+    ]
+
+
+def iterate_manifest(manifest_file, manifest_format=None):
+    """Iterate through the raw records of a task instance manifest.
+
+    A manifest is either a JSON Lines file with one JSON object per
+    line, or a CSV file with a header row, describing task instances
+    with "name", "task_type", "task_queue", and "arguments" fields. In
+    CSV manifests, arguments are encoded in JSON. Records are parsed
+    with parse_manifest_record, so that one malformed record doesn't
+    stop the rest from being read.
+
+    Args:
+        manifest_file: A file object to read the manifest from.
+        manifest_format: An optional string containing the format of
+            the manifest (see MANIFEST_FORMATS). If None, the format is
+            inferred from the file's extension.
+
+    Yields:
+        Two-tuples containing the (one-based) number of a record and
+        the raw record: a line of JSON for JSON Lines manifests, or a
+        dictionary of strings for CSV manifests.
+    """
+    if manifest_format is None:
+        extension = os.path.splitext(getattr(manifest_file, "name", ""))[1]
+
+        if extension.lower() == ".csv":
+            manifest_format = "csv"
+        else:
+            manifest_format = "jsonl"
+
+    if manifest_format == "csv":
+        records = csv.DictReader(manifest_file)
+    else:
+        records = (line for line in manifest_file if line.strip())
+
+    for record_number, record in enumerate(records, 1):
+        yield record_number, record
+
+
+def parse_manifest_record(record):
+    """Parse a raw manifest record into task instance create arguments.
+
+    Args:
+        record: A raw record from iterate_manifest.
+
+    Returns:
+        A dictionary containing keyword arguments for a task instance
+        manager's create method.
+
+    Raises:
+        ValueError: The record is malformed.
+    """
+    if not isinstance(record, dict):
+        record = json.loads(record)
+
+        if not isinstance(record, dict):
+            raise ValueError("record isn't a JSON object")
+
+    arguments = record.get("arguments") or {}
+
+    if not isinstance(arguments, dict):
+        arguments = json.loads(arguments)
+
+    for field in ("task_type", "task_queue"):
+        if record.get(field) in (None, ""):
+            raise ValueError("record is missing %s" % field)
+
+    return {
+        "name": record.get("name") or "",
+        "task_type_id": int(record["task_type"]),
+        "task_queue_id": int(record["task_queue"]),
+        "arguments": arguments,
+    }
+
+
+def truncate_value(value, max_width):
+    """Truncate a value's text to a maximum width.
+
+    Args:
+        value: The value to truncate.
+        max_width: An integer containing the most characters to show,
+            or 0 (or None) to show everything.
+
+    Returns:
+        The value unchanged if it's a number, None, or short enough;
+        otherwise a string containing its truncated text.
+    """
+    if not max_width or value is None or isinstance(value, numbers.Number):
+        return value
+
+    text = "%s" % (value,)
+
+    if len(text) <= max_width:
+        return value
+
+    return text[: max(max_width - len(TRUNCATION_MARKER), 0)] + (
+        TRUNCATION_MARKER
+    )
+
+
+def generate_table_chunks(
+    objects, attrs, max_column_width=DEFAULT_MAX_COLUMN_WIDTH
+):
+    """Generate a table for objects a chunk of lines at a time.
+
+    Small tables are laid out by tabulate. Bigger ones are laid out by
+    generate_fast_table, which is much faster and never builds the
+    whole table as one string, so its chunks can be written straight to
+    stdout or a pager.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An interable object of strings containing attributes to
+            get from the above objects.
+        max_column_width: An integer containing how many characters of
+            a value to show before truncating it, or 0 to show
+            everything.
+
+    Yields:
+        Strings containing chunks of lines of the table. Every chunk but
+        the first is prefixed with a newline.
+    """
+    objects = list(objects)
+
+    if len(objects) > TABULATE_MAX_ROWS:
+        for chunk in generate_fast_table(
+            objects, attrs, max_column_width=max_column_width
+        ):
+            yield chunk
+        return
+
+    yield tabulate(
+        [
+            [
+                truncate_value(get_attribute(object, attr), max_column_width)
+                for attr in attrs
+            ]
+            for object in objects
+        ],
+        headers=attrs,
+    )
+
+
+def generate_table(objects, attrs, max_column_width=DEFAULT_MAX_COLUMN_WIDTH):
     """Generate a table for object(s) based on some attributes.
 
     Args:
         objects: An iterable of objects which have specific attributes.
         attrs: An interable object of strings containing attributes to
             get from the above objects.
+        max_column_width: An integer containing how many characters of
+            a value to show before truncating it, or 0 to show
+            everything.
 
     Returns:
         A string containing the tabulated objects with respect to the
         passed in attributes.
     """
-    return tabulate(
-        [[getattr(object, attr) for attr in attrs] for object in objects],
-        headers=attrs,
+    return "".join(generate_table_chunks(objects, attrs, max_column_width))
+
+
+def generate_fast_table(
+    objects,
+    attrs,
+    sample_size=None,
+    max_column_width=DEFAULT_MAX_COLUMN_WIDTH,
+):
+    """Generate a table for objects without tabulate.
+
+    Each value is turned into text once. Column widths come from every
+    object or, given a sample size, just the first few objects, after
+    which the remaining rows are generated as the objects arrive.
+    Values longer than the maximum column width are truncated, which
+    bounds the width of every column; values wider than their column
+    (which only happens when sampling) push the rest of their row out
+    of line.
+
+    The layout matches tabulate's "simple" format: numeric columns are
+    right-aligned, and None is shown as a blank.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An interable object of strings containing attributes to
+            get from the above objects.
+        sample_size: An optional integer specifying how many objects to
+            use to determine column widths. If None, every object is
+            used.
+        max_column_width: An integer containing how many characters of
+            a value to show before truncating it, or 0 to show
+            everything.
+
+    Yields:
+        Strings containing chunks of lines of the table. Every chunk but
+        the first is prefixed with a newline.
+    """
+    attrs = list(attrs)
+    objects = iter(objects)
+
+    # Like tabulate, give headers at least two characters of padding
+    widths = [len(attr) + 2 for attr in attrs]
+    numeric = [True for _ in attrs]
+
+    def to_cells(object):
+        # Turn an object into the text of each of its cells, widening
+        # columns (and finding non-numeric ones) along the way
+        if isinstance(object, dict):
+            values = [object.get(attr) for attr in attrs]
+        else:
+            values = [getattr(object, attr) for attr in attrs]
+
+        cells = []
+
+        for idx, value in enumerate(values):
+            if value is None:
+                cells.append("")
+                continue
+
+            if numeric[idx] and (
+                isinstance(value, bool)
+                or not isinstance(value, numbers.Number)
+            ):
+                numeric[idx] = False
+
+            cell = "%s" % (value,)
+
+            if max_column_width and len(cell) > max_column_width:
+                cell = truncate_value(cell, max_column_width)
+
+            if len(cell) > widths[idx]:
+                widths[idx] = len(cell)
+
+            cells.append(cell)
+
+        return cells
+
+    if sample_size is None:
+        measured = [to_cells(object) for object in objects]
+    else:
+        measured = [
+            to_cells(object)
+            for object in itertools.islice(objects, sample_size)
+        ]
+
+    # Lay rows out with a single format string
+    row_format = "  ".join(
+        ("%%%ds" if is_numeric else "%%-%ds") % width
+        for width, is_numeric in zip(widths, numeric)
+    )
+
+    yield "\n".join(
+        [
+            (row_format % tuple(attrs)).rstrip(),
+            "  ".join("-" * width for width in widths),
+        ]
     )
 
+    rows = itertools.chain(measured, (to_cells(object) for object in objects))
+
+    while True:
+        chunk = [
+            (row_format % tuple(cells)).rstrip()
+            for cells in itertools.islice(rows, TABLE_CHUNK_ROWS)
+        ]
+
+        if not chunk:
+            break
+
+        yield "\n" + "\n".join(chunk)
+
+
+def measure_columns(objects, attrs):
+    """Find the widths and alignments of a table's columns.
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An interable object of strings containing attributes to
+            get from the above objects.
+
+    Returns:
+        A two-tuple containing a list of integers containing the width
+        of each column, and a list of booleans specifying whether each
+        column is numeric (and so right-aligned).
+    """
+    widths = [len(attr) for attr in attrs]
+    numeric = [True for _ in attrs]
+
+    for object in objects:
+        for idx, attr in enumerate(attrs):
+            value = get_attribute(object, attr)
+
+            widths[idx] = max(widths[idx], len(str(value)))
+
+            if isinstance(value, bool) or not isinstance(
+                value, numbers.Number
+            ):
+                numeric[idx] = False
+
+    return widths, numeric
+
+
+def format_table_row(values, widths, numeric):
+    """Format a row of a table.
+
+    Args:
+        values: An iterable of the row's values.
+        widths: An iterable of integers containing the widths of the
+            table's columns.
+        numeric: An iterable of booleans specifying whether each column
+            is right-aligned.
+
+    Returns:
+        A string containing the formatted row.
+    """
+    return "  ".join(
+        str(value).rjust(width) if is_numeric else str(value).ljust(width)
+        for value, width, is_numeric in zip(values, widths, numeric)
+    ).rstrip()
+
+
+def generate_streamed_table(
+    objects,
+    attrs,
+    sample_size=TABLE_SAMPLE_SIZE,
+    max_column_width=DEFAULT_MAX_COLUMN_WIDTH,
+):
+    """Generate a table for objects as they arrive.
+
+    Unlike generate_table, this doesn't need every object up front:
+    column widths are determined from the first few objects, after
+    which rows are generated as the objects arrive (see
+    generate_fast_table).
+
+    Args:
+        objects: An iterable of objects which have specific attributes.
+        attrs: An interable object of strings containing attributes to
+            get from the above objects.
+        sample_size: An integer specifying how many objects to use to
+            determine column widths.
+        max_column_width: An integer containing how many characters of
+            a value to show before truncating it, or 0 to show
+            everything.
+
+    Returns:
+        A generator of strings containing chunks of lines of the table.
+        Every chunk but the first is prefixed with a newline.
+    """
+    return generate_fast_table(objects, attrs, sample_size, max_column_width)
+
+
+class LiveTable(object):
+    """A table on stdout whose rows are redrawn in place as they change.
+
+    On a terminal, changed rows are rewritten where they are (along
+    with a status line above the table), and the whole table is only
+    redrawn when rows are added or removed, a value outgrows its
+    column, or the table doesn't fit on the screen. Otherwise, each
+    update writes the status line and the changed rows as new lines.
+
+    Attributes:
+        attrs: A tuple of strings containing the attributes to show.
+        key_attr: A string containing the attribute identifying rows.
+        rows: An ordered dictionary mapping rows' keys to the rows, in
+            the order they're shown.
+        status: A string containing the status line.
+        is_terminal: A boolean specifying whether stdout is a terminal.
+        widths: A list of integers containing the width of each column.
+        numeric: A list of booleans specifying whether each column is
+            right-aligned.
+        drawn_keys: A list containing the keys of the rows on screen,
+            in order.
+        cursor_line: An integer containing the line of the table (where
+            the status line is line 0) the cursor is on.
+        line_count: An integer containing how many lines the table
+            takes up on screen.
+    """
+
+    # Lines above the rows: the status line, the header, and the rule
+    HEADER_LINES = 3
+
+    def __init__(self, attrs, key_attr="uuid"):
+        """Initialize the table.
+
+        Args:
+            attrs: An iterable of strings containing the attributes to
+                show.
+            key_attr: A string containing the attribute identifying
+                rows.
+        """
+        self.attrs = tuple(attrs)
+        self.key_attr = key_attr
+        self.rows = collections.OrderedDict()
+        self.status = ""
+        self.is_terminal = click.get_text_stream("stdout").isatty()
+        self.widths = None
+        self.numeric = None
+        self.drawn_keys = []
+        self.cursor_line = 0
+        self.line_count = 0
+
+    def format_row(self, row):
+        """Format a row of the table.
+
+        Args:
+            row: An object which has the table's attributes.
+
+        Returns:
+            A string containing the formatted row.
+        """
+        return format_table_row(
+            [get_attribute(row, attr) for attr in self.attrs],
+            self.widths,
+            self.numeric,
+        )
+
+    def fits(self, row):
+        """Check whether a row's values fit in their columns.
+
+        Args:
+            row: An object which has the table's attributes.
+
+        Returns:
+            A boolean specifying whether the row fits.
+        """
+        return all(
+            len(str(get_attribute(row, attr))) <= width
+            for attr, width in zip(self.attrs, self.widths)
+        )
+
+    def write_line(self, line, text):
+        """Overwrite a line of the table on the terminal.
+
+        Args:
+            line: An integer containing the line to overwrite.
+            text: A string containing the line's new text.
+        """
+        offset = line - self.cursor_line
+        move = ""
+
+        if offset < 0:
+            move = "\033[%dA" % -offset
+        elif offset > 0:
+            move = "\033[%dB" % offset
+
+        columns = click.get_terminal_size()[0]
+
+        click.echo(move + "\r\033[2K" + text[:columns], nl=False)
+        self.cursor_line = line
+
+    def draw(self):
+        """Clear the terminal and draw the whole table."""
+        self.widths, self.numeric = measure_columns(
+            self.rows.values(), self.attrs
+        )
+
+        columns, lines = click.get_terminal_size()
+        visible = max(lines - self.HEADER_LINES - 1, 0)
+        self.drawn_keys = list(itertools.islice(self.rows, visible))
+
+        text = [
+            self.status,
+            format_table_row(self.attrs, self.widths, self.numeric),
+            "  ".join("-" * width for width in self.widths),
+        ]
+        text.extend(self.format_row(self.rows[key]) for key in self.drawn_keys)
+
+        if len(self.rows) > visible:
+            text.append("(%d more)" % (len(self.rows) - visible))
+
+        click.echo(
+            "\033[H\033[2J" + "\n".join(line[:columns] for line in text),
+            nl=False,
+        )
+        self.cursor_line = len(text) - 1
+        self.line_count = len(text)
+
+    def update(self, changed=(), removed=(), status=None):
+        """Update rows of the table and show them.
+
+        Args:
+            changed: An iterable of rows which are new or have changed.
+                New rows are added to the bottom of the table.
+            removed: An iterable containing the keys of rows to remove.
+            status: An optional string containing a new status line.
+        """
+        changed = list(changed)
+        removed = [key for key in removed if key in self.rows]
+        added = False
+
+        for row in changed:
+            key = get_attribute(row, self.key_attr)
+            added = added or key not in self.rows
+            self.rows[key] = row
+
+        for key in removed:
+            del self.rows[key]
+
+        if status is not None:
+            self.status = status
+
+        if not self.is_terminal:
+            self.write_lines(changed, removed)
+        elif (
+            self.widths is None
+            or added
+            or removed
+            or not all(self.fits(row) for row in changed)
+        ):
+            self.draw()
+        else:
+            # Rewrite just what changed
+            self.write_line(0, self.status)
+            drawn_lines = {
+                key: line
+                for line, key in enumerate(self.drawn_keys, self.HEADER_LINES)
+            }
+
+            for row in changed:
+                line = drawn_lines.get(get_attribute(row, self.key_attr))
+
+                if line is not None:
+                    self.write_line(line, self.format_row(row))
+
+        click.get_text_stream("stdout").flush()
+
+    def write_lines(self, changed, removed):
+        """Write an update as new lines, for when stdout isn't a terminal.
+
+        Args:
+            changed: A list of rows which are new or have changed.
+            removed: A list containing the keys of removed rows.
+        """
+        if self.widths is None:
+            self.widths, self.numeric = measure_columns(changed, self.attrs)
+            click.echo(self.status)
+            click.echo(format_table_row(self.attrs, self.widths, self.numeric))
+            click.echo("  ".join("-" * width for width in self.widths))
+        elif changed or removed:
+            click.echo(self.status)
+
+        for row in changed:
+            click.echo(self.format_row(row))
+
+        for key in removed:
+            click.echo("%s (removed)" % key)
+
+    def finish(self):
+        """Move the cursor below the table so that the shell can carry on."""
+        if self.is_terminal and self.widths is not None:
+            below = self.line_count - 1 - self.cursor_line
+            click.echo("\033[%dB" % below if below else "")
+
 
 def generate_list_display(object, attrs):
     """Generate a display string for an object based on some attributes.
@@ -101,6 +1125,6 @@ def generate_list_display(object, attrs):
         the passed in attributes.
     """
     return "\n".join(
-        click.style(attr, bold=True) + ": %s" % getattr(object, attr)
+        click.style(attr, bold=True) + ": %s" % get_attribute(object, attr)
         for attr in attrs
     )
@@ -0,0 +1,389 @@
+"""Contains instrumentation for where a command spends its time.
+
+A Recorder collects spans: named, timed stretches of work, which can
+be nested. Besides phases marked explicitly (parsing the config file,
+running a command, formatting output, etc.), a recorder installed on a
+client records every HTTP request the client makes, and how long is
+spent decoding JSON and turning it into model instances.
+
+Spans are summarized per name, with each span's "self" time excluding
+the time spent in spans nested inside it, and can be written out as
+Chrome trace events (see https://ui.perfetto.dev or chrome://tracing).
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+try:
+    # Python 3
+    from urllib.parse import urlsplit
+except ImportError:
+    # Python 2
+    from urlparse import urlsplit
+
+# Roughly when the program started: this module is imported by the main
+# group's module, before anything slow is
+PROCESS_START_TIME = time.time()
+
+# How many requests to list individually in a report
+REPORTED_REQUESTS_LIMIT = 20
+
+# A completed span
+Span = collections.namedtuple(
+    "Span",
+    [
+        "name",
+        "label",
+        "category",
+        "start",
+        "end",
+        "child_time",
+        "thread_id",
+        "args",
+    ],
+)
+
+
+@contextlib.contextmanager
+def null_span():
+    """Do nothing, in place of a span when nothing is being recorded.
+
+    Yields:
+        An empty dictionary, standing in for a span's arguments.
+    """
+    yield {}
+
+
+def measure(recorder, name, category="phase"):
+    """Measure a stretch of work, if anything is being recorded.
+
+    Args:
+        recorder: A Recorder object, or None.
+        name: A string containing the name of the span.
+        category: A string containing the category of the span.
+
+    Returns:
+        A context manager which records the span.
+    """
+    if recorder is None:
+        return null_span()
+
+    return recorder.span(name, category)
+
+
+def get_managers(client):
+    """Get a client's model managers.
+
+    Args:
+        client: A saltant.client.Client object.
+
+    Returns:
+        A list of saltant.models.resource.ModelManager objects.
+    """
+    return [
+        manager
+        for manager in vars(client).values()
+        if hasattr(manager, "response_data_to_model_instance")
+    ]
+
+
+class Recorder(object):
+    """Records spans of work.
+
+    Spans can be recorded from many threads at once; each thread's
+    spans nest separately.
+
+    Attributes:
+        start_time: A float containing when recording started.
+        spans: A list of Span objects recorded so far.
+        lock: A threading.Lock guarding spans.
+        local: A threading.local object holding each thread's stack of
+            open spans' child times.
+    """
+
+    def __init__(self, start_time=None):
+        """Initialize the recorder.
+
+        Args:
+            start_time: An optional float containing when recording
+                started. Defaults to now.
+        """
+        self.start_time = start_time if start_time is not None else time.time()
+        self.spans = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def get_stack(self):
+        """Get the current thread's stack of open spans.
+
+        Returns:
+            A list of one-item lists, each containing the time spent so
+            far in spans nested in an open span.
+        """
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+
+        return self.local.stack
+
+    def add(
+        self, name, category, start, end, args=None, child_time=0.0, label=None
+    ):
+        """Add a completed span.
+
+        The span counts towards the child time of whatever span is open
+        in the current thread.
+
+        Args:
+            name: A string containing the name of the span.
+            category: A string containing the category of the span.
+            start: A float containing when the span started.
+            end: A float containing when the span ended.
+            args: An optional dictionary containing details of the span.
+            child_time: A float containing the time spent in spans
+                nested inside this one.
+            label: An optional string to label the span with in traces,
+                in place of its name.
+        """
+        span = Span(
+            name,
+            label or name,
+            category,
+            start,
+            end,
+            child_time,
+            threading.current_thread().ident,
+            args or {},
+        )
+
+        with self.lock:
+            self.spans.append(span)
+
+        stack = self.get_stack()
+
+        if stack:
+            stack[-1][0] += end - start
+
+    @contextlib.contextmanager
+    def span(self, name, category="phase"):
+        """Record a span around a block of code.
+
+        Args:
+            name: A string containing the name of the span.
+            category: A string containing the category of the span.
+
+        Yields:
+            A dictionary to put details of the span in.
+        """
+        args = {}
+        stack = self.get_stack()
+        stack.append([0.0])
+        start = time.time()
+
+        try:
+            yield args
+        finally:
+            end = time.time()
+            child_time = stack.pop()[0]
+            self.add(name, category, start, end, args, child_time)
+
+    def wrap(self, func, name, category="decode"):
+        """Wrap a function so that each call is recorded as a span.
+
+        Args:
+            func: The function to wrap.
+            name: A string containing the name of the spans.
+            category: A string containing the category of the spans.
+
+        Returns:
+            The wrapped function.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def record_response(self, response, *args, **kwargs):
+        """Record a request (as a requests response hook).
+
+        Requests which aren't streamed have their content read here,
+        so that downloading it counts towards the request. The
+        response's json method is wrapped so that decoding it is
+        recorded too.
+
+        Args:
+            response: A requests.Response object.
+            *args: Positional arguments requests passes hooks, which are
+                ignored.
+            **kwargs: Keyword arguments requests passes hooks (i.e., the
+                arguments the request was sent with).
+
+        Returns:
+            The response.
+        """
+        received = time.time()
+
+        if kwargs.get("stream"):
+            size = int(response.headers.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+
+        url = urlsplit(response.url)
+        self.add(
+            "http",
+            "http",
+            received - response.elapsed.total_seconds(),
+            time.time(),
+            {
+                "method": response.request.method,
+                "url": response.url,
+                "status": response.status_code,
+                "bytes": size,
+            },
+            label="%s %s" % (response.request.method, url.path),
+        )
+
+        response.json = self.wrap(response.json, "decode_json")
+
+        return response
+
+    def install(self, client):
+        """Start recording a client's requests and decoding.
+
+        Args:
+            client: A saltant.client.Client object.
+        """
+        client.session.hooks["response"].append(self.record_response)
+
+        # Shadow each manager's model decoding method with a recorded
+        # one, which saltant-py's own methods then call too
+        for manager in get_managers(client):
+            manager.response_data_to_model_instance = self.wrap(
+                manager.response_data_to_model_instance, "decode_models"
+            )
+
+    def uninstall(self, client):
+        """Stop recording a client's requests and decoding.
+
+        Args:
+            client: A saltant.client.Client object the recorder was
+                installed on.
+        """
+        hooks = client.session.hooks["response"]
+
+        if self.record_response in hooks:
+            hooks.remove(self.record_response)
+
+        for manager in get_managers(client):
+            vars(manager).pop("response_data_to_model_instance", None)
+
+    def summarize(self):
+        """Summarize the spans recorded, per name.
+
+        Returns:
+            An ordered dictionary mapping span names, in the order they
+            were first seen, to three-item lists containing the number
+            of spans, their total time, and their total self time (in
+            seconds).
+        """
+        summary = collections.OrderedDict()
+
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+
+        for span in spans:
+            totals = summary.setdefault(span.name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += span.end - span.start
+            totals[2] += span.end - span.start - span.child_time
+
+        return summary
+
+    def report(self):
+        """Report where the time went.
+
+        Returns:
+            A string containing a table of time spent per span name,
+            followed by a table of the requests made.
+        """
+        from tabulate import tabulate
+
+        total = time.time() - self.start_time
+        rows = [
+            [name, count, round(elapsed * 1000, 1), round(self_time * 1000, 1)]
+            for name, (count, elapsed, self_time) in self.summarize().items()
+        ]
+        lines = [
+            tabulate(rows, headers=["phase", "count", "total ms", "self ms"]),
+            "",
+            "Total: %.1f ms" % (total * 1000),
+        ]
+
+        with self.lock:
+            requests = [span for span in self.spans if span.category == "http"]
+
+        if requests:
+            lines.append("")
+            lines.append(
+                tabulate(
+                    [
+                        [
+                            "%s %s" % (span.args["method"], span.args["url"]),
+                            span.args["status"],
+                            span.args["bytes"],
+                            round((span.end - span.start) * 1000, 1),
+                        ]
+                        for span in requests[:REPORTED_REQUESTS_LIMIT]
+                    ],
+                    headers=["request", "status", "bytes", "ms"],
+                )
+            )
+
+            if len(requests) > REPORTED_REQUESTS_LIMIT:
+                lines.append(
+                    "... and %d more requests"
+                    % (len(requests) - REPORTED_REQUESTS_LIMIT)
+                )
+
+        return "\n".join(lines)
+
+    def write_trace(self, stream):
+        """Write the spans out as Chrome trace events.
+
+        Args:
+            stream: A text file object to write the JSON trace to.
+        """
+        pid = os.getpid()
+
+        with self.lock:
+            spans = list(self.spans)
+
+        json.dump(
+            {
+                "traceEvents": [
+                    {
+                        "name": span.label,
+                        "cat": span.category,
+                        "ph": "X",
+                        "ts": round((span.start - self.start_time) * 1e6),
+                        "dur": round((span.end - span.start) * 1e6),
+                        "pid": pid,
+                        "tid": span.thread_id,
+                        "args": span.args,
+                    }
+                    for span in spans
+                ],
+                "displayTimeUnit": "ms",
+            },
+            stream,
+        )
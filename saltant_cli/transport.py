@@ -0,0 +1,161 @@
+"""Contains settings for how the client talks to the saltant server.
+
+These come from the transport section of the config file, and cover
+how many connections to keep alive, how long to wait to connect and
+for responses, how to retry failed requests, and whether to ask for
+compressed responses.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import numbers
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .constants import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF_FACTOR,
+    RETRY_STATUSES,
+)
+
+# Transport settings, named as they are in the config file
+TransportConfig = collections.namedtuple(
+    "TransportConfig",
+    [
+        "pool_maxsize",
+        "connect_timeout",
+        "read_timeout",
+        "retries",
+        "backoff_factor",
+        "compression",
+    ],
+)
+
+DEFAULT_TRANSPORT_CONFIG = TransportConfig(
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    read_timeout=DEFAULT_READ_TIMEOUT,
+    retries=DEFAULT_RETRIES,
+    backoff_factor=DEFAULT_RETRY_BACKOFF_FACTOR,
+    compression=True,
+)
+
+
+def parse_transport_config(section, max_connections=None):
+    """Parse the transport section of the config file.
+
+    Args:
+        section: A dictionary (or None) containing the transport
+            section of the config file.
+        max_connections: An optional integer which overrides the
+            section's pool-maxsize.
+
+    Returns:
+        A TransportConfig object, with defaults for any settings not
+        given.
+
+    Raises:
+        ValueError: A setting is invalid.
+    """
+    section = section or {}
+
+    if not isinstance(section, dict):
+        raise ValueError("transport must be a mapping of settings")
+
+    settings = DEFAULT_TRANSPORT_CONFIG._asdict()
+
+    for key, value in section.items():
+        field = str(key).replace("-", "_")
+
+        if field not in settings:
+            raise ValueError("unknown transport setting %s" % key)
+
+        if field == "compression":
+            if not isinstance(value, bool):
+                raise ValueError("%s must be true or false" % key)
+        elif (
+            isinstance(value, bool)
+            or not isinstance(value, numbers.Number)
+            or value < 0
+        ):
+            raise ValueError("%s must be a non-negative number" % key)
+        elif field in ("pool_maxsize", "retries") and value != int(value):
+            raise ValueError("%s must be a whole number" % key)
+
+        settings[field] = value
+
+    if max_connections is not None:
+        settings["pool_maxsize"] = max_connections
+
+    if settings["pool_maxsize"] < 1:
+        raise ValueError("pool-maxsize must be at least 1")
+
+    settings["pool_maxsize"] = int(settings["pool_maxsize"])
+    settings["retries"] = int(settings["retries"])
+
+    return TransportConfig(**settings)
+
+
+def make_retry(transport):
+    """Make a retry policy for requests.
+
+    Failures to connect are retried for any request, since the server
+    never saw it. Responses with a status in RETRY_STATUSES (and errors
+    reading responses) are only retried for idempotent requests, so
+    that, e.g., a task instance is never created twice. Retries back
+    off exponentially, or wait as long as the server says to with a
+    Retry-After header.
+
+    Args:
+        transport: A TransportConfig object.
+
+    Returns:
+        A urllib3.util.retry.Retry object.
+    """
+    return Retry(
+        total=transport.retries,
+        backoff_factor=transport.backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        # Hand the last response back rather than raising, so that it's
+        # reported like any other unsuccessful response
+        raise_on_status=False,
+    )
+
+
+def configure_session(session, transport):
+    """Apply transport settings to a client's requests session.
+
+    The timeouts are passed to the client when it's constructed, since
+    it fixes them then (see get_timeout).
+
+    Args:
+        session: A requests.Session object.
+        transport: A TransportConfig object.
+    """
+    adapter = HTTPAdapter(
+        pool_maxsize=transport.pool_maxsize, max_retries=make_retry(transport)
+    )
+
+    for prefix in ("http://", "https://"):
+        session.mount(prefix, adapter)
+
+    if not transport.compression:
+        session.headers["Accept-Encoding"] = "identity"
+
+
+def get_timeout(transport):
+    """Get the timeout to give requests.
+
+    Args:
+        transport: A TransportConfig object.
+
+    Returns:
+        A two-tuple containing the connect and read timeouts in
+        seconds.
+    """
+    return (transport.connect_timeout, transport.read_timeout)
@@ -30,13 +30,14 @@ setup(
         "Programming Language :: Python :: 3.7",
     ],
     packages=find_packages(),
-    entry_points={"console_scripts": ["saltant-cli = saltant_cli.main:main"]},
+    entry_points={"console_scripts": ["saltant-cli = saltant_cli.main:run"]},
     python_requires=">=2.7,!=3.0.*,!=3.1.*,!=3.2.*,!=3.3.*,!=3.4.*",
     install_requires=[
         "Click>=7.0",
         "click-completion>=0.5.0",
         "click-spinner>=0.1.8",
         "colorama>=0.4.1",
+        'futures>=3.2.0; python_version < "3"',
         "PyYAML>=3.13",
         "saltant-py>=0.4.0",
         "tabulate>=0.8.2",
@@ -0,0 +1,74 @@
+"""Contains fixtures shared by the tests.
+
+Tests which talk to a server run against the stand-in saltant API from
+the benchmarks (see benchmarks/mock_server.py), started in-process on a
+free port.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import os
+import sys
+import threading
+import pytest
+from saltant.client import Client
+
+# Let the tests import the mock server from the benchmarks
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "benchmarks",
+    ),
+)
+
+from mock_server import Dataset, MockSaltantServer  # noqa: E402
+
+# How many synthetic task instances of each kind the mock server has
+MOCK_TASK_INSTANCES = 50
+
+
+@pytest.fixture
+def mock_server():
+    """Run a mock saltant API server for the duration of a test.
+
+    Yields:
+        A mock_server.MockSaltantServer object. Its behaviour (e.g.,
+        supports_ranges) can be changed while it runs.
+    """
+    server = MockSaltantServer(
+        ("127.0.0.1", 0), Dataset(task_instances=MOCK_TASK_INSTANCES)
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}
+    )
+    thread.daemon = True
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def server_url(mock_server):
+    """Get the base URL of the mock server.
+
+    Returns:
+        A string containing the URL, without a trailing slash.
+    """
+    return "http://%s:%d" % mock_server.server_address[:2]
+
+
+@pytest.fixture
+def client(server_url):
+    """Get a saltant client for the mock server.
+
+    Returns:
+        A saltant.client.Client object.
+    """
+    return Client(server_url + "/api/", "token")
@@ -0,0 +1,137 @@
+"""Tests for downloading task instances' logs and results."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import hashlib
+import io
+import pytest
+import requests
+from saltant_cli import artifacts
+from saltant_cli.artifacts import (
+    PARTIAL_SUFFIX,
+    download_to_file,
+    stream_download,
+)
+from saltant_cli.exceptions import ArtifactNotFound, DownloadFailed
+
+# A finished synthetic task instance on the mock server, and one which
+# doesn't exist
+UUID = "00000000-0000-0000-0000-000000000001"
+MISSING_UUID = "00000000-0000-0000-0000-ffffffffffff"
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    """Retry cut off downloads straight away."""
+    monkeypatch.setattr(artifacts, "DOWNLOAD_RETRY_DELAY", 0)
+
+
+@pytest.fixture
+def logs_url(server_url):
+    """Get the URL of a task instance's logs on the mock server.
+
+    Returns:
+        A string containing the URL.
+    """
+    return "%s/files/logs/%s" % (server_url, UUID)
+
+
+@pytest.fixture
+def content(logs_url):
+    """Get the whole of the task instance's logs.
+
+    Returns:
+        A bytes object containing the logs.
+    """
+    return requests.get(logs_url).content
+
+
+def download(url, offset=0):
+    """Download the content at a URL past an offset into memory.
+
+    Args:
+        url: A string containing the URL to download.
+        offset: An integer containing how many bytes to skip.
+
+    Returns:
+        A two-tuple containing a bytes object containing what was
+        written and the size stream_download returned.
+    """
+    written = io.BytesIO()
+    size = stream_download(requests.Session(), url, written.write, offset)
+
+    return written.getvalue(), size
+
+
+@pytest.mark.parametrize("offset", [0, 1, 1000])
+def test_downloads_past_an_offset(mock_server, logs_url, content, offset):
+    mock_server.reset_stats()
+
+    assert download(logs_url, offset) == (content[offset:], len(content))
+    assert mock_server.stats()["requests"] == 1
+    assert mock_server.stats()["bytes_sent"] == len(content) - offset
+
+
+@pytest.mark.parametrize("offset", [0, 1, 1000])
+def test_skips_the_offset_when_ranges_are_ignored(
+    mock_server, logs_url, content, offset
+):
+    mock_server.supports_ranges = False
+
+    assert download(logs_url, offset) == (content[offset:], len(content))
+
+
+def test_nothing_past_the_end_is_not_an_error(logs_url, content):
+    # The server says 416 (Range Not Satisfiable) here
+    assert download(logs_url, len(content)) == (b"", len(content))
+
+
+def test_an_offset_past_the_end_fails(logs_url, content):
+    with pytest.raises(DownloadFailed):
+        download(logs_url, len(content) + 1)
+
+
+def test_missing_content_is_not_found(server_url):
+    with pytest.raises(ArtifactNotFound):
+        download("%s/files/logs/%s" % (server_url, MISSING_UUID))
+
+
+@pytest.mark.parametrize("supports_ranges", [True, False])
+@pytest.mark.parametrize("offset", [0, 1000])
+def test_downloads_cut_off_partway_pick_up_where_they_left_off(
+    mock_server, logs_url, content, supports_ranges, offset
+):
+    mock_server.supports_ranges = supports_ranges
+    mock_server.cut_off_downloads = 2
+    mock_server.reset_stats()
+
+    assert download(logs_url, offset) == (content[offset:], len(content))
+    assert mock_server.stats()["requests"] == 3
+
+
+def test_downloads_which_keep_getting_cut_off_fail(mock_server, logs_url):
+    mock_server.cut_off_downloads = artifacts.DOWNLOAD_ATTEMPTS
+
+    with pytest.raises(DownloadFailed):
+        download(logs_url)
+
+
+def test_downloads_to_files_resume_partial_downloads(
+    tmp_path, mock_server, logs_url, content
+):
+    path = str(tmp_path / "logs")
+
+    with open(path + PARTIAL_SUFFIX, "wb") as partial_file:
+        partial_file.write(content[:1000])
+
+    mock_server.reset_stats()
+
+    assert download_to_file(requests.Session(), logs_url, path) == (
+        hashlib.sha256(content).hexdigest(),
+        len(content),
+    )
+    assert mock_server.stats()["bytes_sent"] == len(content) - 1000
+
+    with open(path, "rb") as downloaded_file:
+        assert downloaded_file.read() == content
@@ -0,0 +1,181 @@
+"""Tests for the on-disk cache of finished task instances."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import uuid as uuid_lib
+import pytest
+from saltant_cli import cache as cache_module
+from saltant_cli.cache import TaskInstanceCache
+
+# Indices of synthetic task instances on the mock server which have
+# finished (every eighth one is still running)
+FINISHED_INDICES = (0, 1, 2, 3, 4, 5)
+RUNNING_INDEX = 7
+
+
+class FakeTime(object):
+    """A clock which only moves when told to.
+
+    Attributes:
+        now: A float containing the current time.
+    """
+
+    def __init__(self):
+        """Start the clock."""
+        self.now = 1000.0
+
+    def time(self):
+        """Get the current time.
+
+        Returns:
+            A float containing the current time.
+        """
+        return self.now
+
+
+def get_task_instance(client, index):
+    """Get a synthetic container task instance from the mock server.
+
+    Args:
+        client: A saltant.client.Client object for the mock server.
+        index: An integer containing the task instance's index.
+
+    Returns:
+        A task instance model instance.
+    """
+    return client.container_task_instances.get(
+        str(uuid_lib.UUID(int=index + 1))
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Have the cache use a clock which only moves when told to.
+
+    Returns:
+        A FakeTime object.
+    """
+    clock = FakeTime()
+    monkeypatch.setattr(cache_module, "time", clock)
+
+    return clock
+
+
+@pytest.fixture
+def task_instances(client):
+    """Get finished task instances from the mock server.
+
+    Returns:
+        A list of task instance model instances.
+    """
+    return [get_task_instance(client, index) for index in FINISHED_INDICES]
+
+
+def fill_cache(cache, task_instances, clock):
+    """Put task instances in a cache one second apart.
+
+    Args:
+        cache: A saltant_cli.cache.TaskInstanceCache object.
+        task_instances: A list of task instance model instances.
+        clock: The FakeTime object the cache uses.
+
+    Returns:
+        A list of integers containing the size each task instance takes
+        up in the cache.
+    """
+    for task_instance in task_instances:
+        clock.now += 1
+        assert cache.put(task_instance)
+
+    return [
+        size
+        for size, in cache.connection.execute(
+            "SELECT size FROM task_instances ORDER BY last_accessed"
+        )
+    ]
+
+
+def get_cached_uuids(cache):
+    """Get the UUIDs of the task instances in a cache.
+
+    Args:
+        cache: A saltant_cli.cache.TaskInstanceCache object.
+
+    Returns:
+        A set of strings containing the UUIDs.
+    """
+    return {
+        uuid
+        for uuid, in cache.connection.execute(
+            "SELECT uuid FROM task_instances"
+        )
+    }
+
+
+def test_eviction_removes_the_least_recently_used(
+    tmp_path, client, task_instances, clock
+):
+    cache = TaskInstanceCache(str(tmp_path / "cache.sqlite3"), 10**9)
+    sizes = fill_cache(cache, task_instances, clock)
+
+    # Use the oldest, so the next two oldest are the least recently used
+    clock.now += 1
+    manager = client.container_task_instances
+    assert cache.get(manager, task_instances[0].uuid) is not None
+
+    cache.max_bytes = sum(sizes) - sizes[1] - sizes[2]
+    cache.evict()
+
+    assert get_cached_uuids(cache) == {
+        task_instance.uuid
+        for idx, task_instance in enumerate(task_instances)
+        if idx not in (1, 2)
+    }
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_gets_under_the_size_limit(tmp_path, task_instances, clock):
+    cache = TaskInstanceCache(str(tmp_path / "cache.sqlite3"), 10**9)
+    sizes = fill_cache(cache, task_instances, clock)
+
+    # A byte over what the newest three take up needs the oldest three
+    # gone, since eviction goes by whole task instances
+    cache.max_bytes = sum(sizes[3:]) + 1
+    cache.evict()
+
+    assert get_cached_uuids(cache) == {
+        task_instance.uuid for task_instance in task_instances[3:]
+    }
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_eviction_does_nothing_under_the_size_limit(
+    tmp_path, task_instances, clock
+):
+    cache = TaskInstanceCache(str(tmp_path / "cache.sqlite3"), 10**9)
+    sizes = fill_cache(cache, task_instances, clock)
+
+    cache.max_bytes = sum(sizes)
+    cache.evict()
+
+    assert len(get_cached_uuids(cache)) == len(task_instances)
+    assert "evictions" not in cache.stats()
+
+
+def test_committing_evicts(tmp_path, task_instances, clock):
+    cache = TaskInstanceCache(str(tmp_path / "cache.sqlite3"), 1)
+    fill_cache(cache, task_instances, clock)
+
+    cache.commit()
+
+    assert get_cached_uuids(cache) == set()
+
+
+def test_unfinished_task_instances_are_not_cached(tmp_path, client):
+    cache = TaskInstanceCache(str(tmp_path / "cache.sqlite3"), 10**9)
+    task_instance = get_task_instance(client, RUNNING_INDEX)
+
+    assert task_instance.state == "running"
+    assert not cache.put(task_instance)
+    assert get_cached_uuids(cache) == set()
@@ -0,0 +1,94 @@
+"""Tests for the concurrent request engine."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import random
+import time
+import pytest
+from saltant.exceptions import BadHttpRequestError
+from saltant_cli.concurrency import Engine
+
+
+@pytest.fixture
+def engine(client):
+    """Get an engine making requests through the mock server's client.
+
+    Yields:
+        A saltant_cli.concurrency.Engine object.
+    """
+    engine = Engine(client, concurrency=4)
+
+    try:
+        yield engine
+    finally:
+        engine.shutdown()
+
+
+def test_map_keeps_the_order_of_the_items(engine):
+    def slow_square(item):
+        # Finish out of order
+        time.sleep(random.uniform(0, 0.01))
+        return item * item
+
+    assert list(engine.map(slow_square, range(50))) == [
+        item * item for item in range(50)
+    ]
+
+
+def test_map_raises_the_first_failure_in_item_order(engine):
+    def fail_on_multiples_of_seven(item):
+        # Later failures finish first
+        time.sleep(0.02 if item == 7 else 0)
+
+        if item and item % 7 == 0:
+            raise ValueError(item)
+
+        return item
+
+    results = []
+
+    with pytest.raises(ValueError) as exception_info:
+        for result in engine.map(fail_on_multiples_of_seven, range(30)):
+            results.append(result)
+
+    assert exception_info.value.args == (7,)
+    assert results == list(range(7))
+
+
+def test_map_unordered_returns_errors_as_results(engine):
+    def fail_on_odd_numbers(item):
+        if item % 2:
+            raise ValueError(item)
+
+        return item
+
+    outcomes = {
+        item: (result, exception)
+        for item, result, exception in engine.map_unordered(
+            fail_on_odd_numbers, range(20)
+        )
+    }
+
+    assert sorted(outcomes) == list(range(20))
+
+    for item, (result, exception) in outcomes.items():
+        if item % 2:
+            assert result is None
+            assert isinstance(exception, ValueError)
+        else:
+            assert result == item
+            assert exception is None
+
+
+def test_map_makes_requests_through_the_client(client, engine):
+    ids = [3, 1, 5, 2, 4]
+
+    task_queues = list(engine.map(client.task_queues.get, ids))
+
+    assert [task_queue.id for task_queue in task_queues] == ids
+
+
+def test_map_raises_failed_requests(client, engine):
+    with pytest.raises(BadHttpRequestError):
+        list(engine.map(client.task_queues.get, [1, 2, 999, 3]))
@@ -0,0 +1,75 @@
+"""Tests for how the thin client and the daemon talk to each other."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import io
+import pytest
+from saltant_cli.daemon import (
+    FrameWriter,
+    read_frame,
+    send_frame,
+    should_forward,
+)
+
+
+def test_frames_come_back_as_they_were_sent():
+    frames = [
+        {"command": "run", "args": ["task-queues", "get", "1"], "cwd": "/"},
+        {"stdout": "line one\nline two\n"},
+        {"stderr": "caf\u00e9 \u2713"},
+        {"exit": 0},
+    ]
+    stream = io.BytesIO()
+
+    for frame in frames:
+        send_frame(stream, frame)
+
+    stream.seek(0)
+
+    assert [read_frame(stream) for _ in frames] == frames
+    assert read_frame(stream) is None
+
+
+def test_frame_writers_send_what_is_written_as_frames():
+    stream = io.BytesIO()
+    writer = FrameWriter(stream, "stderr", is_terminal=True)
+
+    writer.write("first\n")
+    writer.write("")
+    writer.write("second")
+    stream.seek(0)
+
+    assert read_frame(stream) == {"stderr": "first\n"}
+    assert read_frame(stream) == {"stderr": "second"}
+    assert read_frame(stream) is None
+    assert writer.isatty()
+
+
+def test_frame_writers_refuse_bytes():
+    with pytest.raises(TypeError):
+        FrameWriter(io.BytesIO(), "stdout").write(b"bytes")
+
+
+@pytest.mark.parametrize(
+    "args, interactive, expected",
+    [
+        (["task-queues", "get", "1"], False, True),
+        (["-o", "jsonl", "task-queues", "list"], False, True),
+        (["--concurrency", "4", "task-queues", "list"], False, True),
+        (["task-queues", "get", "-"], False, False),
+        (["-c", "other.yaml", "task-queues", "list"], False, False),
+        (["--config-path=other.yaml", "task-queues", "list"], False, False),
+        (["shell"], False, False),
+        (["daemon", "stop"], False, False),
+        (["executable-task-instances", "logs", "x"], False, False),
+        (["executable-task-instances", "watch"], False, False),
+        (["task-queues", "list"], True, False),
+        (["task-queues", "get", "1"], True, False),
+        (["executable-task-instances", "wait", "x"], True, True),
+    ],
+)
+def test_commands_needing_the_invoking_process_are_not_forwarded(
+    args, interactive, expected
+):
+    assert should_forward(args, interactive) == expected
@@ -0,0 +1,185 @@
+"""Tests for translating API filters into queries of the local mirror.
+
+Filters are checked by running the SQL they translate into against a
+table of a few task instances, so the tests are of what the filters
+select rather than of how the SQL is spelt.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import sqlite3
+import pytest
+from saltant_cli.mirror import (
+    MIRRORED_RESOURCES,
+    make_resource_schema,
+    translate_filters,
+)
+
+RESOURCE = "executable_task_instances"
+
+TASK_INSTANCES = [
+    {
+        "uuid": "a",
+        "name": "Nightly build",
+        "state": "successful",
+        "user": "matt",
+        "task_queue": 1,
+        "task_type": 10,
+        "datetime_created": "2019-01-01T00:00:00.000000Z",
+        "datetime_finished": "2019-01-01T01:00:00.000000Z",
+    },
+    {
+        "uuid": "b",
+        "name": "nightly test",
+        "state": "failed",
+        "user": "matt",
+        "task_queue": 2,
+        "task_type": 10,
+        "datetime_created": "2019-01-02T00:00:00.000000Z",
+        "datetime_finished": "2019-01-02T01:00:00.000000Z",
+    },
+    {
+        "uuid": "c",
+        "name": "Weekly build",
+        "state": "running",
+        "user": "jane",
+        "task_queue": 2,
+        "task_type": 20,
+        "datetime_created": "2019-01-03T00:00:00.000000Z",
+        "datetime_finished": None,
+    },
+    {
+        "uuid": "d",
+        "name": None,
+        "state": "created",
+        "user": "jane",
+        "task_queue": 3,
+        "task_type": 30,
+        "datetime_created": "2019-01-04T00:00:00.000000Z",
+        "datetime_finished": None,
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def connection():
+    """Get a database containing the task instances.
+
+    Returns:
+        An sqlite3.Connection object.
+    """
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(make_resource_schema(RESOURCE))
+    columns = MIRRORED_RESOURCES[RESOURCE][0]
+
+    for task_instance in TASK_INSTANCES:
+        connection.execute(
+            "INSERT INTO %s (%s, data) VALUES (%s)"
+            % (
+                RESOURCE,
+                ", ".join(columns),
+                ", ".join("?" * (len(columns) + 1)),
+            ),
+            [task_instance[column] for column in columns] + ["{}"],
+        )
+
+    return connection
+
+
+def select(connection, filters):
+    """Get the UUIDs of the task instances which filters select.
+
+    Args:
+        connection: An sqlite3.Connection object for the database.
+        filters: A dictionary containing API filters.
+
+    Returns:
+        A string containing the selected UUIDs, in order.
+    """
+    conditions, params = translate_filters(RESOURCE, filters)
+
+    return "".join(
+        uuid
+        for uuid, in connection.execute(
+            "SELECT uuid FROM %s WHERE %s ORDER BY uuid"
+            % (RESOURCE, conditions),
+            params,
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({}, "abcd"),
+        ({"state": "failed"}, "b"),
+        ({"state__exact": "failed"}, "b"),
+        ({"task_queue": "2"}, "bc"),
+        ({"task_type__gt": 10}, "cd"),
+        ({"task_type__gte": 20}, "cd"),
+        ({"task_type__lt": 20}, "ab"),
+        ({"task_type__lte": 20}, "abc"),
+        ({"name__contains": "build"}, "ac"),
+        ({"name__contains": "Night"}, "a"),
+        ({"name__icontains": "NIGHTLY"}, "ab"),
+        ({"name__startswith": "Nightly"}, "a"),
+        ({"name__startswith": "build"}, ""),
+        ({"name__istartswith": "nIGHTLY"}, "ab"),
+        ({"state__in": "running,created"}, "cd"),
+        ({"state__in": ["running", "created"]}, "cd"),
+        ({"task_queue__in": "1,3"}, "ad"),
+        ({"datetime_finished__isnull": "true"}, "cd"),
+        ({"datetime_finished__isnull": False}, "ab"),
+        ({"name": None}, "d"),
+        ({"datetime_created__gte": "2019-01-02T00:00:00Z"}, "bcd"),
+        ({"datetime_created__lt": "2019-01-02 00:00:00+00:00"}, "a"),
+        ({"datetime_created__gt": "2019-01-01T19:00:00-05:00"}, "cd"),
+    ],
+)
+def test_each_lookup_selects_what_the_api_would(connection, filters, expected):
+    assert select(connection, filters) == expected
+
+
+def test_an_empty_in_lookup_selects_nothing(connection):
+    assert select(connection, {"state__in": []}) == ""
+    assert select(connection, {"state__in": [], "user": "matt"}) == ""
+
+
+def test_numbered_and_positional_parameters_line_up(connection):
+    # startswith uses its (numbered) parameter twice, so positional
+    # parameters on either side of it have to stay in step
+    filters = {
+        "name__istartswith": "nightly",
+        "datetime_created__gte": "2019-01-02T00:00:00Z",
+        "state__in": ["failed", "successful"],
+        "user": "matt",
+    }
+
+    assert select(connection, filters) == "b"
+
+    filters = {
+        "name__startswith": "Weekly",
+        "name__istartswith": "WEEK",
+        "task_queue__in": [1, 2],
+        "task_type__gte": 20,
+        "user": "jane",
+    }
+
+    assert select(connection, filters) == "c"
+
+
+def test_ignored_filters_select_everything(connection):
+    assert (
+        select(connection, {"page": 2, "page_size": 10, "fields": "uuid"})
+        == "abcd"
+    )
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{"nonexistent": "x"}, {"state__regex": "^s"}, {"name__iexact": "x"}],
+)
+def test_unsupported_filters_are_refused(filters):
+    with pytest.raises(ValueError):
+        translate_filters(RESOURCE, filters)
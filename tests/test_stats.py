@@ -0,0 +1,84 @@
+"""Tests for the streaming task instance statistics."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import math
+import random
+import pytest
+from saltant_cli.stats import QuantileSketch
+
+QUANTILES = (0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1)
+
+
+def exact_quantile(values, q):
+    """Get the value at the rank a sketch estimates a quantile at.
+
+    Args:
+        values: A sorted list of numbers.
+        q: A float between 0 and 1 specifying the quantile.
+
+    Returns:
+        The value.
+    """
+    return values[int(math.floor(q * (len(values) - 1)))]
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+@pytest.mark.parametrize(
+    "distribution",
+    [
+        lambda: random.lognormvariate(3, 2),
+        lambda: random.expovariate(1 / 60),
+        lambda: random.uniform(1e-3, 1e6),
+    ],
+)
+def test_quantiles_are_within_the_relative_accuracy(
+    relative_accuracy, distribution
+):
+    random.seed(0)
+    values = [distribution() for _ in range(10000)]
+    sketch = QuantileSketch(relative_accuracy)
+
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+
+    for q in QUANTILES:
+        exact = exact_quantile(values, q)
+        estimate = sketch.quantile(q)
+
+        assert abs(estimate - exact) <= relative_accuracy * exact * (
+            1 + 1e-9
+        ), q
+
+
+def test_estimates_stay_within_the_range_of_the_values():
+    sketch = QuantileSketch(0.05)
+
+    for value in (5.5, 3.25, 1000.125):
+        sketch.add(value)
+
+    for q in QUANTILES:
+        assert 3.25 <= sketch.quantile(q) <= 1000.125
+
+
+def test_zeros_and_negative_values_count_as_zero():
+    sketch = QuantileSketch()
+
+    for value in (0, -5, 0, 10, 20):
+        sketch.add(value)
+
+    assert sketch.quantile(0) == 0
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1) == pytest.approx(20, rel=0.01)
+    assert sketch.min == 0
+    assert sketch.mean() == 6
+
+
+def test_an_empty_sketch_has_no_quantiles():
+    sketch = QuantileSketch()
+
+    assert sketch.quantile(0.5) is None
+    assert sketch.mean() is None